@@ -0,0 +1,76 @@
+"""Benchmarks for the report endpoints."""
+
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from feptm.services.reports import report_service
+
+
+@pytest.mark.parametrize("report", ["specialists", "projects"])
+@pytest.mark.parametrize("scope", ["all", "period"])
+def test_report_endpoint(
+    benchmark: Any, client: Any, sample: Dict[str, Any], report: str, scope: str
+) -> None:
+    """Request a report through the API, including computation and serialization."""
+    params = {"period_id": sample["period_id"]} if scope == "period" else {}
+    headers = {"Cache-Control": "no-cache"}
+    response = benchmark.pedantic(
+        client.get,
+        (f"/api/reports/{report}",),
+        {"params": params, "headers": headers},
+        setup=report_service.clear,
+        rounds=50,
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("report", ["specialists", "projects"])
+def test_report_burst(benchmark: Any, client: Any, report: str) -> None:
+    """Serve 32 concurrent requests for an uncached report, computing it once."""
+    headers = {"Cache-Control": "no-cache"}
+
+    async def burst() -> List[httpx.Response]:
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as async_client:
+            return await asyncio.gather(
+                *(
+                    async_client.get(f"/api/reports/{report}", headers=headers)
+                    for _ in range(32)
+                )
+            )
+
+    responses = benchmark.pedantic(
+        lambda: asyncio.run(burst()), setup=report_service.clear, rounds=10
+    )
+    assert all(response.status_code == 200 for response in responses)
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip", "zstd"])
+def test_cached_response(benchmark: Any, client: Any, encoding: str) -> None:
+    """Serve a stored representation from the response cache."""
+    headers = {"Accept-Encoding": encoding}
+    client.get("/api/periods/", headers=headers)
+    response = benchmark(client.get, "/api/periods/", headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("collection", ["specialists", "projects"])
+def test_batch_get(
+    benchmark: Any, client: Any, json_service: Any, collection: str
+) -> None:
+    """Look up 100 items by ID in one batch request."""
+    ids = [item.id for item in json_service.get_filtered_data(collection)[:100]]
+    response = benchmark(client.post, f"/api/{collection}:batchGet", json={"ids": ids})
+    assert response.status_code == 200
+
+
+def test_export_endpoint(benchmark: Any, client: Any) -> None:
+    """Stream all time entries as Arrow through the API."""
+    pytest.importorskip("pyarrow")
+    response = benchmark.pedantic(client.get, ("/api/export/time_entries",), rounds=3)
+    assert response.status_code == 200
@@ -0,0 +1,191 @@
+"""Benchmarks for the data services."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from feptm.models.payment import TimeEntryCreate
+from feptm.services import MockDataService, SQLiteDataService
+from feptm.services.export import ArrowExporter
+from feptm.services.propagation import DependencyIndex, plan_specialist_change
+
+
+def test_load_json(benchmark: Any, bench_data_dir: Path) -> None:
+    """Load all JSON data files into a fresh service."""
+
+    def load() -> None:
+        service = MockDataService(bench_data_dir)
+        service.get_specialists()
+        service.get_projects()
+        service.get_payment_periods()
+
+    benchmark.pedantic(load, rounds=3, iterations=1)
+
+
+def test_import_sqlite(benchmark: Any, bench_data_dir: Path, tmp_path: Path) -> None:
+    """Import the JSON data files into a new SQLite database."""
+    paths = iter(tmp_path / f"import-{n}.db" for n in range(1000))
+
+    def setup() -> Any:
+        return (SQLiteDataService(next(paths)),), {}
+
+    benchmark.pedantic(lambda s: s.import_json(bench_data_dir), setup=setup, rounds=3)
+
+
+@pytest.mark.parametrize(
+    "method", ["get_specialists", "get_projects", "get_payment_periods"]
+)
+def test_get_all(benchmark: Any, service: Any, method: str) -> None:
+    """Get all items of a collection."""
+    benchmark(getattr(service, method))
+
+
+@pytest.mark.parametrize(
+    "method, key",
+    [
+        ("get_specialist", "specialist_id"),
+        ("get_project", "project_id"),
+        ("get_payment_period", "period_id"),
+    ],
+)
+def test_get_by_id(
+    benchmark: Any, service: Any, sample: Dict[str, Any], method: str, key: str
+) -> None:
+    """Get a single item by ID."""
+    result = benchmark(getattr(service, method), sample[key])
+    assert result is not None
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        (),
+        ("specialist_id",),
+        ("project_id",),
+        ("start_date", "end_date"),
+        ("specialist_id", "start_date", "end_date"),
+        ("specialist_id", "project_id", "start_date", "end_date"),
+    ],
+    ids=lambda keys: "+".join(keys) or "all",
+)
+def test_get_time_entries(
+    benchmark: Any, service: Any, sample: Dict[str, Any], keys: tuple
+) -> None:
+    """Get time entries with a combination of filters."""
+    filters = {key: sample[key] for key in keys}
+    result = benchmark(service.get_time_entries, **filters)
+    assert result
+
+
+@pytest.mark.parametrize(
+    "method", ["get_specialist_report_data", "get_project_report_data"]
+)
+@pytest.mark.parametrize("scope", ["all", "period"])
+def test_report_data(
+    benchmark: Any, service: Any, sample: Dict[str, Any], method: str, scope: str
+) -> None:
+    """Aggregate report data over all periods or a single one."""
+    period_id = sample["period_id"] if scope == "period" else None
+    result = benchmark(getattr(service, method), period_id)
+    assert result
+
+
+@pytest.mark.parametrize("writers", [1, 16])
+def test_journaled_writes(
+    benchmark: Any,
+    bench_data_dir: Path,
+    sample: Dict[str, Any],
+    tmp_path: Path,
+    writers: int,
+) -> None:
+    """Add 256 time entries through the journal from concurrent writers.
+
+    The writers share group commits.
+    """
+    service = MockDataService(
+        bench_data_dir, journal_dir=tmp_path / f"journal-{writers}"
+    )
+    entry = TimeEntryCreate(
+        specialist_id=sample["specialist_id"],
+        project_id=sample["project_id"],
+        date=sample["start_date"],
+        hours=1.0,
+        description="Benchmark entry",
+    )
+
+    def write() -> None:
+        with ThreadPoolExecutor(writers) as pool:
+            list(
+                pool.map(
+                    lambda _: service.add_time_entry(sample["period_id"], entry),
+                    range(256),
+                )
+            )
+
+    service.get_payment_periods()
+    benchmark.pedantic(write, rounds=3, iterations=1)
+    service.close()
+
+
+def test_report_during_writes(
+    benchmark: Any, bench_data_dir: Path, sample: Dict[str, Any]
+) -> None:
+    """Aggregate a pinned project report while another thread publishes generations."""
+    service = MockDataService(bench_data_dir)
+    entry = TimeEntryCreate(
+        specialist_id=sample["specialist_id"],
+        project_id=sample["project_id"],
+        date=sample["start_date"],
+        hours=1.0,
+        description="Benchmark entry",
+    )
+    stop = threading.Event()
+
+    def write() -> None:
+        while not stop.is_set():
+            service.add_time_entry(sample["period_id"], entry)
+
+    def report() -> List[Dict[str, Any]]:
+        with service.pin():
+            return service.get_project_report_data()
+
+    service.warm_up()
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        result = benchmark.pedantic(report, rounds=5, iterations=1)
+    finally:
+        stop.set()
+        writer.join()
+    assert result
+
+
+def test_dependency_index(benchmark: Any, json_service: MockDataService) -> None:
+    """Build the index from specialists to linked timesheets and period tabs."""
+    index = benchmark(DependencyIndex.build, json_service)
+    assert index.sheets
+
+
+def test_plan_specialist_change(
+    benchmark: Any, json_service: MockDataService, sample: Dict[str, Any]
+) -> None:
+    """Plan the timesheet updates of a rate and role change."""
+    index = DependencyIndex.build(json_service)
+    before = json_service.get_specialist(sample["specialist_id"])
+    after = before.model_copy(
+        update={"hourly_rate": before.hourly_rate + 1, "role": "QA"}
+    )
+    benchmark(plan_specialist_change, index, before, after)
+
+
+def test_export_arrow_stream(benchmark: Any, service: Any) -> None:
+    """Encode all time entries as an Arrow IPC stream."""
+    pytest.importorskip("pyarrow")
+    exporter = ArrowExporter(service)
+    size = benchmark.pedantic(
+        lambda: sum(len(chunk) for chunk in exporter.stream("time_entries")), rounds=3
+    )
+    assert size
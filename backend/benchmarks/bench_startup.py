@@ -0,0 +1,37 @@
+"""Benchmarks for the cold start of the application.
+
+The import budget is set with FEPTM_STARTUP_BUDGET_MS (default 2000).
+"""
+
+import os
+from typing import Any
+
+from benchmarks.startup import APP_MODULE, LAZY_MODULES, measure_imports, summarize
+
+STARTUP_BUDGET_MS = float(os.environ.get("FEPTM_STARTUP_BUDGET_MS", "2000"))
+
+# Environment of a default deployment
+STARTUP_ENV = {"DATA_BACKEND": "json"}
+
+
+def test_import_app(benchmark: Any) -> None:
+    """Import the application in a fresh interpreter within the startup budget."""
+    records = benchmark.pedantic(
+        measure_imports, args=(APP_MODULE, STARTUP_ENV), rounds=3, iterations=1
+    )
+    report = summarize(records)
+    benchmark.extra_info["import_ms"] = report.total_ms
+    benchmark.extra_info["modules"] = report.module_count
+    benchmark.extra_info["top_cumulative"] = report.top_cumulative[:10]
+
+    assert report.total_ms <= STARTUP_BUDGET_MS, (
+        f"Importing {APP_MODULE} took {report.total_ms:.0f} ms, "
+        f"budget is {STARTUP_BUDGET_MS:.0f} ms"
+    )
+
+
+def test_heavy_modules_are_lazy() -> None:
+    """Optional backends and clients are not imported on startup."""
+    report = summarize(measure_imports(APP_MODULE, STARTUP_ENV))
+    eager = [name for name in LAZY_MODULES if name in report.imported]
+    assert not eager, f"Imported on startup: {', '.join(eager)}"
@@ -0,0 +1,87 @@
+"""Fixtures for the benchmark suite.
+
+The dataset size is set with FEPTM_BENCH_ENTRIES (default 10k, e.g. 1m or 10m)
+and FEPTM_BENCH_SEED. Generated datasets are cached under .benchmarks/data.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+BENCH_ENTRIES = os.environ.get("FEPTM_BENCH_ENTRIES", "10k")
+BENCH_SEED = int(os.environ.get("FEPTM_BENCH_SEED", "42"))
+BENCH_DATA_ROOT = Path(
+    os.environ.get(
+        "FEPTM_BENCH_DATA", Path(__file__).parent.parent / ".benchmarks" / "data"
+    )
+)
+BENCH_DATA_DIR = BENCH_DATA_ROOT / f"entries-{BENCH_ENTRIES}-seed-{BENCH_SEED}"
+
+# Point the application at the generated dataset before settings are loaded
+os.environ["DATA_DIR"] = str(BENCH_DATA_DIR)
+os.environ.setdefault("SQLITE_DB_PATH", str(BENCH_DATA_DIR / "feptm.db"))
+
+from benchmarks.datagen import DatasetSpec, generate_dataset, parse_scale  # noqa: E402
+from feptm.services import MockDataService, SQLiteDataService  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def bench_data_dir() -> Path:
+    """Generate the benchmark dataset, reusing a cached copy if present."""
+    marker = BENCH_DATA_DIR / ".complete"
+    if not marker.exists():
+        generate_dataset(
+            DatasetSpec(entries=parse_scale(BENCH_ENTRIES), seed=BENCH_SEED),
+            BENCH_DATA_DIR,
+        )
+        marker.touch()
+    return BENCH_DATA_DIR
+
+
+@pytest.fixture(scope="session")
+def json_service(bench_data_dir: Path) -> MockDataService:
+    """JSON data service with all collections loaded."""
+    service = MockDataService(bench_data_dir)
+    service.get_time_entries()
+    return service
+
+
+@pytest.fixture(scope="session")
+def sqlite_service(bench_data_dir: Path) -> SQLiteDataService:
+    """SQLite data service with the dataset imported."""
+    service = SQLiteDataService(Path(os.environ["SQLITE_DB_PATH"]))
+    service.import_json(bench_data_dir)
+    return service
+
+
+@pytest.fixture(scope="session", params=["json", "sqlite"])
+def service(request: pytest.FixtureRequest) -> Any:
+    """Data service for each backend."""
+    return request.getfixturevalue(f"{request.param}_service")
+
+
+@pytest.fixture(scope="session")
+def sample(json_service: MockDataService) -> Dict[str, Any]:
+    """IDs and dates from the middle of the dataset to use in lookups."""
+    periods = json_service.get_payment_periods()
+    period = periods[len(periods) // 2]
+    entry = period.time_entries[len(period.time_entries) // 2]
+    return {
+        "specialist_id": entry.specialist_id,
+        "project_id": entry.project_id,
+        "period_id": period.id,
+        "start_date": period.start_date,
+        "end_date": period.end_date,
+    }
+
+
+@pytest.fixture(scope="session")
+def client(bench_data_dir: Path) -> Any:
+    """Test client for the application serving the benchmark dataset."""
+    from fastapi.testclient import TestClient
+
+    from feptm.main import app
+
+    return TestClient(app)
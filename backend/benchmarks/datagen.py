@@ -0,0 +1,371 @@
+"""Seeded generator of synthetic datasets in the format of the JSON data files.
+
+Usage:
+    python -m benchmarks.datagen --entries 1m --output-dir /tmp/feptm-1m
+
+The generator streams time entries to disk, so datasets with millions of
+entries are produced in constant memory.
+"""
+
+import argparse
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, TextIO
+
+from feptm.models.payment import PaymentStatus
+from feptm.models.project import ProjectStatus, ProjectType
+from feptm.models.specialist import SpecialistRole
+
+FIRST_NAMES = [
+    "Иван",
+    "Анна",
+    "Сергей",
+    "Елена",
+    "Алексей",
+    "Мария",
+    "Дмитрий",
+    "Ольга",
+    "Николай",
+    "Татьяна",
+    "Павел",
+    "Наталья",
+    "Андрей",
+    "Юлия",
+    "Михаил",
+    "Ирина",
+]
+LAST_NAMES = [
+    "Петров",
+    "Смирнов",
+    "Иванов",
+    "Козлов",
+    "Николаев",
+    "Волков",
+    "Соколов",
+    "Попов",
+    "Лебедев",
+    "Новиков",
+    "Морозов",
+    "Федоров",
+    "Орлов",
+    "Зайцев",
+    "Павлов",
+    "Семенов",
+]
+PROJECT_NAMES = [
+    "E-Commerce Platform",
+    "CRM System",
+    "Mobile App",
+    "Corporate Website",
+    "Billing Service",
+    "Analytics Dashboard",
+    "Logistics Portal",
+    "HR Portal",
+    "Booking Engine",
+    "Payment Gateway",
+]
+PROJECT_DESCRIPTIONS = [
+    "Разработка интернет-магазина с интеграцией платежных систем",
+    "Разработка системы управления взаимоотношениями с клиентами",
+    "Разработка мобильного приложения для службы доставки",
+    "Редизайн корпоративного сайта и личного кабинета",
+    "Development of a reporting platform with data export",
+]
+CLIENT_NAMES = [
+    "ООО Ритейл Плюс",
+    "АО ФинТех",
+    "ИП Доставкин",
+    "ПАО МедТех",
+    "ООО Логистик",
+    "Acme Corp",
+    "Globex LLC",
+]
+ENTRY_DESCRIPTIONS = [
+    "Разработка и тестирование API",
+    "Интеграция платежных систем",
+    "Тестирование функциональности корзины",
+    "Планирование спринта и оценка задач",
+    "Дизайн макетов главной страницы",
+    "Исправление ошибок в модуле отчетов",
+    "Настройка CI/CD и деплой на сервер",
+    "Встреча с клиентом по требованиям",
+    "Code review and refactoring",
+    "Writing documentation for the billing module",
+]
+
+EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class DatasetSpec:
+    """Size and seed of a synthetic dataset."""
+
+    entries: int
+    seed: int = 42
+    specialists: int = 0
+    projects: int = 0
+    periods: int = 0
+
+    def __post_init__(self) -> None:
+        """Derive entity counts that were not given from the number of entries."""
+        self.specialists = self.specialists or max(5, min(self.entries // 200, 5000))
+        self.projects = self.projects or max(3, self.specialists // 5)
+        self.periods = self.periods or max(2, min(self.entries // 5000, 120))
+
+
+def parse_scale(value: str) -> int:
+    """Parse a size such as 10000, 10k or 1m.
+
+    Args:
+        value: Size with an optional k/m suffix
+
+    Returns:
+        Number of entries
+    """
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+def _uuid(rng: random.Random) -> str:
+    """Generate a reproducible UUID string."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _iso(value: datetime) -> str:
+    """Format a datetime the way the data files do."""
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Write a JSON data file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def generate_specialists(spec: DatasetSpec, rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate specialist records.
+
+    Args:
+        spec: Dataset specification
+        rng: Random generator
+
+    Returns:
+        List of specialist records
+    """
+    roles = list(SpecialistRole)
+    specialists = []
+    for n in range(spec.specialists):
+        hire_date = EPOCH - timedelta(days=rng.randint(0, 1000))
+        active = rng.random() > 0.1
+        leave_date = (
+            None if active else _iso(EPOCH + timedelta(days=rng.randint(30, 300)))
+        )
+        specialists.append(
+            {
+                "id": _uuid(rng),
+                "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "email": f"specialist{n}@example.com",
+                "role": rng.choice(roles).value,
+                "hourly_rate": float(rng.randrange(30, 120, 5)),
+                "active": active,
+                "hire_date": _iso(hire_date),
+                "leave_date": leave_date,
+            }
+        )
+    return specialists
+
+
+def generate_projects(
+    spec: DatasetSpec, rng: random.Random, specialist_ids: List[str]
+) -> List[Dict[str, Any]]:
+    """Generate project records with assigned specialists.
+
+    Args:
+        spec: Dataset specification
+        rng: Random generator
+        specialist_ids: IDs of the generated specialists
+
+    Returns:
+        List of project records
+    """
+    projects = []
+    for n in range(spec.projects):
+        start_date = EPOCH + timedelta(days=rng.randint(-90, 90))
+        team_size = min(len(specialist_ids), rng.randint(2, 12))
+        projects.append(
+            {
+                "id": _uuid(rng),
+                "name": f"{rng.choice(PROJECT_NAMES)} {n}",
+                "description": rng.choice(PROJECT_DESCRIPTIONS),
+                "client_name": rng.choice(CLIENT_NAMES),
+                "client_contact_email": f"client{n}@example.com",
+                "client_contact_phone": f"+7900{rng.randint(0, 9999999):07d}",
+                "status": rng.choice(list(ProjectStatus)).value,
+                "project_type": rng.choice(list(ProjectType)).value,
+                "timesheet_id": f"sheet-{_uuid(rng)}" if rng.random() > 0.2 else None,
+                "start_date": _iso(start_date),
+                "end_date": _iso(start_date + timedelta(days=rng.randint(90, 720))),
+                "budget": float(rng.randrange(100_000, 5_000_000, 50_000)),
+                "repository_url": (
+                    f"https://github.com/example/project-{n}"
+                    if rng.random() > 0.3
+                    else None
+                ),
+                "created_at": _iso(start_date - timedelta(days=14)),
+                "updated_at": _iso(start_date),
+                "specialist_ids": rng.sample(specialist_ids, team_size),
+            }
+        )
+    return projects
+
+
+def _write_periods(
+    f: TextIO, spec: DatasetSpec, rng: random.Random, projects: List[Dict[str, Any]]
+) -> None:
+    """Stream payment periods with their time entries as a JSON array.
+
+    Args:
+        f: Output file
+        spec: Dataset specification
+        rng: Random generator
+        projects: Generated project records
+    """
+    statuses = list(PaymentStatus)
+    per_period, remainder = divmod(spec.entries, spec.periods)
+    f.write("[\n")
+    for n in range(spec.periods):
+        start_date = EPOCH + timedelta(days=30 * n)
+        end_date = start_date + timedelta(days=30) - timedelta(seconds=1)
+        header = {
+            "id": _uuid(rng),
+            "name": f"Период {n + 1}",
+            "start_date": _iso(start_date),
+            "end_date": _iso(end_date),
+            "status": rng.choice(statuses).value,
+            "report_id": f"report-{n}",
+            "created_at": _iso(start_date),
+            "updated_at": _iso(end_date),
+        }
+        f.write(
+            "  " + json.dumps(header, ensure_ascii=False)[:-1] + ', "time_entries": ['
+        )
+
+        # Entry dates have day granularity, so format each day once
+        days = [
+            (
+                _iso(start_date + timedelta(days=d)),
+                _iso(start_date + timedelta(days=d, hours=19)),
+            )
+            for d in range(30)
+        ]
+        specialist_totals: Dict[str, float] = {}
+        project_totals: Dict[str, float] = {}
+        count = per_period + (1 if n < remainder else 0)
+        for i in range(count):
+            project = rng.choice(projects)
+            specialist_id = rng.choice(project["specialist_ids"])
+            date, created_at = rng.choice(days)
+            hours = rng.choice((0.5, 1.0, 2.0, 4.0, 6.0, 8.0))
+            entry = {
+                "id": _uuid(rng),
+                "specialist_id": specialist_id,
+                "project_id": project["id"],
+                "date": date,
+                "hours": hours,
+                "description": rng.choice(ENTRY_DESCRIPTIONS),
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            f.write(
+                ("\n    " if i == 0 else ",\n    ")
+                + json.dumps(entry, ensure_ascii=False)
+            )
+            specialist_totals[specialist_id] = (
+                specialist_totals.get(specialist_id, 0.0) + hours
+            )
+            project_totals[project["id"]] = (
+                project_totals.get(project["id"], 0.0) + hours
+            )
+
+        totals = {
+            "specialist_totals": specialist_totals,
+            "project_totals": project_totals,
+            "total_hours": sum(project_totals.values()),
+        }
+        f.write("\n  ], " + json.dumps(totals, ensure_ascii=False)[1:])
+        f.write(",\n" if n < spec.periods - 1 else "\n")
+    f.write("]\n")
+
+
+def generate_dataset(spec: DatasetSpec, output_dir: Path) -> Path:
+    """Generate specialists.json, projects.json and payment_periods.json.
+
+    Args:
+        spec: Dataset specification
+        output_dir: Directory to write the data files to
+
+    Returns:
+        The output directory
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec.seed)
+
+    specialists = generate_specialists(spec, rng)
+    projects = generate_projects(spec, rng, [s["id"] for s in specialists])
+    _write_json(output_dir / "specialists.json", specialists)
+    _write_json(output_dir / "projects.json", projects)
+    with open(output_dir / "payment_periods.json", "w", encoding="utf-8") as f:
+        _write_periods(f, spec, rng, projects)
+    return output_dir
+
+
+def main() -> None:
+    """Parse arguments and generate a dataset."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset")
+    parser.add_argument(
+        "--entries", default="10k", help="Number of time entries, e.g. 10k, 1m, 10m"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--specialists",
+        type=int,
+        default=0,
+        help="Number of specialists (derived if 0)",
+    )
+    parser.add_argument(
+        "--projects", type=int, default=0, help="Number of projects (derived if 0)"
+    )
+    parser.add_argument(
+        "--periods",
+        type=int,
+        default=0,
+        help="Number of payment periods (derived if 0)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        required=True,
+        help="Directory to write the data files to",
+    )
+    args = parser.parse_args()
+
+    spec = DatasetSpec(
+        entries=parse_scale(args.entries),
+        seed=args.seed,
+        specialists=args.specialists,
+        projects=args.projects,
+        periods=args.periods,
+    )
+    generate_dataset(spec, args.output_dir)
+    print(f"Generated {spec} in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
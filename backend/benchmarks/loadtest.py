@@ -0,0 +1,475 @@
+"""In-process HTTP load test of the API through an ASGI transport.
+
+Usage:
+    python -m benchmarks.loadtest --mix default --concurrency 1,8,32 --duration 10 \\
+        --output results.json [--compare previous.json]
+
+Requests go straight to ``feptm.main:app`` without a network, so the numbers
+measure routing, data access and serialization. Point DATA_DIR at a dataset
+generated with ``benchmarks.datagen`` to load-test realistic sizes.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+Target = Tuple[str, Dict[str, Any]]
+
+# Traffic mixes as relative weights of the routes below
+MIXES: Dict[str, Dict[str, float]] = {
+    "default": {
+        "specialists.list": 2,
+        "specialists.get": 4,
+        "projects.list": 2,
+        "projects.get": 4,
+        "periods.list": 1,
+        "periods.get": 1,
+        "periods.entries": 2,
+        "entries.filtered": 3,
+        "reports.specialists": 1,
+        "reports.projects": 1,
+    },
+    "lists": {
+        "specialists.list": 1,
+        "projects.list": 1,
+        "periods.list": 1,
+    },
+    "lookups": {
+        "specialists.get": 1,
+        "projects.get": 1,
+        "periods.get": 1,
+    },
+    "reports": {
+        "reports.specialists": 1,
+        "reports.projects": 1,
+        "reports.specialists.period": 1,
+        "reports.projects.period": 1,
+    },
+    "entries": {
+        "periods.entries": 1,
+        "entries.filtered": 2,
+        "entries.specialist": 1,
+    },
+}
+
+# Histogram buckets grow by a quarter octave (about 19%), from 1 microsecond
+BUCKET_BASE = 2**0.25
+BUCKET_MIN_SECONDS = 1e-6
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with exact count, sum, min and max."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a latency.
+
+        Args:
+            seconds: Latency in seconds
+        """
+        bucket = max(
+            0,
+            math.ceil(
+                math.log(
+                    max(seconds, BUCKET_MIN_SECONDS) / BUCKET_MIN_SECONDS, BUCKET_BASE
+                )
+            ),
+        )
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    @staticmethod
+    def _upper_bound(bucket: int) -> float:
+        """Get the upper bound of a bucket in seconds."""
+        return BUCKET_MIN_SECONDS * BUCKET_BASE**bucket
+
+    def percentile(self, p: float) -> float:
+        """Estimate a percentile as the upper bound of its bucket.
+
+        Args:
+            p: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram in milliseconds.
+
+        Returns:
+            Summary with percentiles and non-empty buckets
+        """
+        ms = 1000.0
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * ms if self.count else 0.0,
+            "min_ms": self.min * ms if self.count else 0.0,
+            "p50_ms": self.percentile(50) * ms,
+            "p90_ms": self.percentile(90) * ms,
+            "p99_ms": self.percentile(99) * ms,
+            "max_ms": self.max * ms,
+            "buckets": [
+                [self._upper_bound(b) * ms, self.buckets[b]]
+                for b in sorted(self.buckets)
+            ],
+        }
+
+
+class RouteStats:
+    """Latency, status and size statistics of one route."""
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.statuses: Dict[int, int] = {}
+        self.bytes = 0
+
+    def record(self, seconds: float, status_code: int, size: int) -> None:
+        """Record a response.
+
+        Args:
+            seconds: Latency in seconds
+            status_code: HTTP status code
+            size: Response body size in bytes
+        """
+        self.latency.record(seconds)
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        self.bytes += size
+        if status_code >= 500:
+            self.errors += 1
+
+
+class TargetFactory:
+    """Builds request paths for each route with IDs taken from the dataset."""
+
+    def __init__(self, data_service: Any):
+        """Collect the IDs to request.
+
+        Args:
+            data_service: Data service the application serves
+        """
+        self.specialist_ids = [s.id for s in data_service.get_specialists()]
+        self.project_ids = [p.id for p in data_service.get_projects()]
+        periods = data_service.get_payment_periods()
+        self.period_ids = [p.id for p in periods]
+        self.period_ranges = [
+            (p.start_date.isoformat(), p.end_date.isoformat()) for p in periods
+        ]
+        if not (self.specialist_ids and self.project_ids and self.period_ids):
+            raise ValueError(
+                "The dataset needs specialists, projects and payment periods"
+            )
+
+        self.routes: Dict[str, Callable[[random.Random], Target]] = {
+            "specialists.list": lambda rng: ("/api/specialists/", {}),
+            "specialists.get": lambda rng: (
+                f"/api/specialists/{rng.choice(self.specialist_ids)}",
+                {},
+            ),
+            "projects.list": lambda rng: ("/api/projects/", {}),
+            "projects.get": lambda rng: (
+                f"/api/projects/{rng.choice(self.project_ids)}",
+                {},
+            ),
+            "periods.list": lambda rng: ("/api/periods/", {}),
+            "periods.get": lambda rng: (
+                f"/api/periods/{rng.choice(self.period_ids)}",
+                {},
+            ),
+            "periods.entries": lambda rng: (
+                f"/api/periods/{rng.choice(self.period_ids)}/time-entries",
+                {"specialist_id": rng.choice(self.specialist_ids)},
+            ),
+            "entries.filtered": self._filtered_entries,
+            "entries.specialist": lambda rng: (
+                "/api/timesheets/time-entries",
+                {"specialist_id": rng.choice(self.specialist_ids)},
+            ),
+            "reports.specialists": lambda rng: ("/api/reports/specialists", {}),
+            "reports.projects": lambda rng: ("/api/reports/projects", {}),
+            "reports.specialists.period": lambda rng: (
+                "/api/reports/specialists",
+                {"period_id": rng.choice(self.period_ids)},
+            ),
+            "reports.projects.period": lambda rng: (
+                "/api/reports/projects",
+                {"period_id": rng.choice(self.period_ids)},
+            ),
+        }
+
+    def _filtered_entries(self, rng: random.Random) -> Target:
+        """Build a time-entries request filtered by specialist and period dates."""
+        start_date, end_date = rng.choice(self.period_ranges)
+        return "/api/timesheets/time-entries", {
+            "specialist_id": rng.choice(self.specialist_ids),
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    targets: TargetFactory,
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """Run a fixed number of concurrent clients for a period of time.
+
+    Args:
+        client: HTTP client bound to the application
+        targets: Request factory
+        mix: Route weights
+        concurrency: Number of concurrent clients
+        duration: Duration in seconds
+        seed: Random seed for route and ID selection
+
+    Returns:
+        Throughput and latency statistics of the run
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stats = {name: RouteStats() for name in names}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        while loop.time() < deadline:
+            name = rng.choices(names, weights)[0]
+            path, params = targets.routes[name](rng)
+            started = time.perf_counter()
+            response = await client.get(path, params=params)
+            stats[name].record(
+                time.perf_counter() - started,
+                response.status_code,
+                len(response.content),
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(s.latency.count for s in stats.values())
+    overall = LatencyHistogram()
+    for route_stats in stats.values():
+        for bucket, count in route_stats.latency.buckets.items():
+            overall.buckets[bucket] = overall.buckets.get(bucket, 0) + count
+        overall.count += route_stats.latency.count
+        overall.total += route_stats.latency.total
+        overall.min = min(overall.min, route_stats.latency.min)
+        overall.max = max(overall.max, route_stats.latency.max)
+
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "requests": total,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "errors": sum(s.errors for s in stats.values()),
+        "latency": overall.to_dict(),
+        "routes": {
+            name: {
+                "requests": s.latency.count,
+                "throughput_rps": s.latency.count / elapsed if elapsed else 0.0,
+                "errors": s.errors,
+                "statuses": {
+                    str(code): count for code, count in sorted(s.statuses.items())
+                },
+                "mean_response_bytes": (
+                    s.bytes / s.latency.count if s.latency.count else 0
+                ),
+                "latency": s.latency.to_dict(),
+            }
+            for name, s in stats.items()
+            if s.latency.count
+        },
+    }
+
+
+async def run_load_test(
+    mix: Dict[str, float],
+    concurrency_levels: List[int],
+    duration: float,
+    warmup: float = 1.0,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """Load-test the application at several concurrency levels.
+
+    Args:
+        mix: Route weights
+        concurrency_levels: Numbers of concurrent clients to run in turn
+        duration: Duration of each level in seconds
+        warmup: Warm-up duration in seconds, not included in the results
+        seed: Random seed
+
+    Returns:
+        Results of all levels with run metadata
+    """
+    from feptm.main import app
+    from feptm.services.data_service import data_service
+
+    targets = TargetFactory(data_service)
+    unknown = set(mix) - set(targets.routes)
+    if unknown:
+        raise ValueError(f"Unknown routes in traffic mix: {', '.join(sorted(unknown))}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest"
+        ) as client:
+            if warmup > 0:
+                await run_level(
+                    client, targets, mix, max(concurrency_levels), warmup, seed
+                )
+            levels = []
+            for concurrency in concurrency_levels:
+                levels.append(
+                    await run_level(client, targets, mix, concurrency, duration, seed)
+                )
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "mix": mix,
+        "duration_s": duration,
+        "seed": seed,
+        "dataset": {
+            "specialists": len(targets.specialist_ids),
+            "projects": len(targets.project_ids),
+            "payment_periods": len(targets.period_ids),
+        },
+        "levels": levels,
+    }
+
+
+def compare_results(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Compare throughput and p99 latency per route with a previous run.
+
+    Args:
+        previous: Results of the previous run
+        current: Results of the current run
+
+    Returns:
+        Report lines
+    """
+    lines = [f"{'concurrency':>11} {'route':<28} {'rps':>18} {'p99 ms':>22}"]
+    previous_levels = {
+        level["concurrency"]: level for level in previous.get("levels", [])
+    }
+    for level in current["levels"]:
+        before = previous_levels.get(level["concurrency"])
+        if before is None:
+            continue
+        for name, route in level["routes"].items():
+            old = before["routes"].get(name)
+            if old is None:
+                continue
+            rps_change = (
+                (route["throughput_rps"] / old["throughput_rps"] - 1) * 100
+                if old["throughput_rps"]
+                else 0.0
+            )
+            old_p99 = old["latency"]["p99_ms"]
+            p99_change = (
+                (route["latency"]["p99_ms"] / old_p99 - 1) * 100 if old_p99 else 0.0
+            )
+            lines.append(
+                f"{level['concurrency']:>11} {name:<28} "
+                f"{route['throughput_rps']:>9.1f} ({rps_change:+6.1f}%) "
+                f"{route['latency']['p99_ms']:>12.2f} ({p99_change:+6.1f}%)"
+            )
+    return lines
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description="Load-test the API in process")
+    parser.add_argument(
+        "--mix", default="default", help=f"Traffic mix: {', '.join(MIXES)}"
+    )
+    parser.add_argument(
+        "--mix-file", type=Path, help="JSON file with route weights, overrides --mix"
+    )
+    parser.add_argument(
+        "--concurrency", default="1,8,32", help="Comma-separated concurrency levels"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per concurrency level"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=1.0, help="Warm-up seconds before measuring"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--output", type=Path, help="Write results as JSON to this file"
+    )
+    parser.add_argument("--compare", type=Path, help="Previous results to compare with")
+    args = parser.parse_args()
+
+    if args.mix_file:
+        mix = json.loads(args.mix_file.read_text(encoding="utf-8"))
+    elif args.mix in MIXES:
+        mix = MIXES[args.mix]
+    else:
+        parser.error(f"Unknown traffic mix: {args.mix}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    # Per-request client logging would dominate the measurements
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(
+        run_load_test(mix, levels, args.duration, args.warmup, args.seed)
+    )
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    for level in results["levels"]:
+        print(
+            f"concurrency={level['concurrency']} rps={level['throughput_rps']:.1f} "
+            f"p99={level['latency']['p99_ms']:.2f}ms errors={level['errors']}",
+            file=sys.stderr,
+        )
+    if args.compare:
+        previous = json.loads(args.compare.read_text(encoding="utf-8"))
+        for line in compare_results(previous, results):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
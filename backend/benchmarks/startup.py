@@ -0,0 +1,175 @@
+"""Startup-time report based on python -X importtime.
+
+Usage:
+    python -m benchmarks.startup --top 20
+
+Imports the application in a fresh interpreter and summarizes where the
+import time goes, so regressions in cold start are easy to spot.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+APP_MODULE = "feptm.main"
+
+# Modules that must not be imported when the application starts
+LAZY_MODULES = ("sqlite3", "googleapiclient", "google_auth_oauthlib", "pyarrow")
+
+
+@dataclass
+class ImportRecord:
+    """Import time of one module as reported by -X importtime."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupReport:
+    """Summary of the imports done when loading a module."""
+
+    module: str
+    total_ms: float
+    module_count: int
+    top_cumulative: List[Dict[str, float]]
+    top_self: List[Dict[str, float]]
+    imported: List[str]
+
+    def to_dict(self) -> Dict[str, object]:
+        """Convert the report to a JSON-serializable dict."""
+        return asdict(self)
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the stderr output of python -X importtime.
+
+    Args:
+        output: Output of the interpreter
+
+    Returns:
+        Import records in the order they were reported
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        records.append(
+            ImportRecord(
+                module=stripped,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return records
+
+
+def measure_imports(
+    module: str = APP_MODULE, env: Optional[Dict[str, str]] = None
+) -> List[ImportRecord]:
+    """Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import
+        env: Extra environment variables for the interpreter
+
+    Returns:
+        Import records of the interpreter
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    process_env = {**os.environ, **(env or {})}
+    process_env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC_DIR), process_env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=process_env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def summarize(
+    records: List[ImportRecord], module: str = APP_MODULE, top: int = 15
+) -> StartupReport:
+    """Summarize import records.
+
+    Args:
+        records: Import records of the interpreter
+        module: Module whose cumulative import time is the total
+        top: Number of modules in the top lists
+
+    Returns:
+        Startup report
+    """
+    total = next(
+        (r.cumulative_us for r in records if r.module == module and r.depth == 0), 0
+    )
+    by_cumulative = sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]
+    by_self = sorted(records, key=lambda r: r.self_us, reverse=True)[:top]
+    return StartupReport(
+        module=module,
+        total_ms=total / 1000,
+        module_count=len(records),
+        top_cumulative=[
+            {"module": r.module, "ms": r.cumulative_us / 1000} for r in by_cumulative
+        ],
+        top_self=[{"module": r.module, "ms": r.self_us / 1000} for r in by_self],
+        imported=sorted({r.module for r in records}),
+    )
+
+
+def main() -> None:
+    """Parse arguments and print a startup report."""
+    parser = argparse.ArgumentParser(
+        description="Report the import time of the application"
+    )
+    parser.add_argument("--module", default=APP_MODULE, help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = summarize(measure_imports(args.module), args.module, args.top)
+    if args.json:
+        report_dict = report.to_dict()
+        report_dict.pop("imported")
+        print(json.dumps(report_dict, indent=2))
+        return
+
+    print(
+        f"{report.module}: {report.total_ms:.1f} ms, "
+        f"{report.module_count} modules imported"
+    )
+    print("\nSlowest imports (cumulative):")
+    for row in report.top_cumulative:
+        print(f"  {row['ms']:9.1f} ms  {row['module']}")
+    print("\nSlowest imports (self):")
+    for row in report.top_self:
+        print(f"  {row['ms']:9.1f} ms  {row['module']}")
+    eager = [name for name in LAZY_MODULES if name in report.imported]
+    if eager:
+        print(f"\nImported eagerly but expected to be lazy: {', '.join(eager)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""Script to export the data as Parquet or Arrow IPC files partitioned by period."""
+
+import argparse
+from pathlib import Path
+
+from feptm.core.utils import configure_logging
+from feptm.services.data_service import data_service
+from feptm.services.export import EXPORT_FORMATS, ArrowExporter
+
+
+def main() -> None:
+    """Parse arguments and run the export."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        required=True,
+        help="Directory to write the files to",
+    )
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="parquet",
+        help="File format: Parquet or Arrow IPC",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=None,
+        help="Rows per record batch (defaults to EXPORT_BATCH_ROWS)",
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    exporter = ArrowExporter(data_service, batch_rows=args.batch_rows)
+    counts = exporter.write_dataset(args.output_dir, args.format)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
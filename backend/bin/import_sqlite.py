@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""Script to import the JSON data files into the SQLite database."""
+
+import argparse
+from pathlib import Path
+
+from feptm.core.config import settings
+from feptm.core.utils import configure_logging
+from feptm.services.sqlite_data_service import SQLiteDataService
+
+
+def main() -> None:
+    """Parse arguments and run the import."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Directory with the JSON data files (defaults to the bundled data)",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=settings.SQLITE_DB_PATH,
+        help="Path to the SQLite database file",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Replace existing data instead of skipping the import",
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    counts = SQLiteDataService(args.db).import_json(args.data_dir, replace=args.replace)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,6 @@
 import uvicorn
 
 from feptm.core.config import settings
-from feptm.main import app
-
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,13 @@
+"""ASGI middleware for the application."""
+
+from feptm.api.middleware.compression import CompressionMiddleware
+from feptm.api.middleware.metrics import MetricsMiddleware
+from feptm.api.middleware.profiling import ProfilingMiddleware
+from feptm.api.middleware.snapshot import SnapshotMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "SnapshotMiddleware",
+]
@@ -0,0 +1,380 @@
+"""Middleware compressing responses and serving cached representations."""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from feptm.api.middleware.metrics import ROUTE_TEMPLATE_KEY, route_template
+from feptm.core.compression import Codec, available_codecs, negotiate_encoding
+from feptm.core.metrics import registry
+
+# Responses smaller than this are sent uncompressed
+DEFAULT_MIN_SIZE = 1024
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+)
+
+RESPONSE_CACHE_REQUESTS = registry.counter(
+    "feptm_response_cache_requests", "Response cache lookups", ("result",)
+)
+RESPONSE_CACHE_BYTES = registry.gauge(
+    "feptm_response_cache_bytes", "Size of the stored response representations"
+)
+COMPRESSED_RESPONSES = registry.counter(
+    "feptm_compressed_responses", "Responses sent compressed", ("encoding", "mode")
+)
+
+# Resource key: (data version, path, query string)
+ResourceKey = Tuple[Any, str, bytes]
+# Cache key: resource key and content coding, "identity" when uncompressed
+CacheKey = Tuple[Any, str, bytes, str]
+
+
+@dataclass
+class CachedResponse:
+    """One representation of a response."""
+
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    # Template of the route that produced the response, for request metrics
+    route: str
+
+    @property
+    def size(self) -> int:
+        """Size of the body in bytes."""
+        return len(self.body)
+
+
+class ResponseCache:
+    """LRU cache of response representations bounded by total size.
+
+    Entries are keyed by the data version they were produced for, so
+    requests pinned to different versions share the cache, and entries of
+    superseded versions are evicted once they are the least recently used.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of the stored bodies
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        """Get a stored representation, marking it as recently used.
+
+        Args:
+            key: Cache key of the representation
+
+        Returns:
+            Cached response, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: CacheKey, entry: CachedResponse) -> None:
+        """Store a representation, evicting least recently used entries as needed.
+
+        Args:
+            key: Cache key of the representation
+            entry: Representation to store
+        """
+        with self._lock:
+            self._remove(key)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.size += entry.size
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            RESPONSE_CACHE_BYTES.set(0)
+
+    def _remove(self, key: CacheKey) -> None:
+        """Remove an entry; the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+            RESPONSE_CACHE_BYTES.set(self.size)
+
+    def _evict(self) -> None:
+        """Evict entries until the size limit holds; the lock must be held."""
+        while self.size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+        RESPONSE_CACHE_BYTES.set(self.size)
+
+
+def _is_compressible(headers: Headers) -> bool:
+    """Check whether a response can be compressed."""
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return (
+        content_type.startswith("text/")
+        or content_type in COMPRESSIBLE_TYPES
+        or content_type.endswith("+json")
+    )
+
+
+def _is_cacheable(status: int, headers: Headers) -> bool:
+    """Check whether a response may be stored in the response cache."""
+    cache_control = headers.get("cache-control", "").lower()
+    return (
+        status == 200
+        and "no-store" not in cache_control
+        and "private" not in cache_control
+    )
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware negotiating zstd/gzip and caching representations.
+
+    Successful GET responses under the cached path prefixes are stored per
+    data version, unless the request asks to bypass caches with
+    Cache-Control: no-cache. Each encoding of a stored response is compressed
+    once, on the first request that asks for it, and then served as stored bytes.
+    Streamed responses are compressed incrementally and flushed per chunk.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        version_of: Callable[[], Any],
+        cache_max_bytes: int,
+        cached_prefixes: Tuple[str, ...] = ("/api/",),
+        excluded_prefixes: Tuple[str, ...] = ("/api/admin",),
+        min_size: int = DEFAULT_MIN_SIZE,
+    ):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            version_of: Function returning the current data version
+            cache_max_bytes: Size limit of the response cache, 0 to disable caching
+            cached_prefixes: Path prefixes of cacheable requests
+            excluded_prefixes: Path prefixes that are never cached
+            min_size: Minimum body size to compress
+        """
+        self.app = app
+        self.version_of = version_of
+        self.cache = ResponseCache(cache_max_bytes) if cache_max_bytes > 0 else None
+        self.cached_prefixes = cached_prefixes
+        self.excluded_prefixes = excluded_prefixes
+        self.min_size = min_size
+        self.codecs: Dict[str, Codec] = available_codecs()
+        self._supported = list(self.codecs)
+
+    def _resource_key(
+        self, scope: Dict[str, Any], headers: Headers
+    ) -> Optional[ResourceKey]:
+        """Get the resource key of a request, or None if it is not cacheable."""
+        if self.cache is None or scope["method"] != "GET" or "x-profile" in headers:
+            return None
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return None
+        path = scope["path"]
+        if not path.startswith(self.cached_prefixes) or path.startswith(
+            self.excluded_prefixes
+        ):
+            return None
+        return self.version_of(), path, scope.get("query_string", b"")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(
+            request_headers.get("accept-encoding"), self._supported
+        )
+        key = self._resource_key(scope, request_headers)
+
+        if key is not None:
+            identity = self.cache.get(key + ("identity",))
+            if identity is not None:
+                RESPONSE_CACHE_REQUESTS.labels("hit").inc()
+                scope[ROUTE_TEMPLATE_KEY] = identity.route
+                await self._send_cached(key, identity, encoding, send)
+                return
+            RESPONSE_CACHE_REQUESTS.labels("miss").inc()
+
+        await self._forward(scope, receive, send, encoding, key)
+
+    def _representation(
+        self, key: ResourceKey, identity: CachedResponse, encoding: Optional[str]
+    ) -> Tuple[Optional[str], CachedResponse]:
+        """Get a stored response in the requested encoding, compressing it on first use.
+
+        Args:
+            key: Resource key of the response
+            identity: Uncompressed representation of the response
+            encoding: Negotiated content coding, None for identity
+
+        Returns:
+            Encoding actually used (None for identity) and the representation
+        """
+        if encoding is None or identity.size < self.min_size:
+            return None, identity
+        entry = self.cache.get(key + (encoding,))
+        if entry is None:
+            entry = CachedResponse(
+                status=identity.status,
+                headers=identity.headers,
+                body=self.codecs[encoding].compress(identity.body),
+                route=identity.route,
+            )
+            self.cache.put(key + (encoding,), entry)
+        return encoding, entry
+
+    async def _send_cached(
+        self,
+        key: ResourceKey,
+        identity: CachedResponse,
+        encoding: Optional[str],
+        send: Any,
+    ) -> None:
+        """Send a stored response."""
+        used, entry = self._representation(key, identity, encoding)
+        headers = MutableHeaders(raw=list(entry.headers))
+        self._set_encoding_headers(headers, used, entry.size)
+        if used is not None:
+            COMPRESSED_RESPONSES.labels(used, "cached").inc()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": headers.raw,
+            }
+        )
+        await send({"type": "http.response.body", "body": entry.body})
+
+    @staticmethod
+    def _set_encoding_headers(
+        headers: MutableHeaders, encoding: Optional[str], length: Optional[int]
+    ) -> None:
+        """Set Content-Encoding, Content-Length and Vary for a representation."""
+        vary = headers.get("vary")
+        if not vary:
+            headers["Vary"] = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["Vary"] = f"{vary}, Accept-Encoding"
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        if length is None:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(length)
+
+    async def _forward(
+        self,
+        scope: Dict[str, Any],
+        receive: Any,
+        send: Any,
+        encoding: Optional[str],
+        key: Optional[ResourceKey],
+    ) -> None:
+        """Call the application, compressing and storing its response."""
+        start_message: Optional[Dict[str, Any]] = None
+        stream = None
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal start_message, stream
+            if message["type"] == "http.response.start":
+                # Hold the start until the first body chunk shows whether the
+                # response is streamed
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(scope=start)
+                if not more_body:
+                    await self._send_complete(
+                        scope, start, headers, body, encoding, key, send
+                    )
+                    return
+                if encoding is not None and _is_compressible(headers):
+                    stream = self.codecs[encoding].stream()
+                    self._set_encoding_headers(headers, encoding, None)
+                    COMPRESSED_RESPONSES.labels(encoding, "stream").inc()
+                await send(start)
+
+            if stream is not None:
+                body = (
+                    stream.compress(body)
+                    if more_body
+                    else stream.compress(body) + stream.finish()
+                )
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
+        if start_message is not None:
+            await send(start_message)
+
+    async def _send_complete(
+        self,
+        scope: Dict[str, Any],
+        start: Dict[str, Any],
+        headers: MutableHeaders,
+        body: bytes,
+        encoding: Optional[str],
+        key: Optional[ResourceKey],
+        send: Any,
+    ) -> None:
+        """Send a response whose body arrived in one message."""
+        status = start["status"]
+        compressible = _is_compressible(headers)
+
+        if key is not None and compressible and _is_cacheable(status, headers):
+            identity = CachedResponse(
+                status=status,
+                headers=list(headers.raw),
+                body=body,
+                route=route_template(scope),
+            )
+            self.cache.put(key + ("identity",), identity)
+            await self._send_cached(key, identity, encoding, send)
+            return
+
+        if encoding is not None and compressible and len(body) >= self.min_size:
+            body = self.codecs[encoding].compress(body)
+            self._set_encoding_headers(headers, encoding, len(body))
+            COMPRESSED_RESPONSES.labels(encoding, "once").inc()
+        elif compressible:
+            self._set_encoding_headers(headers, None, len(body))
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,105 @@
+"""Middleware recording request metrics."""
+
+import time
+from typing import Any, Dict
+
+from feptm.core.metrics import SIZE_BUCKETS, registry
+
+# Label for requests that did not match any route, so unknown paths
+# cannot create an unbounded number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Scope key holding the route template of a response sent without routing,
+# such as one from the response cache
+ROUTE_TEMPLATE_KEY = "feptm.route_template"
+
+REQUESTS = registry.counter(
+    "feptm_http_requests",
+    "HTTP requests by route and status",
+    ("method", "route", "status"),
+)
+REQUEST_SECONDS = registry.histogram(
+    "feptm_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route"),
+)
+RESPONSE_BYTES = registry.histogram(
+    "feptm_http_response_size_bytes",
+    "HTTP response body size by route",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS,
+)
+IN_FLIGHT = registry.gauge(
+    "feptm_http_requests_in_flight", "HTTP requests being processed", ("method",)
+)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """Get the path template of the route that handled a request.
+
+    FastAPI resolves routes of included routers lazily and keeps the full
+    template in its effective route context; older versions copy included
+    routes with the prefix applied, so the route path is already complete.
+    Middleware answering without routing stores the template under
+    ROUTE_TEMPLATE_KEY.
+
+    Args:
+        scope: ASGI scope after routing
+
+    Returns:
+        Path template, or UNMATCHED_ROUTE
+    """
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = (
+        scope.get(ROUTE_TEMPLATE_KEY)
+        or getattr(context, "path", None)
+        or getattr(scope.get("route"), "path", None)
+    )
+    return path or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and response size per route.
+
+    Routes are labelled by their path template, e.g. /api/projects/{project_id},
+    which the router stores in the request scope once it has matched.
+    """
+
+    def __init__(self, app: Any):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            route_path = route_template(scope)
+            REQUESTS.labels(method, route_path, str(status)).inc()
+            REQUEST_SECONDS.labels(method, route_path).observe(elapsed)
+            RESPONSE_BYTES.labels(method, route_path).observe(size)
@@ -0,0 +1,117 @@
+"""Middleware profiling single requests on demand."""
+
+import json
+import threading
+from typing import Any, Dict
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+
+from feptm.core.profiling import PROFILE_FORMATS, SamplingProfiler, request_profiler
+from feptm.core.security import API_KEY_HEADER, is_valid_api_key
+
+PROFILE_HEADER = "X-Profile"
+
+# Requests are short, so they are sampled more often than whole workers
+REQUEST_PROFILE_INTERVAL = 0.001
+
+
+def profile_response(
+    profiler: SamplingProfiler, profile_format: str, name: str
+) -> Response:
+    """Build a response with the profile in the requested format.
+
+    Args:
+        profiler: Stopped profiler with samples
+        profile_format: 'collapsed' or 'speedscope'
+        name: Name of the profile, also used for the file name
+
+    Returns:
+        Response with the profile as an attachment
+    """
+    headers = {
+        "X-Profile-Samples": str(profiler.sample_count),
+        "Cache-Control": "no-store",
+    }
+    if profile_format == "speedscope":
+        headers["Content-Disposition"] = (
+            f'attachment; filename="{name}.speedscope.json"'
+        )
+        return Response(
+            content=json.dumps(profiler.to_speedscope(name)),
+            media_type="application/json",
+            headers=headers,
+        )
+    headers["Content-Disposition"] = f'attachment; filename="{name}.collapsed.txt"'
+    return Response(
+        content=profiler.to_collapsed(), media_type="text/plain", headers=headers
+    )
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling a request when the X-Profile header is set.
+
+    The header value selects the output format ('collapsed' or 'speedscope').
+    The request must also carry the admin API key. The endpoint's own
+    response is discarded and the profile of the thread that handled the
+    request is returned instead, with the original status in
+    X-Profiled-Status. For async endpoints that thread is the event loop,
+    so concurrent requests on the same worker appear in the profile too.
+
+    Worker threads are sampled while they run request code under
+    profiled_thread(), such as report computations. A report computed for
+    coalesced requests appears only in the profile of the request that
+    started it. Synchronous endpoints run in the thread pool outside
+    profiled_thread() and are not sampled.
+    """
+
+    def __init__(self, app: Any):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+        """
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Handle an ASGI call."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        profile_format = headers.get(PROFILE_HEADER)
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not is_valid_api_key(headers.get(API_KEY_HEADER)):
+            response = JSONResponse(
+                {"detail": "Profiling requires a valid API key"}, status_code=403
+            )
+            await response(scope, receive, send)
+            return
+        profile_format = profile_format.strip().lower() or "collapsed"
+        if profile_format not in PROFILE_FORMATS:
+            response = JSONResponse(
+                {"detail": f"Invalid profile format: {profile_format}"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        with SamplingProfiler(
+            interval=REQUEST_PROFILE_INTERVAL, thread_ids=[threading.get_ident()]
+        ) as profiler:
+            with request_profiler(profiler):
+                await self.app(scope, receive, discard)
+
+        response = profile_response(profiler, profile_format, "request")
+        response.headers["X-Profiled-Status"] = str(status)
+        await response(scope, receive, send)
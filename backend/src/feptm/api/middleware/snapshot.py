@@ -0,0 +1,29 @@
+"""Middleware pinning one generation of the data for each request."""
+
+from typing import Any, Callable, ContextManager, Dict
+
+
+class SnapshotMiddleware:
+    """Pure ASGI middleware running each HTTP request inside a data pin.
+
+    All reads a request makes, including those of the endpoint and of the
+    middleware inside this one, see the same generation of the data, so a
+    report never mixes data from before and after a concurrent write.
+    """
+
+    def __init__(self, app: Any, pin: Callable[[], ContextManager[None]]):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            pin: Context manager factory pinning the data, usually data_service.pin
+        """
+        self.app = app
+        self.pin = pin
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with self.pin():
+            await self.app(scope, receive, send)
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from feptm.api.v1 import projects, specialists, timesheets, periods, reports
+from feptm.api.v1 import projects, specialists, timesheets, periods, reports, search, export, admin, batch
 
 # Create API router
 router = APIRouter()
@@ -22,4 +22,17 @@ router.include_router(
 )
 router.include_router(
     reports.router, prefix="/reports", tags=["reports"]
-) 
\ No newline at end of file
+)
+router.include_router(
+    search.router, prefix="/search", tags=["search"]
+)
+router.include_router(
+    export.router, prefix="/export", tags=["export"]
+)
+router.include_router(
+    admin.router, prefix="/admin", tags=["admin"]
+)
+router.include_router(
+    batch.router
+)
+
@@ -0,0 +1,78 @@
+"""Administrative API endpoints."""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from feptm.api.middleware.profiling import profile_response
+from feptm.core.profiling import PROFILE_FORMATS, SamplingProfiler
+from feptm.core.security import require_api_key
+from feptm.services.data_service import data_service
+from feptm.services.mutations import StorageError
+
+router = APIRouter(dependencies=[Depends(require_api_key)])
+
+# Only one on-demand profile runs per worker at a time
+_profile_lock = asyncio.Lock()
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(
+        5.0, gt=0, le=60, description="Profiling duration in seconds"
+    ),
+    interval_ms: float = Query(
+        5.0, ge=1, le=1000, description="Time between samples in milliseconds"
+    ),
+    format: str = Query(
+        "collapsed", description="Output format: 'collapsed' or 'speedscope'"
+    ),
+):
+    """Profile all threads of this worker for a number of seconds.
+
+    Args:
+        seconds: Profiling duration in seconds
+        interval_ms: Time between samples in milliseconds
+        format: Output format, collapsed stacks or a speedscope file
+
+    Returns:
+        Profile as a file attachment
+
+    Raises:
+        HTTPException: If the format is invalid or a profile is already running
+    """
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid profile format: {format}")
+    if _profile_lock.locked():
+        raise HTTPException(
+            status_code=409, detail="A profile is already running on this worker"
+        )
+
+    async with _profile_lock:
+        with SamplingProfiler(interval=interval_ms / 1000) as profiler:
+            await asyncio.sleep(seconds)
+
+    return profile_response(profiler, format, "worker")
+
+
+@router.post("/compact")
+def compact_storage():
+    """Compact the data store: snapshot the journal or checkpoint the SQLite log.
+
+    Returns:
+        Result of the compaction
+
+    Raises:
+        HTTPException: If the data store has nothing to compact, or the
+            journal cannot be written
+    """
+    try:
+        result = data_service.compact()
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if result is None:
+        raise HTTPException(
+            status_code=409,
+            detail="No journal to compact, set JOURNAL_DIR to enable it",
+        )
+    return result
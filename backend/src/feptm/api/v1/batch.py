@@ -0,0 +1,91 @@
+"""API endpoints for batch lookups by ID."""
+
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from feptm.models import Project, Specialist
+from feptm.models.expanded import ExpandedProject
+from feptm.services.data_service import data_service
+from feptm.services.expand import PROJECT_EXPANSIONS, expand_projects, parse_expand
+
+router = APIRouter()
+
+# Maximum number of IDs in one batch request
+MAX_BATCH_SIZE = 1000
+
+
+class BatchGetRequest(BaseModel):
+    """Model for a batch lookup request."""
+
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class SpecialistBatch(BaseModel):
+    """Model for the result of a specialist batch lookup."""
+
+    items: List[Specialist]
+    not_found: List[str]
+
+
+class ProjectBatch(BaseModel):
+    """Model for the result of a project batch lookup."""
+
+    items: List[Union[ExpandedProject, Project]]
+    not_found: List[str]
+
+
+@router.post(
+    "/specialists:batchGet", response_model=SpecialistBatch, tags=["specialists"]
+)
+async def batch_get_specialists(request: BatchGetRequest):
+    """Get several specialists by ID in one request.
+
+    Args:
+        request: IDs of the specialists
+
+    Returns:
+        Found specialists in the order of the IDs, and the IDs that were not found
+    """
+    ids = list(dict.fromkeys(request.ids))
+    found = data_service.get_by_ids("specialists", ids)
+    return SpecialistBatch(
+        items=list(found.values()),
+        not_found=[item_id for item_id in ids if item_id not in found],
+    )
+
+
+@router.post("/projects:batchGet", response_model=ProjectBatch, tags=["projects"])
+async def batch_get_projects(
+    request: BatchGetRequest,
+    expand: Optional[str] = Query(
+        None, description="Related objects to include: 'specialists'"
+    ),
+):
+    """Get several projects by ID in one request.
+
+    Args:
+        request: IDs of the projects
+        expand: Related objects to include
+
+    Returns:
+        Found projects in the order of the IDs, and the IDs that were not found
+
+    Raises:
+        HTTPException: If expand names an unsupported relation
+    """
+    try:
+        relations = parse_expand(expand, PROJECT_EXPANSIONS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    ids = list(dict.fromkeys(request.ids))
+    found = data_service.get_by_ids("projects", ids)
+    projects = list(found.values())
+    if relations:
+        projects = expand_projects(data_service, projects, relations)
+    return ProjectBatch(
+        items=projects,
+        not_found=[item_id for item_id in ids if item_id not in found],
+    )
@@ -0,0 +1,66 @@
+"""API endpoints for analytical export as Arrow streams."""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+
+from feptm.services.data_service import data_service
+from feptm.services.export import (
+    ARROW_STREAM_MEDIA_TYPE,
+    EXPORT_TABLES,
+    ExportUnavailableError,
+    arrow_exporter,
+    load_pyarrow,
+)
+
+router = APIRouter()
+
+
+@router.get("/{table}", response_class=StreamingResponse)
+async def export_table(
+    table: str = Path(
+        ...,
+        description=(
+            "Table to export: 'time_entries', 'specialists', 'projects' "
+            "or 'payment_periods'"
+        ),
+    ),
+    period_id: Optional[str] = Query(
+        None, description="Only export the time entries of this payment period"
+    ),
+):
+    """Stream a table as an Arrow IPC stream of record batches.
+
+    Args:
+        table: Table to export
+        period_id: Only export the time entries of this payment period
+
+    Returns:
+        Arrow IPC stream, read with pyarrow.ipc.open_stream
+
+    Raises:
+        HTTPException: If the table or period is not found, or pyarrow is not installed
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Export table {table} not found")
+    if period_id is not None:
+        if table != "time_entries":
+            raise HTTPException(
+                status_code=400,
+                detail="Only time entries can be exported for a single period",
+            )
+        if not data_service.payment_period_exists(period_id):
+            raise HTTPException(
+                status_code=404, detail=f"Payment period with ID {period_id} not found"
+            )
+    try:
+        load_pyarrow()
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return StreamingResponse(
+        arrow_exporter.stream(table, period_id),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{table}.arrows"'},
+    )
@@ -1,35 +1,116 @@
 """API endpoints for payment periods."""
 
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from feptm.models import PaymentPeriod
-from feptm.models.payment import TimeEntry
-from feptm.services.mock_data_service import mock_data_service
+from feptm.models.expanded import ExpandedTimeEntry
+from feptm.models.payment import (
+    PaymentPeriodCreate,
+    PaymentPeriodUpdate,
+    TimeEntry,
+    TimeEntryCreate,
+)
+from feptm.services.data_service import data_service
+from feptm.services.expand import (
+    TIME_ENTRY_EXPANSIONS,
+    expand_time_entries,
+    parse_expand,
+)
+from feptm.services.mutations import StorageError
+from feptm.services.query import run_query
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PaymentPeriod])
 async def get_payment_periods(
-    status: Optional[str] = Query(None, description="Filter by status")
+    status: Optional[str] = Query(None, description="Filter by status"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort by comma-separated fields, prefix with '-' for descending",
+    ),
 ):
     """Get all payment periods with optional filtering.
     
     Args:
         status: Filter by payment status
+        sort: Fields to sort by
     
     Returns:
         List of payment periods
+
+    Raises:
+        HTTPException: If the sort field is not supported
     """
     filters = {}
     if status is not None:
         filters["status"] = status
+    if sort is not None:
+        filters["order_by"] = sort
         
-    periods = mock_data_service.get_filtered_data("payment_periods", filters)
+    try:
+        periods = data_service.get_filtered_data("payment_periods", filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return periods
 
 
+@router.post("/", response_model=PaymentPeriod, status_code=201)
+def create_payment_period(period: PaymentPeriodCreate):
+    """Create a payment period.
+
+    Runs in the threadpool, as the change is synced to the journal.
+
+    Args:
+        period: Payment period data
+
+    Returns:
+        Created payment period
+
+    Raises:
+        HTTPException: If the period ends before it starts, or the journal
+            cannot be written
+    """
+    try:
+        return data_service.create_payment_period(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.patch("/{period_id}", response_model=PaymentPeriod)
+def update_payment_period(
+    changes: PaymentPeriodUpdate,
+    period_id: str = Path(..., description="The ID of the payment period to update"),
+):
+    """Update fields of a payment period.
+
+    Args:
+        changes: Fields to change
+        period_id: ID of the payment period
+
+    Returns:
+        Updated payment period
+
+    Raises:
+        HTTPException: If payment period not found, the new dates are invalid,
+            or the change cannot be stored
+    """
+    try:
+        period = data_service.update_payment_period(period_id, changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if period is None:
+        raise HTTPException(
+            status_code=404, detail=f"Payment period with ID {period_id} not found"
+        )
+    return period
+
+
 @router.get("/{period_id}", response_model=PaymentPeriod)
 async def get_payment_period(
     period_id: str = Path(..., description="The ID of the payment period to get")
@@ -45,17 +126,27 @@ async def get_payment_period(
     Raises:
         HTTPException: If payment period not found
     """
-    period = mock_data_service.get_payment_period(period_id)
+    period = data_service.get_payment_period(period_id)
     if period is None:
         raise HTTPException(status_code=404, detail=f"Payment period with ID {period_id} not found")
     return period
 
 
-@router.get("/{period_id}/time-entries", response_model=List[TimeEntry])
+@router.get(
+    "/{period_id}/time-entries",
+    response_model=List[Union[ExpandedTimeEntry, TimeEntry]],
+)
 async def get_period_time_entries(
     period_id: str = Path(..., description="The ID of the payment period"),
     specialist_id: Optional[str] = Query(None, description="Filter by specialist ID"),
-    project_id: Optional[str] = Query(None, description="Filter by project ID")
+    project_id: Optional[str] = Query(None, description="Filter by project ID"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort by comma-separated fields, prefix with '-' for descending",
+    ),
+    expand: Optional[str] = Query(
+        None, description="Related objects to include: 'specialist', 'project'"
+    ),
 ):
     """Get time entries for a payment period with optional filtering.
     
@@ -63,22 +154,66 @@ async def get_period_time_entries(
         period_id: ID of the payment period
         specialist_id: Filter by specialist ID
         project_id: Filter by project ID
+        sort: Fields to sort by
+        expand: Related objects to include
     
     Returns:
         List of time entries
         
     Raises:
-        HTTPException: If payment period not found
+        HTTPException: If payment period not found, or the sort field or an
+            expanded relation is not supported
     """
-    period = mock_data_service.get_payment_period(period_id)
+    period = data_service.get_payment_period(period_id)
     if period is None:
         raise HTTPException(status_code=404, detail=f"Payment period with ID {period_id} not found")
     
-    # Filter time entries if needed
-    entries = period.time_entries
-    if specialist_id is not None:
-        entries = [e for e in entries if e.specialist_id == specialist_id]
-    if project_id is not None:
-        entries = [e for e in entries if e.project_id == project_id]
+    filters = {
+        "specialist_id": specialist_id,
+        "project_id": project_id,
+        "order_by": sort,
+    }
         
-    return entries 
\ No newline at end of file
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+
+    try:
+        relations = parse_expand(expand, TIME_ENTRY_EXPANSIONS)
+        entries = run_query("time_entries", period.time_entries, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if relations:
+        return expand_time_entries(data_service, entries, relations)
+    return entries 
+
+
+@router.post("/{period_id}/time-entries", response_model=TimeEntry, status_code=201)
+def add_period_time_entry(
+    entry: TimeEntryCreate,
+    period_id: str = Path(..., description="The ID of the payment period"),
+):
+    """Add a time entry to a payment period.
+
+    Args:
+        entry: Time entry data
+        period_id: ID of the payment period
+
+    Returns:
+        Created time entry
+
+    Raises:
+        HTTPException: If payment period not found, the specialist or project
+            does not exist, the date is outside the period, or the journal
+            cannot be written
+    """
+    try:
+        created = data_service.add_time_entry(period_id, entry)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if created is None:
+        raise HTTPException(
+            status_code=404, detail=f"Payment period with ID {period_id} not found"
+        )
+    return created
@@ -1,54 +1,86 @@
 """API endpoints for projects."""
 
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from feptm.models import Project
-from feptm.services.mock_data_service import mock_data_service
+from feptm.models.expanded import ExpandedProject
+from feptm.services.data_service import data_service
+from feptm.services.expand import PROJECT_EXPANSIONS, expand_projects, parse_expand
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Project])
+@router.get("/", response_model=List[Union[ExpandedProject, Project]])
 async def get_projects(
     status: Optional[str] = Query(None, description="Filter by status"),
-    project_type: Optional[str] = Query(None, description="Filter by project type")
+    project_type: Optional[str] = Query(None, description="Filter by project type"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort by comma-separated fields, prefix with '-' for descending",
+    ),
+    expand: Optional[str] = Query(
+        None, description="Related objects to include: 'specialists'"
+    ),
 ):
     """Get all projects with optional filtering.
     
     Args:
         status: Filter by project status
         project_type: Filter by project type
+        sort: Fields to sort by
+        expand: Related objects to include
     
     Returns:
         List of projects
+
+    Raises:
+        HTTPException: If the sort field or an expanded relation is not supported
     """
     filters = {}
     if status is not None:
         filters["status"] = status
     if project_type is not None:
         filters["project_type"] = project_type
+    if sort is not None:
+        filters["order_by"] = sort
         
-    projects = mock_data_service.get_filtered_data("projects", filters)
+    try:
+        relations = parse_expand(expand, PROJECT_EXPANSIONS)
+        projects = data_service.get_filtered_data("projects", filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if relations:
+        return expand_projects(data_service, projects, relations)
     return projects
 
 
-@router.get("/{project_id}", response_model=Project)
+@router.get("/{project_id}", response_model=Union[ExpandedProject, Project])
 async def get_project(
-    project_id: str = Path(..., description="The ID of the project to get")
+    project_id: str = Path(..., description="The ID of the project to get"),
+    expand: Optional[str] = Query(
+        None, description="Related objects to include: 'specialists'"
+    ),
 ):
     """Get a project by ID.
     
     Args:
         project_id: ID of the project
+        expand: Related objects to include
     
     Returns:
         Project if found
         
     Raises:
-        HTTPException: If project not found
+        HTTPException: If project not found or an expanded relation is not supported
     """
-    project = mock_data_service.get_project(project_id)
+    try:
+        relations = parse_expand(expand, PROJECT_EXPANSIONS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    project = data_service.get_project(project_id)
     if project is None:
         raise HTTPException(status_code=404, detail=f"Project with ID {project_id} not found")
+    if relations:
+        return expand_projects(data_service, [project], relations)[0]
     return project 
\ No newline at end of file
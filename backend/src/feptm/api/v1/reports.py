@@ -1,11 +1,12 @@
 """API endpoints for reports."""
 
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
-from feptm.services.mock_data_service import mock_data_service
+from feptm.services.data_service import data_service
+from feptm.services.reports import report_service
 
 router = APIRouter()
 
@@ -43,40 +44,13 @@ async def get_specialist_reports(
     Returns:
         List of specialist reports
     """
-    # Get the relevant payment period
-    if period_id:
-        period = mock_data_service.get_payment_period(period_id)
-        if period is None:
-            raise HTTPException(status_code=404, detail=f"Payment period with ID {period_id} not found")
-        periods = [period]
-    else:
-        periods = mock_data_service.get_payment_periods()
+    if period_id and not data_service.payment_period_exists(period_id):
+        raise HTTPException(
+            status_code=404, detail=f"Payment period with ID {period_id} not found"
+        )
     
-    # Get all specialists
-    specialists = mock_data_service.get_specialists()
-    specialist_map = {s.id: s for s in specialists}
-    
-    # Prepare report data
-    report_data: Dict[str, SpecialistReport] = {}
-    
-    for period in periods:
-        for specialist_id, hours in period.specialist_totals.items():
-            if specialist_id in specialist_map:
-                specialist = specialist_map[specialist_id]
-                if specialist_id not in report_data:
-                    report_data[specialist_id] = SpecialistReport(
-                        specialist_id=specialist_id,
-                        full_name=specialist.full_name,
-                        role=specialist.role.value,
-                        total_hours=0,
-                        hourly_rate=specialist.hourly_rate,
-                        total_amount=0
-                    )
-                
-                report_data[specialist_id].total_hours += hours
-                report_data[specialist_id].total_amount = report_data[specialist_id].total_hours * specialist.hourly_rate
-    
-    return list(report_data.values())
+    rows = await report_service.get("specialists", period_id or None)
+    return [SpecialistReport(**row) for row in rows]
 
 
 @router.get("/projects", response_model=List[ProjectReport])
@@ -91,46 +65,10 @@ async def get_project_reports(
     Returns:
         List of project reports
     """
-    # Get the relevant payment period
-    if period_id:
-        period = mock_data_service.get_payment_period(period_id)
-        if period is None:
-            raise HTTPException(status_code=404, detail=f"Payment period with ID {period_id} not found")
-        periods = [period]
-    else:
-        periods = mock_data_service.get_payment_periods()
-    
-    # Get all projects
-    projects = mock_data_service.get_projects()
-    project_map = {p.id: p for p in projects}
-    
-    # Prepare report data
-    report_data: Dict[str, ProjectReport] = {}
-    
-    for period in periods:
-        # Count specialists per project in this period
-        specialists_per_project: Dict[str, set] = {}
-        
-        for entry in period.time_entries:
-            project_id = entry.project_id
-            if project_id not in specialists_per_project:
-                specialists_per_project[project_id] = set()
-            specialists_per_project[project_id].add(entry.specialist_id)
-        
-        # Update report data
-        for project_id, hours in period.project_totals.items():
-            if project_id in project_map:
-                project = project_map[project_id]
-                if project_id not in report_data:
-                    report_data[project_id] = ProjectReport(
-                        project_id=project_id,
-                        name=project.name,
-                        client_name=project.client_name,
-                        total_hours=0,
-                        specialist_count=0
-                    )
-                
-                report_data[project_id].total_hours += hours
-                report_data[project_id].specialist_count = len(specialists_per_project.get(project_id, set()))
+    if period_id and not data_service.payment_period_exists(period_id):
+        raise HTTPException(
+            status_code=404, detail=f"Payment period with ID {period_id} not found"
+        )
     
-    return list(report_data.values()) 
\ No newline at end of file
+    rows = await report_service.get("projects", period_id or None)
+    return [ProjectReport(**row) for row in rows]
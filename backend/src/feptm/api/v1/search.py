@@ -0,0 +1,72 @@
+"""API endpoints for full-text search."""
+
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from feptm.models import Project
+from feptm.models.payment import TimeEntry
+from feptm.services.search import search_service
+
+router = APIRouter()
+
+
+class SearchHit(BaseModel):
+    """Model for a single search result."""
+
+    scope: str
+    score: float
+    item: Union[TimeEntry, Project]
+
+
+class SearchResults(BaseModel):
+    """Model for a page of search results."""
+
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchHit]
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, description="Search query"),
+    scope: Optional[str] = Query(
+        None, description="Search only 'entries' or 'projects'"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+):
+    """Search time entry descriptions and project names, descriptions and clients.
+
+    Args:
+        q: Search query
+        scope: Restrict the search to time entries or projects
+        limit: Maximum number of results
+        offset: Number of results to skip
+
+    Returns:
+        Ranked page of search results
+
+    Raises:
+        HTTPException: If scope is invalid
+    """
+    try:
+        total, results = await search_service.search(
+            q, scope=scope, limit=limit, offset=offset
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SearchResults(
+        query=q,
+        total=total,
+        limit=limit,
+        offset=offset,
+        results=[
+            SearchHit(scope=name, score=score, item=item)
+            for name, score, item in results
+        ],
+    )
@@ -4,7 +4,10 @@ from fastapi import APIRouter, HTTPException, Query, Path
 from typing import List, Optional
 
 from feptm.models import Specialist
-from feptm.services.mock_data_service import mock_data_service
+from feptm.models.specialist import SpecialistUpdate
+from feptm.services.data_service import data_service
+from feptm.services.mutations import StorageError
+from feptm.services.propagation import propagation_service
 
 router = APIRouter()
 
@@ -12,24 +15,37 @@ router = APIRouter()
 @router.get("/", response_model=List[Specialist])
 async def get_specialists(
     active: Optional[bool] = Query(None, description="Filter by active status"),
-    role: Optional[str] = Query(None, description="Filter by role")
+    role: Optional[str] = Query(None, description="Filter by role"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort by comma-separated fields, prefix with '-' for descending",
+    ),
 ):
     """Get all specialists with optional filtering.
     
     Args:
         active: Filter by active status
         role: Filter by role
+        sort: Fields to sort by
     
     Returns:
         List of specialists
+
+    Raises:
+        HTTPException: If the sort field is not supported
     """
     filters = {}
     if active is not None:
         filters["active"] = active
     if role is not None:
         filters["role"] = role
+    if sort is not None:
+        filters["order_by"] = sort
         
-    specialists = mock_data_service.get_filtered_data("specialists", filters)
+    try:
+        specialists = data_service.get_filtered_data("specialists", filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return specialists
 
 
@@ -48,7 +64,39 @@ async def get_specialist(
     Raises:
         HTTPException: If specialist not found
     """
-    specialist = mock_data_service.get_specialist(specialist_id)
+    specialist = data_service.get_specialist(specialist_id)
+    if specialist is None:
+        raise HTTPException(status_code=404, detail=f"Specialist with ID {specialist_id} not found")
+    return specialist
+
+
+@router.patch("/{specialist_id}", response_model=Specialist)
+def update_specialist(
+    changes: SpecialistUpdate,
+    specialist_id: str = Path(..., description="The ID of the specialist to update"),
+):
+    """Update fields of a specialist.
+
+    Changed fields are written to the timesheets of the specialist's
+    projects in the background.
+
+    Args:
+        changes: Fields to change
+        specialist_id: ID of the specialist
+
+    Returns:
+        Updated specialist
+
+    Raises:
+        HTTPException: If specialist not found, the dates are invalid, or the
+            change cannot be stored
+    """
+    try:
+        specialist = propagation_service.update_specialist(specialist_id, changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     if specialist is None:
         raise HTTPException(status_code=404, detail=f"Specialist with ID {specialist_id} not found")
     return specialist 
\ No newline at end of file
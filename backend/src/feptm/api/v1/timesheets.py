@@ -1,21 +1,35 @@
 """API endpoints for timesheets."""
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Path, Query, Response
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from feptm.models.payment import TimeEntry
-from feptm.services.mock_data_service import mock_data_service
+from feptm.models.expanded import ExpandedTimeEntry
+from feptm.models.payment import TimeEntry, TimeEntryUpdate
+from feptm.services.data_service import data_service
+from feptm.services.expand import (
+    TIME_ENTRY_EXPANSIONS,
+    expand_time_entries,
+    parse_expand,
+)
+from feptm.services.mutations import StorageError
 
 router = APIRouter()
 
 
-@router.get("/time-entries", response_model=List[TimeEntry])
+@router.get("/time-entries", response_model=List[Union[ExpandedTimeEntry, TimeEntry]])
 async def get_time_entries(
     specialist_id: Optional[str] = Query(None, description="Filter by specialist ID"),
     project_id: Optional[str] = Query(None, description="Filter by project ID"),
     start_date: Optional[datetime] = Query(None, description="Filter entries after this date"),
-    end_date: Optional[datetime] = Query(None, description="Filter entries before this date")
+    end_date: Optional[datetime] = Query(None, description="Filter entries before this date"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort by comma-separated fields, prefix with '-' for descending",
+    ),
+    expand: Optional[str] = Query(
+        None, description="Related objects to include: 'specialist', 'project'"
+    ),
 ):
     """Get time entries with optional filtering.
     
@@ -24,19 +38,88 @@ async def get_time_entries(
         project_id: Filter by project ID
         start_date: Filter entries after this date
         end_date: Filter entries before this date
+        sort: Fields to sort by
+        expand: Related objects to include
     
     Returns:
         List of time entries matching the filters
+
+    Raises:
+        HTTPException: If the sort field or an expanded relation is not supported
     """
     filters = {
         "specialist_id": specialist_id,
         "project_id": project_id,
         "start_date": start_date,
-        "end_date": end_date
+        "end_date": end_date,
+        "order_by": sort,
     }
     
     # Remove None values
     filters = {k: v for k, v in filters.items() if v is not None}
     
-    entries = mock_data_service.get_filtered_data("time_entries", filters)
-    return entries 
\ No newline at end of file
+    try:
+        relations = parse_expand(expand, TIME_ENTRY_EXPANSIONS)
+        entries = data_service.get_filtered_data("time_entries", filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if relations:
+        return expand_time_entries(data_service, entries, relations)
+    return entries 
+
+
+@router.patch("/time-entries/{entry_id}", response_model=TimeEntry)
+def update_time_entry(
+    changes: TimeEntryUpdate,
+    entry_id: str = Path(..., description="The ID of the time entry to update"),
+):
+    """Update fields of a time entry.
+
+    Runs in the threadpool, as the change is synced to the journal.
+
+    Args:
+        changes: Fields to change
+        entry_id: ID of the time entry
+
+    Returns:
+        Updated time entry
+
+    Raises:
+        HTTPException: If time entry not found, the specialist or project
+            does not exist, the date is outside the payment period, or the
+            change cannot be stored
+    """
+    try:
+        entry = data_service.update_time_entry(entry_id, changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if entry is None:
+        raise HTTPException(
+            status_code=404, detail=f"Time entry with ID {entry_id} not found"
+        )
+    return entry
+
+
+@router.delete("/time-entries/{entry_id}", status_code=204)
+def delete_time_entry(
+    entry_id: str = Path(..., description="The ID of the time entry to delete")
+):
+    """Delete a time entry.
+
+    Args:
+        entry_id: ID of the time entry
+
+    Raises:
+        HTTPException: If time entry not found, or the change cannot be stored
+    """
+    try:
+        deleted = data_service.delete_time_entry(entry_id)
+    except StorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not deleted:
+        raise HTTPException(
+            status_code=404, detail=f"Time entry with ID {entry_id} not found"
+        )
+    return Response(status_code=204)
@@ -0,0 +1,196 @@
+"""Content codecs for HTTP response compression.
+
+gzip is always available. zstd uses compression.zstd on Python 3.14+ or
+the optional zstandard package, and is not offered when neither exists.
+"""
+
+import gzip
+import zlib
+from typing import Dict, List, Optional, Protocol
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+class StreamCompressor(Protocol):
+    """Incremental compressor for streamed responses."""
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress a chunk and flush it, so the client can decode it right away."""
+        ...
+
+    def finish(self) -> bytes:
+        """End the compressed stream."""
+        ...
+
+
+class Codec(Protocol):
+    """Content coding negotiated through Accept-Encoding."""
+
+    name: str
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a complete body."""
+        ...
+
+    def stream(self) -> StreamCompressor:
+        """Create an incremental compressor."""
+        ...
+
+
+class _GzipStream:
+    """Incremental gzip compressor."""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class GzipCodec:
+    """gzip content coding."""
+
+    name = "gzip"
+
+    def __init__(self, level: int = GZIP_LEVEL):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        # A fixed mtime keeps the output identical for identical bodies
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self) -> _GzipStream:
+        return _GzipStream(self.level)
+
+
+class _StdlibZstdStream:
+    """Incremental zstd compressor based on compression.zstd."""
+
+    def __init__(self, module: object, level: int):
+        self._compressor = module.ZstdCompressor(level)
+        self._flush_block = module.ZstdCompressor.FLUSH_BLOCK
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk, mode=self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _ZstandardStream:
+    """Incremental zstd compressor based on the zstandard package."""
+
+    def __init__(self, module: object, level: int):
+        self._compressor = module.ZstdCompressor(level=level).compressobj()
+        self._flush_block = module.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            self._flush_block
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdCodec:
+    """zstd content coding."""
+
+    name = "zstd"
+
+    def __init__(self, module: object, level: int = ZSTD_LEVEL):
+        """Initialize the codec.
+
+        Args:
+            module: compression.zstd or zstandard
+            level: Compression level
+        """
+        self.module = module
+        self.level = level
+        self._stdlib = module.__name__ == "compression.zstd"
+        self._compressor = None if self._stdlib else module.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._stdlib:
+            return self.module.compress(data, level=self.level)
+        return self._compressor.compress(data)
+
+    def stream(self) -> StreamCompressor:
+        if self._stdlib:
+            return _StdlibZstdStream(self.module, self.level)
+        return _ZstandardStream(self.module, self.level)
+
+
+def _load_zstd() -> Optional[ZstdCodec]:
+    """Create the zstd codec if a zstd implementation is installed."""
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard as zstd
+        except ImportError:
+            return None
+    return ZstdCodec(zstd)
+
+
+def available_codecs() -> Dict[str, Codec]:
+    """Get the supported codecs in order of preference.
+
+    Returns:
+        Codecs by content coding name
+    """
+    codecs: Dict[str, Codec] = {}
+    zstd_codec = _load_zstd()
+    if zstd_codec is not None:
+        codecs["zstd"] = zstd_codec
+    codecs["gzip"] = GzipCodec()
+    return codecs
+
+
+def negotiate_encoding(
+    accept_encoding: Optional[str], supported: List[str]
+) -> Optional[str]:
+    """Choose a content coding from an Accept-Encoding header.
+
+    The client's quality values take precedence; ties are resolved by the
+    order of the supported codings.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding header
+        supported: Supported codings in order of preference
+
+    Returns:
+        Chosen coding, or None for the identity coding
+    """
+    if not accept_encoding:
+        return None
+
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best: Optional[str] = None
+    best_quality = 0.0
+    for coding in supported:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
@@ -24,6 +24,31 @@ class Settings(BaseSettings):
     PORT: int = 8000
     DEBUG: bool = True
     API_KEY: Optional[str] = None
+    # Record request metrics and serve /metrics
+    METRICS_ENABLED: bool = True
+    # Load data in the lifespan hook instead of on first request
+    WARM_UP_ON_STARTUP: bool = True
+    # Negotiate zstd/gzip response compression
+    COMPRESSION_ENABLED: bool = True
+    # Size limit of the response cache, 0 disables it
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Reports memoized per data version, 0 disables the report cache
+    REPORT_CACHE_MAX_ENTRIES: int = 256
+
+    # Data storage settings
+    # "json" or "sqlite"
+    DATA_BACKEND: str = "json"
+    # JSON data files, defaults to the bundled data
+    DATA_DIR: Optional[Path] = None
+    SQLITE_DB_PATH: Path = BASE_DIR / "feptm.db"
+    # Write-ahead journal of JSON backend changes, None keeps them in memory
+    JOURNAL_DIR: Optional[Path] = None
+    # Time a group commit waits for more writes before syncing
+    JOURNAL_COMMIT_DELAY_MS: float = 1.0
+    # Journal size that triggers a new snapshot, 0 disables
+    JOURNAL_COMPACT_BYTES: int = 16 * 1024 * 1024
+    # Rows per record batch of Arrow and Parquet exports
+    EXPORT_BATCH_ROWS: int = 65536
 
     # Google API settings
     GOOGLE_CREDENTIALS_FILE: Optional[Path] = None
@@ -32,6 +57,10 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_SECRET: Optional[str] = None
     GOOGLE_TIMESHEET_TEMPLATE_ID: Optional[str] = None
     GOOGLE_REPORT_TEMPLATE_ID: Optional[str] = None
+    # "google" to update linked spreadsheets, "fake" keeps updates in memory
+    SHEETS_CLIENT: str = "fake"
+    # Time changes are collected and coalesced before dispatch
+    SHEETS_DISPATCH_DELAY_MS: float = 250.0
 
     # Model configurations
     SPECIALIST_ROLES: list[str] = Field(
@@ -0,0 +1,246 @@
+"""Sampling profiler for live workers.
+
+A background thread periodically captures the Python stacks of the
+profiled threads with sys._current_frames(). The profiled code is not
+instrumented, so the overhead is limited to the sampling thread itself.
+
+A profiler set as the request profiler also samples the worker threads
+that request code runs in profiled_thread(), since the context, and
+with it the profiler, follows the request into asyncio.to_thread().
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import FrameType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Default time between samples in seconds
+DEFAULT_INTERVAL = 0.005
+
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+# Frame identity: (function name, file name, first line of the function)
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+
+def _frame_key(frame: FrameType) -> Frame:
+    """Identify the function of a stack frame."""
+    code = frame.f_code
+    return code.co_qualname, code.co_filename, code.co_firstlineno
+
+
+def _walk_stack(frame: Optional[FrameType]) -> Stack:
+    """Collect a stack from the outermost to the innermost frame."""
+    frames = []
+    while frame is not None:
+        frames.append(_frame_key(frame))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling thread stacks at a fixed interval.
+
+    Usage:
+        with SamplingProfiler() as profiler:
+            ...
+        profiler.to_collapsed()
+    """
+
+    def __init__(
+        self, interval: float = DEFAULT_INTERVAL, thread_ids: Optional[List[int]] = None
+    ):
+        """Initialize the profiler.
+
+        Args:
+            interval: Time between samples in seconds
+            thread_ids: Threads to sample, None for all threads except the sampler
+        """
+        if interval <= 0:
+            raise ValueError("Sampling interval must be positive")
+        self.interval = interval
+        self.thread_ids = frozenset(thread_ids) if thread_ids is not None else None
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._threads_lock = threading.Lock()
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start sampling in a background thread.
+
+        Raises:
+            RuntimeError: If the profiler is already running
+        """
+        if self._thread is not None:
+            raise RuntimeError("Profiler is already running")
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="feptm-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampling thread to finish."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+
+    def add_thread(self, thread_id: int) -> bool:
+        """Start sampling another thread.
+
+        Args:
+            thread_id: Identifier of the thread
+
+        Returns:
+            True if the thread was added, False if it is already sampled
+        """
+        with self._threads_lock:
+            if self.thread_ids is None or thread_id in self.thread_ids:
+                return False
+            # Replaced rather than changed, so the sampler can iterate it
+            self.thread_ids = self.thread_ids | {thread_id}
+            return True
+
+    def remove_thread(self, thread_id: int) -> None:
+        """Stop sampling a thread added with add_thread().
+
+        Args:
+            thread_id: Identifier of the thread
+        """
+        with self._threads_lock:
+            if self.thread_ids is not None:
+                self.thread_ids = self.thread_ids - {thread_id}
+
+    def _run(self) -> None:
+        """Sample stacks until stopped."""
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample_count += 1
+            thread_ids = self.thread_ids
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_ids is not None and thread_id not in thread_ids:
+                    continue
+                self.stacks[_walk_stack(frame)] += 1
+
+    def to_collapsed(self) -> str:
+        """Render the samples as collapsed stacks for flamegraph tools.
+
+        Returns:
+            One "frame;frame;frame count" line per distinct stack
+        """
+        lines = []
+        for stack, count in self.stacks.most_common():
+            names = ";".join(
+                f"{name} ({file}:{line})".replace(";", ",")
+                for name, file, line in stack
+            )
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_speedscope(self, name: str = "feptm") -> Dict[str, Any]:
+        """Render the samples in the speedscope file format.
+
+        Args:
+            name: Name of the profile
+
+        Returns:
+            Speedscope document with a single sampled profile
+        """
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict[str, Any]] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+
+        for stack, count in self.stacks.most_common():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append(
+                        {"name": frame[0], "file": frame[1], "line": frame[2]}
+                    )
+                indexes.append(frame_index[frame])
+            samples.append(indexes)
+            weights.append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "feptm",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+# Profiler of the request being handled, for the worker threads it uses
+_request_profiler: ContextVar[Optional[SamplingProfiler]] = ContextVar(
+    "request_profiler", default=None
+)
+
+
+@contextmanager
+def request_profiler(profiler: SamplingProfiler) -> Iterator[SamplingProfiler]:
+    """Set the profiler of the request running in the current context.
+
+    Args:
+        profiler: Running profiler of the request
+
+    Yields:
+        The profiler
+    """
+    token = _request_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _request_profiler.reset(token)
+
+
+@contextmanager
+def profiled_thread() -> Iterator[None]:
+    """Sample the current thread with the request profiler while the block runs.
+
+    Does nothing if no request profiler is set in the current context. Use
+    it in code that asyncio.to_thread() runs for a request.
+    """
+    profiler = _request_profiler.get()
+    thread_id = threading.get_ident()
+    if profiler is None or not profiler.add_thread(thread_id):
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.remove_thread(thread_id)
@@ -0,0 +1,43 @@
+"""Access control for administrative endpoints."""
+
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from feptm.core.config import settings
+
+API_KEY_HEADER = "X-API-Key"
+
+
+def is_valid_api_key(api_key: Optional[str]) -> bool:
+    """Check an API key against the API_KEY setting.
+
+    Args:
+        api_key: Key sent by the client
+
+    Returns:
+        True if API_KEY is configured and the key matches it
+    """
+    if not settings.API_KEY or not api_key:
+        return False
+    return secrets.compare_digest(api_key.encode(), settings.API_KEY.encode())
+
+
+async def require_api_key(
+    api_key: Optional[str] = Header(None, alias=API_KEY_HEADER)
+) -> None:
+    """Dependency restricting an endpoint to clients with the admin API key.
+
+    Args:
+        api_key: Value of the X-API-Key header
+
+    Raises:
+        HTTPException: If API_KEY is not configured or the key doesn't match
+    """
+    if not settings.API_KEY:
+        raise HTTPException(
+            status_code=403, detail="Admin endpoints are disabled: API_KEY is not set"
+        )
+    if not is_valid_api_key(api_key):
+        raise HTTPException(status_code=401, detail="Invalid or missing API key")
@@ -0,0 +1,413 @@
+"""Text processing for full-text search: tokenization and stemming."""
+
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+CYRILLIC_RE = re.compile(r"[а-я]")
+
+STOP_WORDS = frozenset(
+    {
+        # Russian
+        "и",
+        "в",
+        "во",
+        "не",
+        "на",
+        "с",
+        "со",
+        "по",
+        "к",
+        "ко",
+        "о",
+        "об",
+        "от",
+        "до",
+        "из",
+        "за",
+        "для",
+        "у",
+        "а",
+        "но",
+        "или",
+        "что",
+        "как",
+        "это",
+        "же",
+        "бы",
+        "ли",
+        # English
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "in",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "the",
+        "to",
+        "with",
+    }
+)
+
+RU_VOWELS = "аеиоуыэюя"
+
+# Endings of the Russian Snowball stemmer. Endings in the "preceded" groups
+# are only removed when they follow "а" or "я".
+RU_PERFECTIVE_GERUND = (
+    ("в", "вши", "вшись"),
+    ("ив", "ивши", "ившись", "ыв", "ывши", "ывшись"),
+)
+RU_ADJECTIVE = (
+    (),
+    (
+        "ее",
+        "ие",
+        "ые",
+        "ое",
+        "ими",
+        "ыми",
+        "ей",
+        "ий",
+        "ый",
+        "ой",
+        "ем",
+        "им",
+        "ым",
+        "ом",
+        "его",
+        "ого",
+        "ему",
+        "ому",
+        "их",
+        "ых",
+        "ую",
+        "юю",
+        "ая",
+        "яя",
+        "ою",
+        "ею",
+    ),
+)
+RU_PARTICIPLE = (("ем", "нн", "вш", "ющ", "щ"), ("ивш", "ывш", "ующ"))
+RU_REFLEXIVE = ((), ("ся", "сь"))
+RU_VERB = (
+    (
+        "ла",
+        "на",
+        "ете",
+        "йте",
+        "ли",
+        "й",
+        "л",
+        "ем",
+        "н",
+        "ло",
+        "но",
+        "ет",
+        "ют",
+        "ны",
+        "ть",
+        "ешь",
+        "нно",
+    ),
+    (
+        "ила",
+        "ыла",
+        "ена",
+        "ейте",
+        "уйте",
+        "ите",
+        "или",
+        "ыли",
+        "ей",
+        "уй",
+        "ил",
+        "ыл",
+        "им",
+        "ым",
+        "ен",
+        "ило",
+        "ыло",
+        "ено",
+        "ят",
+        "ует",
+        "уют",
+        "ит",
+        "ыт",
+        "ены",
+        "ить",
+        "ыть",
+        "ишь",
+        "ую",
+        "ю",
+    ),
+)
+RU_NOUN = (
+    (),
+    (
+        "а",
+        "ев",
+        "ов",
+        "ие",
+        "ье",
+        "е",
+        "иями",
+        "ями",
+        "ами",
+        "еи",
+        "ии",
+        "и",
+        "ией",
+        "ей",
+        "ой",
+        "ий",
+        "й",
+        "иям",
+        "ям",
+        "ием",
+        "ем",
+        "ам",
+        "ом",
+        "о",
+        "у",
+        "ах",
+        "иях",
+        "ях",
+        "ы",
+        "ь",
+        "ию",
+        "ью",
+        "ю",
+        "ия",
+        "ья",
+        "я",
+    ),
+)
+RU_SUPERLATIVE = ("ейше", "ейш")
+RU_DERIVATIONAL = ("ость", "ост")
+
+
+def _ru_regions(word: str) -> Tuple[int, int]:
+    """Find the RV and R2 regions of a Russian word.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Start positions of RV and R2
+    """
+    rv = len(word)
+    for i, char in enumerate(word):
+        if char in RU_VOWELS:
+            rv = i + 1
+            break
+
+    def next_region(start: int) -> int:
+        for i in range(start + 1, len(word)):
+            if word[i] not in RU_VOWELS and word[i - 1] in RU_VOWELS:
+                return i + 1
+        return len(word)
+
+    r2 = next_region(next_region(0))
+    return rv, r2
+
+
+def _ru_strip(
+    word: str, rv: int, groups: Tuple[Tuple[str, ...], Tuple[str, ...]]
+) -> Tuple[str, bool]:
+    """Remove the longest matching ending from the RV region.
+
+    Args:
+        word: Word to process
+        rv: Start of the RV region
+        groups: Endings that must follow "а"/"я", and endings without that condition
+
+    Returns:
+        Word without the ending and whether an ending was removed
+    """
+    preceded, plain = groups
+    best = ""
+    for ending in preceded:
+        if (
+            len(ending) > len(best)
+            and word.endswith(ending)
+            and len(word) - len(ending) > rv
+            and word[-len(ending) - 1] in "ая"
+        ):
+            best = ending
+    for ending in plain:
+        if (
+            len(ending) > len(best)
+            and word.endswith(ending)
+            and len(word) - len(ending) >= rv
+        ):
+            best = ending
+    if best:
+        return word[: -len(best)], True
+    return word, False
+
+
+def stem_russian(word: str) -> str:
+    """Stem a Russian word with the Snowball algorithm.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Stem of the word
+    """
+    word = word.replace("ё", "е")
+    rv, r2 = _ru_regions(word)
+
+    # Step 1: gerund, or reflexive followed by adjectival, verb or noun endings
+    word, found = _ru_strip(word, rv, RU_PERFECTIVE_GERUND)
+    if not found:
+        word, _ = _ru_strip(word, rv, RU_REFLEXIVE)
+        word, found = _ru_strip(word, rv, RU_ADJECTIVE)
+        if found:
+            word, _ = _ru_strip(word, rv, RU_PARTICIPLE)
+        else:
+            word, found = _ru_strip(word, rv, RU_VERB)
+            if not found:
+                word, _ = _ru_strip(word, rv, RU_NOUN)
+
+    # Step 2: trailing "и"
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Step 3: derivational ending in R2
+    for ending in RU_DERIVATIONAL:
+        if word.endswith(ending) and len(word) - len(ending) >= r2:
+            word = word[: -len(ending)]
+            break
+
+    # Step 4: superlative, double "н" and soft sign
+    for ending in RU_SUPERLATIVE:
+        if word.endswith(ending) and len(word) - len(ending) >= rv:
+            word = word[: -len(ending)]
+            break
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        word = word[:-1]
+    elif word.endswith("ь") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    return word
+
+
+def _has_vowel(word: str) -> bool:
+    """Check whether an English stem contains a vowel.
+
+    Args:
+        word: Word to check
+
+    Returns:
+        True if the word contains a vowel
+    """
+    return any(char in "aeiouy" for char in word)
+
+
+def stem_english(word: str) -> str:
+    """Stem an English word with a light suffix-stripping stemmer.
+
+    Handles plurals, past tense, gerunds and the most common derivational
+    suffixes, which is enough to match inflected forms in short descriptions.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Stem of the word
+    """
+    if len(word) <= 3:
+        return word
+
+    # Plurals
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+
+    # Past tense and gerunds
+    for suffix in ("ing", "ed"):
+        stem = word[: -len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 3 and _has_vowel(stem):
+            word = stem
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+
+    # Derivational suffixes
+    for suffix, replacement in (
+        ("ational", "ate"),
+        ("ization", "ize"),
+        ("ation", "ate"),
+        ("ness", ""),
+        ("ment", ""),
+        ("ful", ""),
+        ("ly", ""),
+    ):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)] + replacement
+            break
+
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """Stem a token, choosing the stemmer by script.
+
+    Args:
+        token: Lowercase token
+
+    Returns:
+        Stem of the token
+    """
+    if CYRILLIC_RE.search(token):
+        return stem_russian(token)
+    if token.isascii() and token.isalpha():
+        return stem_english(token)
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping stop words.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return [
+        token
+        for token in TOKEN_RE.findall(text.casefold().replace("ё", "е"))
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def analyze(text: str) -> List[str]:
+    """Tokenize and stem text for indexing or querying.
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        List of stemmed terms
+    """
+    return [stem(token) for token in tokenize(text)]
@@ -7,16 +7,22 @@ from typing import Any, Dict
 
 from feptm.core.config import settings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO if not settings.DEBUG else logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-
 logger = logging.getLogger(__name__)
 
 
+def configure_logging() -> None:
+    """Configure the root logger.
+
+    Called on application startup and by scripts rather than on import,
+    so importing the package has no side effects on logging.
+    """
+    logging.basicConfig(
+        level=logging.INFO if not settings.DEBUG else logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
 def generate_uuid() -> str:
     """Generate a UUID string.
 
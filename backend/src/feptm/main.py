@@ -1,20 +1,74 @@
 """Main application module for the Time & Materials accounting service."""
 
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import Response
 
+from feptm.api.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    SnapshotMiddleware,
+)
 from feptm.api.router import router as api_router
 from feptm.core.config import settings
+from feptm.core.metrics import PROMETHEUS_CONTENT_TYPE, registry
+from feptm.core.utils import configure_logging
+from feptm.services.data_service import data_service
+from feptm.services.propagation import propagation_service
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize logging and data on startup rather than on import."""
+    configure_logging()
+    if settings.WARM_UP_ON_STARTUP:
+        started = time.perf_counter()
+        await asyncio.to_thread(data_service.warm_up)
+        logger.info(f"Data service warmed up in {time.perf_counter() - started:.3f}s")
+    yield
+    await asyncio.to_thread(propagation_service.close)
+    await asyncio.to_thread(data_service.close)
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.VERSION,
+    lifespan=lifespan,
 )
 
 app.include_router(api_router, prefix="/api")
+app.add_middleware(ProfilingMiddleware)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        version_of=lambda: data_service.data_version,
+        cache_max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    )
+
+# Outside the compression middleware, so cached responses are keyed by the
+# pinned generation
+app.add_middleware(SnapshotMiddleware, pin=data_service.pin)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
 async def root():
     """Health check endpoint."""
-    return {"status": "ok", "message": "Time & Materials accounting service is running"} 
\ No newline at end of file
+    return {"status": "ok", "message": "Time & Materials accounting service is running"} 
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metrics endpoint in the Prometheus text format."""
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,46 @@
+"""Models with related objects resolved, for the expand query parameter."""
+
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, SerializerFunctionWrapHandler, model_serializer
+
+from feptm.models.payment import TimeEntry
+from feptm.models.project import Project
+from feptm.models.specialist import Specialist
+
+
+class Expanded(BaseModel):
+    """Base of the models with related objects resolved.
+
+    Only the relations that were set are serialized, so a relation that was
+    not requested is left out, while one that was requested but could not
+    be resolved is serialized as null.
+    """
+
+    RELATIONS: ClassVar[Tuple[str, ...]] = ()
+
+    @model_serializer(mode="wrap")
+    def drop_unexpanded(self, handler: SerializerFunctionWrapHandler) -> Dict[str, Any]:
+        """Leave the relations that were not set out of the serialized data."""
+        data = handler(self)
+        for name in self.RELATIONS:
+            if name not in self.model_fields_set:
+                data.pop(name, None)
+        return data
+
+
+class ExpandedProject(Expanded, Project):
+    """Project with its specialists resolved."""
+
+    RELATIONS = ("specialists",)
+
+    specialists: Optional[List[Specialist]] = None
+
+
+class ExpandedTimeEntry(Expanded, TimeEntry):
+    """Time entry with its specialist and project resolved."""
+
+    RELATIONS = ("specialist", "project")
+
+    specialist: Optional[Specialist] = None
+    project: Optional[Project] = None
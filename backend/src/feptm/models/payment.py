@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from feptm.core.utils import generate_uuid, format_date_range
+from feptm.models.update import PartialUpdate, UtcModel
 
 
 class PaymentStatus(str, Enum):
@@ -32,6 +33,26 @@ class TimeEntry(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class TimeEntryCreate(UtcModel):
+    """Data for creating a time entry."""
+
+    specialist_id: str
+    project_id: str
+    date: datetime
+    hours: float = Field(gt=0, le=24)
+    description: str
+
+
+class TimeEntryUpdate(PartialUpdate):
+    """Changes to a time entry; only the fields that are set are changed."""
+
+    specialist_id: Optional[str] = None
+    project_id: Optional[str] = None
+    date: Optional[datetime] = None
+    hours: Optional[float] = Field(None, gt=0, le=24)
+    description: Optional[str] = None
+
+
 class PaymentPeriod(BaseModel):
     """Payment period for a group of time entries."""
     
@@ -64,19 +85,45 @@ class PaymentPeriod(BaseModel):
         self._update_totals(time_entry)
         self.updated_at = datetime.utcnow()
     
+    def recalculate_totals(self) -> None:
+        """Recalculate all totals from the time entries, e.g. after an entry changed."""
+        specialist_totals: Dict[str, float] = {}
+        project_totals: Dict[str, float] = {}
+        for entry in self.time_entries:
+            specialist_totals[entry.specialist_id] = (
+                specialist_totals.get(entry.specialist_id, 0.0) + entry.hours
+            )
+            project_totals[entry.project_id] = (
+                project_totals.get(entry.project_id, 0.0) + entry.hours
+            )
+        self.specialist_totals = specialist_totals
+        self.project_totals = project_totals
+        self.total_hours = sum(entry.hours for entry in self.time_entries)
+
     def _update_totals(self, time_entry: TimeEntry) -> None:
         """Update totals based on a new time entry.
+
+        The totals are replaced rather than modified in place, so readers
+        iterating over them are not affected.
         
         Args:
             time_entry: Time entry to use for updating totals
         """
         # Update specialist totals
         specialist_id = time_entry.specialist_id
-        self.specialist_totals[specialist_id] = self.specialist_totals.get(specialist_id, 0.0) + time_entry.hours
+        specialist_totals = dict(self.specialist_totals)
+        specialist_totals[specialist_id] = (
+            specialist_totals.get(specialist_id, 0.0) + time_entry.hours
+        )
+        self.specialist_totals = specialist_totals
         
         # Update project totals
         project_id = time_entry.project_id
-        self.project_totals[project_id] = self.project_totals.get(project_id, 0.0) + time_entry.hours
+        project_totals = dict(self.project_totals)
+        project_totals[project_id] = (
+            project_totals.get(project_id, 0.0) + time_entry.hours
+        )
+        self.project_totals = project_totals
         
         # Update total hours
         self.total_hours += time_entry.hours
@@ -114,4 +161,30 @@ class PaymentPeriod(BaseModel):
                 "created_at": "2023-06-01T00:00:00Z",
                 "updated_at": "2023-08-01T10:30:00Z"
             }
-        } 
\ No newline at end of file
+        } 
+
+
+class PaymentPeriodCreate(UtcModel):
+    """Data for creating a payment period."""
+
+    name: Optional[str] = None
+    start_date: datetime
+    end_date: datetime
+    status: PaymentStatus = PaymentStatus.DRAFT
+    report_id: Optional[str] = None
+
+
+class PaymentPeriodUpdate(PartialUpdate):
+    """Changes to a payment period; only the fields that are set are changed.
+
+    Null clears the report ID, and the name, which is then generated from
+    the dates as for a new period.
+    """
+
+    NULLABLE = frozenset({"name", "report_id"})
+
+    name: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    status: Optional[PaymentStatus] = None
+    report_id: Optional[str] = None
@@ -8,6 +8,7 @@ from pydantic import BaseModel, EmailStr, Field
 
 from feptm.core.config import settings
 from feptm.core.utils import generate_uuid
+from feptm.models.update import PartialUpdate
 
 
 class SpecialistRole(str, Enum):
@@ -55,4 +56,21 @@ class Specialist(BaseModel):
                 "hire_date": "2023-01-15T00:00:00Z",
                 "leave_date": None
             }
-        } 
\ No newline at end of file
+        } 
+
+
+class SpecialistUpdate(PartialUpdate):
+    """Changes to a specialist; only the fields that are set are changed.
+
+    An explicit null clears leave_date.
+    """
+
+    NULLABLE = frozenset({"leave_date"})
+
+    full_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    role: Optional[SpecialistRole] = None
+    hourly_rate: Optional[float] = Field(None, gt=0)
+    active: Optional[bool] = None
+    hire_date: Optional[datetime] = None
+    leave_date: Optional[datetime] = None
@@ -0,0 +1,42 @@
+"""Base models for data creating or changing an item."""
+
+from datetime import datetime, timezone
+from typing import Any, ClassVar, FrozenSet
+
+from pydantic import BaseModel, field_validator, model_validator
+
+
+class UtcModel(BaseModel):
+    """Data sent by clients, with all datetimes converted to UTC.
+
+    Naive datetimes are taken as UTC, as the stored data is timezone-aware
+    and both data services must compare them with it.
+    """
+
+    @field_validator("*", mode="after")
+    @classmethod
+    def to_utc(cls, value: Any) -> Any:
+        """Convert a datetime value to UTC."""
+        if not isinstance(value, datetime):
+            return value
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
+class PartialUpdate(UtcModel):
+    """Changes to an item; only the fields that are set are changed.
+
+    Setting a field to null clears it, which only the fields listed in
+    NULLABLE allow; the others are required on the item.
+    """
+
+    NULLABLE: ClassVar[FrozenSet[str]] = frozenset()
+
+    @model_validator(mode="after")
+    def check_nulls(self) -> "PartialUpdate":
+        """Reject null for fields that cannot be cleared."""
+        for name in sorted(self.model_fields_set - self.NULLABLE):
+            if getattr(self, name) is None:
+                raise ValueError(f"{name} cannot be null")
+        return self
@@ -1,5 +1,16 @@
 """Service implementations for the application."""
 
+from typing import Any
+
 from feptm.services.mock_data_service import MockDataService
 
-__all__ = ["MockDataService"] 
\ No newline at end of file
+__all__ = ["MockDataService", "SQLiteDataService"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import SQLiteDataService on first access, so sqlite3 is only loaded when used."""
+    if name == "SQLiteDataService":
+        from feptm.services.sqlite_data_service import SQLiteDataService
+
+        return SQLiteDataService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,37 @@
+"""Data service selection based on application settings."""
+
+import logging
+from typing import TYPE_CHECKING, Union
+
+from feptm.core.config import settings
+from feptm.services.mock_data_service import MockDataService
+
+if TYPE_CHECKING:
+    from feptm.services.sqlite_data_service import SQLiteDataService
+
+logger = logging.getLogger(__name__)
+
+DataService = Union[MockDataService, "SQLiteDataService"]
+
+
+def create_data_service() -> DataService:
+    """Create the data service configured by DATA_BACKEND.
+
+    Returns:
+        Data service instance
+
+    Raises:
+        ValueError: If DATA_BACKEND is not supported
+    """
+    if settings.DATA_BACKEND == "json":
+        return MockDataService()
+    if settings.DATA_BACKEND == "sqlite":
+        from feptm.services.sqlite_data_service import SQLiteDataService
+
+        logger.info(f"Using SQLite data backend: {settings.SQLITE_DB_PATH}")
+        return SQLiteDataService(settings.SQLITE_DB_PATH)
+    raise ValueError(f"Invalid data backend: {settings.DATA_BACKEND}")
+
+
+# Singleton instance for easy access
+data_service = create_data_service()
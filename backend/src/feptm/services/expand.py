@@ -0,0 +1,103 @@
+"""Server-side resolution of related objects."""
+
+from typing import Any, List, Optional, Sequence, Set
+
+from feptm.models import Project
+from feptm.models.expanded import ExpandedProject, ExpandedTimeEntry
+from feptm.models.payment import TimeEntry
+
+PROJECT_EXPANSIONS = ("specialists",)
+TIME_ENTRY_EXPANSIONS = ("specialist", "project")
+
+
+def parse_expand(value: Optional[str], allowed: Sequence[str]) -> Set[str]:
+    """Parse a comma-separated expand parameter.
+
+    Args:
+        value: Value of the expand parameter
+        allowed: Supported relation names
+
+    Returns:
+        Set of relations to expand
+
+    Raises:
+        ValueError: If a relation is not supported
+    """
+    if not value:
+        return set()
+    relations = {part.strip() for part in value.split(",") if part.strip()}
+    invalid = sorted(relations - set(allowed))
+    if invalid:
+        raise ValueError(
+            f"Cannot expand {', '.join(invalid)}, supported: {', '.join(allowed)}"
+        )
+    return relations
+
+
+def _unique(ids: Any) -> List[str]:
+    """Deduplicate IDs keeping their first occurrence order."""
+    return list(dict.fromkeys(ids))
+
+
+def expand_projects(
+    data_service: Any, projects: List[Project], relations: Set[str]
+) -> List[ExpandedProject]:
+    """Resolve the specialists of projects with a single batch lookup.
+
+    Args:
+        data_service: Data service to resolve the specialists from
+        projects: Projects to expand
+        relations: Relations to expand
+
+    Returns:
+        Projects with the requested relations
+    """
+    specialists = {}
+    if "specialists" in relations:
+        ids = _unique(sid for project in projects for sid in project.specialist_ids)
+        specialists = data_service.get_by_ids("specialists", ids)
+
+    expanded = []
+    for project in projects:
+        fields = dict(project)
+        if "specialists" in relations:
+            fields["specialists"] = [
+                specialists[sid] for sid in project.specialist_ids if sid in specialists
+            ]
+        expanded.append(ExpandedProject.model_construct(**fields))
+    return expanded
+
+
+def expand_time_entries(
+    data_service: Any, entries: List[TimeEntry], relations: Set[str]
+) -> List[ExpandedTimeEntry]:
+    """Resolve the specialists and projects of time entries with batch lookups.
+
+    Args:
+        data_service: Data service to resolve the related objects from
+        entries: Time entries to expand
+        relations: Relations to expand
+
+    Returns:
+        Time entries with the requested relations
+    """
+    specialists = {}
+    projects = {}
+    if "specialist" in relations:
+        specialists = data_service.get_by_ids(
+            "specialists", _unique(e.specialist_id for e in entries)
+        )
+    if "project" in relations:
+        projects = data_service.get_by_ids(
+            "projects", _unique(e.project_id for e in entries)
+        )
+
+    expanded = []
+    for entry in entries:
+        fields = dict(entry)
+        if "specialist" in relations:
+            fields["specialist"] = specialists.get(entry.specialist_id)
+        if "project" in relations:
+            fields["project"] = projects.get(entry.project_id)
+        expanded.append(ExpandedTimeEntry.model_construct(**fields))
+    return expanded
@@ -0,0 +1,499 @@
+"""Analytical export of the data as Apache Arrow record batches.
+
+Time entries, specialists, projects and payment periods are converted to
+columnar record batches while streaming from the data service, and are
+written as an Arrow IPC stream (served over HTTP) or as Arrow IPC or
+Parquet files. Files are laid out as a dataset partitioned by period:
+
+    specialists.parquet
+    projects.parquet
+    payment_periods.parquet
+    time_entries/period_id=<id>/part-0.parquet
+
+ID and enum columns are dictionary-encoded. The dictionaries of one export
+are shared by all of its batches and only grow, so a stream carries each
+value once and later batches only send dictionary deltas.
+
+pyarrow is an optional dependency (the 'arrow' extra) imported on first use.
+"""
+
+import io
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from feptm.core.config import settings
+from feptm.core.metrics import registry
+from feptm.models import PaymentPeriod, Project, Specialist
+from feptm.services.data_service import data_service
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+EXPORT_TABLES = ("time_entries", "specialists", "projects", "payment_periods")
+EXPORT_FORMATS = ("arrow", "parquet")
+
+EXPORT_ROWS = registry.counter(
+    "feptm_export_rows", "Rows written by Arrow and Parquet exports", ("table",)
+)
+
+
+class ExportUnavailableError(RuntimeError):
+    """Raised when pyarrow is not installed."""
+
+
+def load_pyarrow() -> Any:
+    """Import pyarrow on first use.
+
+    Returns:
+        The pyarrow module
+
+    Raises:
+        ExportUnavailableError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ExportUnavailableError(
+            "Arrow export requires pyarrow, install the 'arrow' extra"
+        )
+    return pyarrow
+
+
+class DictionaryEncoder:
+    """Dictionary of the values of one column, shared by all batches of an export.
+
+    New values are appended, so the dictionary of a later batch always
+    extends the one of an earlier batch and can be sent as a delta.
+    """
+
+    def __init__(self, pa: Any, values: Iterable[str] = ()):
+        """Initialize the encoder.
+
+        Args:
+            pa: The pyarrow module
+            values: Values known up front, encoded in this order
+        """
+        self._pa = pa
+        self._indices: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._dictionary: Any = None
+        for value in values:
+            self.index(value)
+
+    def index(self, value: str) -> int:
+        """Get the dictionary index of a value, adding it if needed."""
+        index = self._indices.get(value)
+        if index is None:
+            index = self._indices[value] = len(self._values)
+            self._values.append(value)
+        return index
+
+    def _dictionary_array(self) -> Any:
+        """Get the dictionary as an array, rebuilt only after it grew."""
+        if self._dictionary is None or len(self._dictionary) != len(self._values):
+            self._dictionary = self._pa.array(self._values, type=self._pa.string())
+        return self._dictionary
+
+    def encode(self, values: Sequence[Optional[str]]) -> Any:
+        """Encode values as a dictionary array.
+
+        Indices are looked up with pyarrow.compute; values missing from the
+        dictionary are appended first.
+
+        Args:
+            values: Values to encode, None for nulls
+
+        Returns:
+            pyarrow DictionaryArray with int32 indices
+        """
+        pa = self._pa
+        pc = pa.compute
+        array = pa.array(values, type=pa.string())
+        indices = pc.index_in(array, value_set=self._dictionary_array())
+        if indices.null_count > array.null_count:
+            missing = pc.filter(array, pc.and_(pc.is_null(indices), pc.is_valid(array)))
+            for value in pc.unique(missing).to_pylist():
+                self.index(value)
+            indices = pc.index_in(array, value_set=self._dictionary_array())
+        return pa.DictionaryArray.from_arrays(
+            indices.cast(pa.int32()), self._dictionary_array()
+        )
+
+    def encode_repeated(self, value: str, count: int) -> Any:
+        """Encode a value repeated count times, as for the period of a batch."""
+        pa = self._pa
+        indices = pa.repeat(pa.scalar(self.index(value), type=pa.int32()), count)
+        return pa.DictionaryArray.from_arrays(indices, self._dictionary_array())
+
+
+def _timestamps(pa: Any, values: Sequence[Any]) -> Any:
+    """Convert datetimes, or ISO 8601 strings as stored by SQLite, to UTC timestamps."""
+    timestamp = pa.timestamp("us", tz="UTC")
+    if values and isinstance(values[0], str):
+        return pa.array(values, type=pa.string()).cast(timestamp)
+    return pa.array(values, type=timestamp)
+
+
+def _enum_value(value: Any) -> Optional[str]:
+    return None if value is None else getattr(value, "value", value)
+
+
+class ArrowExporter:
+    """Converts the data of a data service to Arrow record batches and files."""
+
+    def __init__(self, data_service: Any, batch_rows: Optional[int] = None):
+        """Initialize the exporter.
+
+        Args:
+            data_service: Data service to export from
+            batch_rows: Maximum rows per record batch, defaults to EXPORT_BATCH_ROWS
+        """
+        self.data_service = data_service
+        self.batch_rows = batch_rows or settings.EXPORT_BATCH_ROWS
+
+    def schema(self, table: str, partitioned: bool = False) -> Any:
+        """Get the Arrow schema of an exported table.
+
+        Args:
+            table: Table name, one of EXPORT_TABLES
+            partitioned: Leave out period_id of time entries, which the partition
+                path holds
+
+        Returns:
+            pyarrow Schema
+
+        Raises:
+            ValueError: If the table is unknown
+        """
+        pa = load_pyarrow()
+        ids = pa.dictionary(pa.int32(), pa.string())
+        timestamp = pa.timestamp("us", tz="UTC")
+        if table == "time_entries":
+            fields = [
+                ("id", pa.string()),
+                ("period_id", ids),
+                ("specialist_id", ids),
+                ("project_id", ids),
+                ("date", timestamp),
+                ("hours", pa.float64()),
+                ("description", pa.string()),
+                ("created_at", timestamp),
+                ("updated_at", timestamp),
+            ]
+            if partitioned:
+                fields = [field for field in fields if field[0] != "period_id"]
+        elif table == "specialists":
+            fields = [
+                ("id", ids),
+                ("full_name", pa.string()),
+                ("email", pa.string()),
+                ("role", ids),
+                ("hourly_rate", pa.float64()),
+                ("active", pa.bool_()),
+                ("hire_date", timestamp),
+                ("leave_date", timestamp),
+            ]
+        elif table == "projects":
+            fields = [
+                ("id", ids),
+                ("name", pa.string()),
+                ("description", pa.string()),
+                ("client_name", pa.string()),
+                ("status", ids),
+                ("project_type", ids),
+                ("timesheet_id", pa.string()),
+                ("start_date", timestamp),
+                ("end_date", timestamp),
+                ("budget", pa.float64()),
+                ("specialist_ids", pa.list_(pa.string())),
+                ("created_at", timestamp),
+                ("updated_at", timestamp),
+            ]
+        elif table == "payment_periods":
+            fields = [
+                ("id", ids),
+                ("name", pa.string()),
+                ("start_date", timestamp),
+                ("end_date", timestamp),
+                ("status", ids),
+                ("report_id", pa.string()),
+                ("entry_count", pa.int64()),
+                ("total_hours", pa.float64()),
+                ("created_at", timestamp),
+                ("updated_at", timestamp),
+            ]
+        else:
+            raise ValueError(f"Invalid export table: {table}")
+        return pa.schema(fields)
+
+    def _encoders(self, pa: Any) -> Dict[str, DictionaryEncoder]:
+        """Create the dictionaries of an export.
+
+        Specialist and project IDs are seeded up front so their dictionaries
+        are complete in the first batch; period IDs are added as the periods
+        are streamed, since listing them may load every time entry.
+        """
+        return {
+            "specialist_id": DictionaryEncoder(
+                pa, (s.id for s in self.data_service.get_specialists())
+            ),
+            "project_id": DictionaryEncoder(
+                pa, (p.id for p in self.data_service.get_projects())
+            ),
+            "period_id": DictionaryEncoder(pa),
+            "role": DictionaryEncoder(pa),
+            "status": DictionaryEncoder(pa),
+            "project_type": DictionaryEncoder(pa),
+        }
+
+    def iter_batches(
+        self, table: str, period_id: Optional[str] = None, partitioned: bool = False
+    ) -> Iterator[Any]:
+        """Stream a table from the data service as record batches.
+
+        Time entries are read period by period and a batch never spans two
+        periods, so the batches of each partition are contiguous.
+
+        Args:
+            table: Table name, one of EXPORT_TABLES
+            period_id: Only export the time entries of this payment period
+            partitioned: Leave out period_id of time entries
+
+        Returns:
+            Iterator over pyarrow RecordBatches
+
+        Raises:
+            ValueError: If the table is unknown, or period_id is given for another table
+        """
+        for _, batch in self._iter_batches(table, period_id, partitioned):
+            yield batch
+
+    def _iter_batches(
+        self, table: str, period_id: Optional[str], partitioned: bool
+    ) -> Iterator[Tuple[Optional[str], Any]]:
+        """Stream a table as (period ID, record batch) pairs.
+
+        The period ID is None for tables other than time entries.
+        """
+        if period_id is not None and table != "time_entries":
+            raise ValueError("Only time entries can be exported for a single period")
+        pa = load_pyarrow()
+        schema = self.schema(table, partitioned)
+        encoders = self._encoders(pa)
+        if table == "time_entries":
+            for current, values in self.data_service.iter_time_entry_columns(
+                self.batch_rows, period_id
+            ):
+                EXPORT_ROWS.labels(table).inc(len(values["id"]))
+                yield current, self._time_entry_batch(
+                    pa, schema, encoders, current, values
+                )
+            return
+
+        getters = {
+            "specialists": self.data_service.get_specialists,
+            "projects": self.data_service.get_projects,
+            "payment_periods": self.data_service.get_payment_periods,
+        }
+        builders = {
+            "specialists": self._specialist_columns,
+            "projects": self._project_columns,
+            "payment_periods": self._period_columns,
+        }
+        items: List[Any] = getters[table]()
+        build = builders[table]
+        for start in range(0, len(items), self.batch_rows):
+            chunk = items[start : start + self.batch_rows]
+            EXPORT_ROWS.labels(table).inc(len(chunk))
+            yield None, pa.RecordBatch.from_pydict(
+                build(pa, encoders, chunk), schema=schema
+            )
+
+    @staticmethod
+    def _time_entry_batch(
+        pa: Any,
+        schema: Any,
+        encoders: Dict[str, DictionaryEncoder],
+        period_id: str,
+        values: Dict[str, Sequence[Any]],
+    ) -> Any:
+        """Build a record batch of time entry columns of one period."""
+        rows = len(values["id"])
+        columns = {
+            "id": values["id"],
+            "period_id": encoders["period_id"].encode_repeated(period_id, rows),
+            "specialist_id": encoders["specialist_id"].encode(values["specialist_id"]),
+            "project_id": encoders["project_id"].encode(values["project_id"]),
+            "date": _timestamps(pa, values["date"]),
+            "hours": values["hours"],
+            "description": values["description"],
+            "created_at": _timestamps(pa, values["created_at"]),
+            "updated_at": _timestamps(pa, values["updated_at"]),
+        }
+        return pa.RecordBatch.from_pydict(
+            {name: columns[name] for name in schema.names}, schema=schema
+        )
+
+    @staticmethod
+    def _specialist_columns(
+        pa: Any, encoders: Dict[str, DictionaryEncoder], specialists: List[Specialist]
+    ) -> Dict[str, Any]:
+        return {
+            "id": encoders["specialist_id"].encode([s.id for s in specialists]),
+            "full_name": [s.full_name for s in specialists],
+            "email": [s.email for s in specialists],
+            "role": encoders["role"].encode([_enum_value(s.role) for s in specialists]),
+            "hourly_rate": [s.hourly_rate for s in specialists],
+            "active": [s.active for s in specialists],
+            "hire_date": [s.hire_date for s in specialists],
+            "leave_date": [s.leave_date for s in specialists],
+        }
+
+    @staticmethod
+    def _project_columns(
+        pa: Any, encoders: Dict[str, DictionaryEncoder], projects: List[Project]
+    ) -> Dict[str, Any]:
+        return {
+            "id": encoders["project_id"].encode([p.id for p in projects]),
+            "name": [p.name for p in projects],
+            "description": [p.description for p in projects],
+            "client_name": [p.client_name for p in projects],
+            "status": encoders["status"].encode(
+                [_enum_value(p.status) for p in projects]
+            ),
+            "project_type": encoders["project_type"].encode(
+                [_enum_value(p.project_type) for p in projects]
+            ),
+            "timesheet_id": [p.timesheet_id for p in projects],
+            "start_date": [p.start_date for p in projects],
+            "end_date": [p.end_date for p in projects],
+            "budget": [p.budget for p in projects],
+            "specialist_ids": [list(p.specialist_ids) for p in projects],
+            "created_at": [p.created_at for p in projects],
+            "updated_at": [p.updated_at for p in projects],
+        }
+
+    @staticmethod
+    def _period_columns(
+        pa: Any, encoders: Dict[str, DictionaryEncoder], periods: List[PaymentPeriod]
+    ) -> Dict[str, Any]:
+        return {
+            "id": encoders["period_id"].encode([p.id for p in periods]),
+            "name": [p.name for p in periods],
+            "start_date": [p.start_date for p in periods],
+            "end_date": [p.end_date for p in periods],
+            "status": encoders["status"].encode(
+                [_enum_value(p.status) for p in periods]
+            ),
+            "report_id": [p.report_id for p in periods],
+            "entry_count": [len(p.time_entries) for p in periods],
+            "total_hours": [p.total_hours for p in periods],
+            "created_at": [p.created_at for p in periods],
+            "updated_at": [p.updated_at for p in periods],
+        }
+
+    def stream(self, table: str, period_id: Optional[str] = None) -> Iterator[bytes]:
+        """Encode a table as an Arrow IPC stream, one chunk per record batch.
+
+        Args:
+            table: Table name, one of EXPORT_TABLES
+            period_id: Only export the time entries of this payment period
+
+        Returns:
+            Iterator over the bytes of the stream
+        """
+        pa = load_pyarrow()
+        sink = io.BytesIO()
+
+        def drain() -> bytes:
+            data = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            return data
+
+        options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        with pa.ipc.new_stream(sink, self.schema(table), options=options) as writer:
+            for batch in self.iter_batches(table, period_id):
+                writer.write_batch(batch)
+                yield drain()
+        yield drain()
+
+    def write_dataset(
+        self, output_dir: Path, format: str = "parquet"
+    ) -> Dict[str, int]:
+        """Write all tables as files, with time entries partitioned by period.
+
+        Args:
+            output_dir: Directory to write to, created if missing
+            format: 'arrow' for Arrow IPC files or 'parquet'
+
+        Returns:
+            Number of rows written per table
+
+        Raises:
+            ValueError: If the format is invalid
+        """
+        if format not in EXPORT_FORMATS:
+            expected = ", ".join(EXPORT_FORMATS)
+            raise ValueError(
+                f"Invalid export format: {format}, expected one of {expected}"
+            )
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        counts = {}
+        for table in EXPORT_TABLES:
+            partitioned = table == "time_entries"
+            schema = self.schema(table, partitioned)
+            writer = None
+            current = None
+            count = 0
+            try:
+                for period_id, batch in self._iter_batches(table, None, partitioned):
+                    if writer is None or period_id != current:
+                        if writer is not None:
+                            writer.close()
+                        if partitioned:
+                            path = (
+                                output_dir
+                                / table
+                                / f"period_id={period_id}"
+                                / f"part-0.{format}"
+                            )
+                        else:
+                            path = output_dir / f"{table}.{format}"
+                        writer = self._open_file(path, schema, format)
+                        current = period_id
+                    writer.write_batch(batch)
+                    count += batch.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is None and not partitioned:
+                self._open_file(
+                    output_dir / f"{table}.{format}", schema, format
+                ).close()
+            counts[table] = count
+        logger.info(f"Exported {sum(counts.values())} rows as {format} to {output_dir}")
+        return counts
+
+    @staticmethod
+    def _open_file(path: Path, schema: Any, format: str) -> Any:
+        """Open a writer for an Arrow IPC or Parquet file."""
+        pa = load_pyarrow()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(path, schema, compression="zstd")
+        return pa.ipc.new_file(
+            path, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        )
+
+
+# Singleton instance for easy access
+arrow_exporter = ArrowExporter(data_service)
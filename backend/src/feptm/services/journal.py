@@ -0,0 +1,462 @@
+"""Append-only write-ahead journal with group commit and snapshots.
+
+The journal directory holds numbered log segments and snapshots:
+
+    journal-0000000000000001.log    records from sequence number 1
+    snapshot-0000000000000042/      data files with records 1..42 applied
+
+Each record is one line: the CRC32 of the payload in hex, a space and the
+JSON payload {"seq", "op", "at", "data"}. A torn line at the end of the
+last segment, left by a crash during a write, is truncated on open.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from feptm.core.metrics import registry
+from feptm.services.mutations import StorageError
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_RE = re.compile(r"^journal-(\d{16})\.log$")
+SNAPSHOT_RE = re.compile(r"^snapshot-(\d{16})$")
+
+JOURNAL_RECORDS = registry.counter(
+    "feptm_journal_records", "Records appended to the journal"
+)
+JOURNAL_COMMITS = registry.counter(
+    "feptm_journal_commits", "Group commits (write and fsync) of the journal"
+)
+JOURNAL_COMMIT_SECONDS = registry.histogram(
+    "feptm_journal_commit_seconds", "Time spent writing and syncing a group commit"
+)
+JOURNAL_FAILED_COMMITS = registry.counter(
+    "feptm_journal_failed_commits", "Group commits that failed and were rolled back"
+)
+
+
+class JournalError(StorageError):
+    """Raised when the journal cannot be written or read."""
+
+
+@dataclass
+class JournalRecord:
+    """A logged mutation."""
+
+    seq: int
+    op: str
+    at: str
+    data: Dict[str, Any]
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"journal-{first_seq:016d}.log"
+
+
+def _snapshot_name(seq: int) -> str:
+    return f"snapshot-{seq:016d}"
+
+
+def _encode(record: JournalRecord) -> bytes:
+    """Encode a record as a checksummed line."""
+    payload = json.dumps(
+        {"seq": record.seq, "op": record.op, "at": record.at, "data": record.data},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+
+def _decode(line: bytes) -> Optional[JournalRecord]:
+    """Decode a checksummed line, or return None if it is torn or corrupt."""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        fields = json.loads(payload)
+    except ValueError:
+        return None
+    return JournalRecord(
+        seq=fields["seq"], op=fields["op"], at=fields["at"], data=fields["data"]
+    )
+
+
+def _fsync_dir(path: Path) -> None:
+    """Persist a directory entry change such as a rename."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def list_segments(directory: Path) -> List[Tuple[int, Path]]:
+    """List log segments ordered by their first sequence number."""
+    segments = []
+    for path in directory.iterdir():
+        match = SEGMENT_RE.match(path.name)
+        if match:
+            segments.append((int(match.group(1)), path))
+    return sorted(segments)
+
+
+def latest_snapshot(directory: Path) -> Tuple[int, Optional[Path]]:
+    """Find the most recent complete snapshot.
+
+    Returns:
+        Sequence number covered by the snapshot (0 if none) and its directory
+    """
+    best: Tuple[int, Optional[Path]] = (0, None)
+    for path in directory.iterdir():
+        match = SNAPSHOT_RE.match(path.name)
+        if match and path.is_dir() and int(match.group(1)) >= best[0]:
+            best = (int(match.group(1)), path)
+    return best
+
+
+def write_snapshot(directory: Path, seq: int, files: Dict[str, Any]) -> Path:
+    """Write a snapshot atomically: to a temporary directory, then renamed.
+
+    Args:
+        directory: Journal directory
+        seq: Sequence number of the last record reflected in the snapshot
+        files: JSON data of each file by file name
+
+    Returns:
+        Snapshot directory
+    """
+    final = directory / _snapshot_name(seq)
+    tmp = directory / f"{final.name}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    for name, data in files.items():
+        with open(tmp / name, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+    _fsync_dir(tmp)
+    if final.exists():
+        shutil.rmtree(final)
+    tmp.rename(final)
+    _fsync_dir(directory)
+    return final
+
+
+class Journal:
+    """Append-only log of mutations with group commit.
+
+    Writers submit records, which are buffered and assigned sequence numbers,
+    and then wait until their record is durable. A background thread writes
+    all buffered records with a single write and fsync, so concurrent writers
+    share the cost of one sync.
+
+    When a commit fails, every record that is not durable yet fails with it:
+    the segment is truncated back to its last durable record, the waiting
+    writers get a JournalError and the epoch is incremented. Writers that
+    built on records that failed pass the epoch they saw to submit(), which
+    rejects them until they have rolled back. Only if the segment cannot be
+    repaired does the journal stop accepting records.
+    """
+
+    def __init__(self, directory: Path, commit_delay: float = 0.001):
+        """Open the journal, creating the directory if needed.
+
+        Args:
+            directory: Journal directory
+            commit_delay: Time the committer waits for more records before syncing
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.commit_delay = commit_delay
+        self.snapshot_seq, self.snapshot_dir = latest_snapshot(self.directory)
+
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._pending_seq = 0
+        self._durable_seq = 0
+        self._failed: List[Tuple[int, int]] = []
+        self._error: Optional[BaseException] = None
+        self.epoch = 0
+        self._closed = False
+        self._segment_bytes = 0
+
+        self.last_seq = self._recover()
+        self._durable_seq = self._pending_seq = self.last_seq
+        self._open_segment(self.last_seq + 1, reuse_last=True)
+
+        self._committer = threading.Thread(
+            target=self._run, name="feptm-journal", daemon=True
+        )
+        self._committer.start()
+
+    @property
+    def segment_bytes(self) -> int:
+        """Size of the current log segment in bytes."""
+        return self._segment_bytes
+
+    @property
+    def durable_seq(self) -> int:
+        """Sequence number of the last durable record."""
+        return self._durable_seq
+
+    def _recover(self) -> int:
+        """Validate the segments, truncate a torn tail and find the last sequence."""
+        last_seq = self.snapshot_seq
+        segments = list_segments(self.directory)
+        for position, (_, path) in enumerate(segments):
+            is_last = position == len(segments) - 1
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    record = _decode(line)
+                    if record is None:
+                        if not is_last:
+                            raise JournalError(
+                                f"Corrupt record in {path} at offset {offset}"
+                            )
+                        logger.warning(
+                            f"Truncating torn journal tail in {path} at offset {offset}"
+                        )
+                        with open(path, "r+b") as out:
+                            out.truncate(offset)
+                            os.fsync(out.fileno())
+                        break
+                    last_seq = max(last_seq, record.seq)
+                    offset += len(line)
+        return last_seq
+
+    def _open_segment(self, first_seq: int, reuse_last: bool = False) -> None:
+        """Open the segment new records are appended to."""
+        segments = list_segments(self.directory)
+        if reuse_last and segments:
+            path = segments[-1][1]
+        else:
+            path = self.directory / _segment_name(first_seq)
+        self._file = open(path, "ab")
+        self._segment_path = path
+        self._segment_bytes = self._file.tell()
+        _fsync_dir(self.directory)
+
+    def records(self, after_seq: int = 0) -> Iterator[JournalRecord]:
+        """Read the logged records in order.
+
+        Args:
+            after_seq: Only return records with a higher sequence number
+
+        Returns:
+            Iterator over the records
+        """
+        for _, path in list_segments(self.directory):
+            with open(path, "rb") as f:
+                for line in f:
+                    record = _decode(line)
+                    if record is None:
+                        break
+                    if record.seq > after_seq:
+                        yield record
+
+    def submit(
+        self, op: str, data: Dict[str, Any], at: str, epoch: Optional[int] = None
+    ) -> int:
+        """Buffer a record for the next group commit.
+
+        Args:
+            op: Mutation name
+            data: JSON-serializable mutation data
+            at: ISO timestamp of the mutation
+            epoch: Epoch the record was prepared in; if a commit failed since,
+                the record may depend on failed records and is rejected
+
+        Returns:
+            Sequence number of the record
+
+        Raises:
+            JournalError: If the journal is closed or failed, or the epoch is stale
+        """
+        with self._cond:
+            self._check()
+            if epoch is not None and epoch != self.epoch:
+                raise JournalError(
+                    "Journal commit failed, "
+                    "records after the last durable one were dropped"
+                )
+            seq = self._pending_seq + 1
+            line = _encode(JournalRecord(seq=seq, op=op, at=at, data=data))
+            self._pending.append(line)
+            self._pending_seq = seq
+            self.last_seq = seq
+            self._cond.notify_all()
+        JOURNAL_RECORDS.inc()
+        return seq
+
+    def wait(self, seq: int) -> None:
+        """Wait until a record is durable.
+
+        Args:
+            seq: Sequence number returned by submit
+
+        Raises:
+            JournalError: If the commit failed
+        """
+        with self._cond:
+            while True:
+                # Failed records keep their sequence numbers, so check them first
+                if any(first <= seq <= last for first, last in self._failed):
+                    raise JournalError(f"Journal commit of record {seq} failed")
+                if self._durable_seq >= seq:
+                    return
+                self._check()
+                self._cond.wait()
+
+    def _check(self) -> None:
+        """Raise if the journal cannot accept or commit records.
+
+        The lock must be held.
+        """
+        if self._error is not None:
+            raise JournalError(f"Journal commit failed: {self._error}")
+        if self._closed:
+            raise JournalError("Journal is closed")
+
+    def _run(self) -> None:
+        """Commit buffered records until closed."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
+            self._commit()
+
+    def _commit(self) -> None:
+        """Write and sync all buffered records."""
+        with self._cond:
+            batch, self._pending = self._pending, []
+            last = self._pending_seq
+            file = self._file
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            data = b"".join(batch)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        except OSError as e:
+            logger.error(f"Journal commit failed: {e}")
+            self._fail_pending()
+            return
+        JOURNAL_COMMITS.inc()
+        JOURNAL_COMMIT_SECONDS.observe(time.perf_counter() - started)
+        with self._cond:
+            self._segment_bytes += len(data)
+            self._durable_seq = last
+            self._cond.notify_all()
+
+    def _fail_pending(self) -> None:
+        """Fail the records that are not durable and repair the segment."""
+        JOURNAL_FAILED_COMMITS.inc()
+        with self._cond:
+            self._failed.append((self._durable_seq + 1, self._pending_seq))
+            self._pending = []
+            self.epoch += 1
+            try:
+                self._truncate_segment()
+            except OSError as e:
+                logger.error(f"Cannot repair journal segment {self._segment_path}: {e}")
+                self._error = e
+            self._cond.notify_all()
+
+    def _truncate_segment(self) -> None:
+        """Drop the bytes of a failed commit from the segment and reopen it.
+
+        The lock must be held.
+        """
+        try:
+            # Closing may flush more of the failed write, which is truncated next
+            self._file.close()
+        except OSError:
+            pass
+        with open(self._segment_path, "r+b") as f:
+            f.truncate(self._segment_bytes)
+            os.fsync(f.fileno())
+        self._file = open(self._segment_path, "ab")
+
+    def flush(self) -> int:
+        """Wait until all submitted records are durable or failed.
+
+        Returns:
+            Sequence number of the last durable record
+
+        Raises:
+            JournalError: If the journal is closed or cannot be repaired
+        """
+        with self._cond:
+            seq = self._pending_seq
+            while self._durable_seq < seq:
+                if any(first <= seq <= last for first, last in self._failed):
+                    break
+                self._check()
+                self._cond.wait()
+            return self._durable_seq
+
+    def rotate(self) -> int:
+        """Start a new segment after making all submitted records durable.
+
+        The caller must prevent concurrent submits, so the returned sequence
+        number is exactly the state a snapshot taken next reflects.
+
+        Returns:
+            Sequence number of the last record in the closed segments
+        """
+        seq = self.flush()
+        with self._cond:
+            self._file.close()
+            self._open_segment(seq + 1)
+        return seq
+
+    def compact(self, seq: int, files: Dict[str, Any]) -> Path:
+        """Write a snapshot covering records up to seq and drop what it replaces.
+
+        Args:
+            seq: Sequence number returned by rotate
+            files: JSON data of each snapshot file by file name
+
+        Returns:
+            Snapshot directory
+        """
+        snapshot = write_snapshot(self.directory, seq, files)
+        for first_seq, path in list_segments(self.directory):
+            if path != self._segment_path and first_seq <= seq:
+                path.unlink()
+        for path in self.directory.iterdir():
+            match = SNAPSHOT_RE.match(path.name)
+            if match and int(match.group(1)) < seq:
+                shutil.rmtree(path, ignore_errors=True)
+        self.snapshot_seq, self.snapshot_dir = seq, snapshot
+        logger.info(f"Compacted journal into {snapshot.name}")
+        return snapshot
+
+    def close(self) -> None:
+        """Commit buffered records and stop the committer."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._committer.join()
+        self._commit()
+        self._file.close()
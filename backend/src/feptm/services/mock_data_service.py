@@ -2,33 +2,215 @@
 
 import json
 import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TypeVar, Generic, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel, parse_obj_as
 
 from feptm.core.config import settings
+from feptm.core.metrics import DATA_CACHE_REQUESTS, DATA_LOAD_SECONDS
 from feptm.models import Specialist, Project, PaymentPeriod
-from feptm.models.payment import TimeEntry
+from feptm.models.payment import (
+    PaymentPeriodCreate,
+    PaymentPeriodUpdate,
+    TimeEntry,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from feptm.models.specialist import SpecialistUpdate
+from feptm.services.journal import Journal, JournalError
+from feptm.services.mutations import (
+    ChangeLog,
+    MutationRecord,
+    check_entry_date,
+    check_period_dates,
+    check_references,
+    check_specialist_dates,
+    complete_period_changes,
+    utcnow,
+)
+from feptm.services.query import Indexes, run_query
+from feptm.services.snapshot import DataSnapshot, SnapshotBuilder, SnapshotPin
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
+# A validated mutation: journal operation name and its JSON data
+Change = Tuple[str, Dict[str, Any]]
+
 
 class MockDataService(Generic[T]):
-    """Service for working with mock data from JSON files."""
+    """Service for working with mock data from JSON files.
+
+    The data is held in immutable generations (see feptm.services.snapshot).
+    Reads made inside pin(), which the API enters for each request, all see
+    the generation first read there; writes publish a new generation
+    copy-on-write, so readers never wait for writers. With a journal, a
+    generation is published only once the records it reflects are durable.
+
+    Changes to specialists, payment periods and time entries are logged to a write-ahead
+    journal before they are applied, when a journal directory is configured.
+    On load, the latest journal snapshot replaces the JSON data files and the
+    journal records after it are replayed on top.
+    """
+
+    def __init__(
+        self, data_dir: Optional[Path] = None, journal_dir: Optional[Path] = None
+    ):
+        """Initialize the mock data service.
+
+        Args:
+            data_dir: Directory with the JSON data files, defaults to DATA_DIR
+                or the bundled data
+            journal_dir: Directory of the write-ahead journal; without one,
+                changes are kept in memory only. Defaults to JOURNAL_DIR if
+                data_dir is not given either, as the configured journal
+                belongs to the configured data
+        """
+        self.data_dir = (
+            data_dir or settings.DATA_DIR or Path(__file__).parent.parent / "data"
+        )
+        self.journal_dir = (
+            journal_dir if data_dir is not None else journal_dir or settings.JOURNAL_DIR
+        )
+        self._current: Optional[DataSnapshot] = None
+        self._generation = 0
+        self._pinned: ContextVar[Optional[SnapshotPin]] = ContextVar(
+            f"feptm_data_pin_{id(self)}", default=None
+        )
+
+        # Period IDs by time entry ID for the write path, built on first write
+        self._entry_periods: Optional[Dict[str, str]] = None
 
-    def __init__(self):
-        """Initialize the mock data service."""
-        self.data_dir = Path(__file__).parent.parent / "data"
-        self._specialists: Optional[List[Specialist]] = None
-        self._projects: Optional[List[Project]] = None
-        self._payment_periods: Optional[List[PaymentPeriod]] = None
+        # Generations built on journal records that are not durable yet, by
+        # sequence number, with the records of their mutations
+        self._unpublished: Deque[Tuple[int, DataSnapshot, MutationRecord]] = deque()
+        # Mutation records of the latest published generations
+        self._changes = ChangeLog()
+        self._journal_epoch = 0
+
+        # Lock order: _compact_lock, then _write_lock
+        self._journal: Optional[Journal] = None
+        self._write_lock = threading.RLock()
+        self._compact_lock = threading.RLock()
+        self._compacting = False
         
         if not self.data_dir.exists():
             logger.warning(f"Mock data directory not found: {self.data_dir}")
+
+    @property
+    def data_version(self) -> int:
+        """Generation of the data reads see: the pinned one, or the latest."""
+        if self._pinned.get() is not None:
+            return self._snapshot().generation
+        return self._generation
+
+    def get_changes(
+        self, since_version: int, until_version: int
+    ) -> Optional[List[MutationRecord]]:
+        """Get the records of the mutations producing a range of generations.
+
+        Args:
+            since_version: Generation the caller is up to date with
+            until_version: Last generation to return the record of
+
+        Returns:
+            Records in order, or None if they are no longer all known, as
+            after a reload
+        """
+        return self._changes.between(since_version, until_version)
+
+    def reload(self) -> None:
+        """Drop the data so it is loaded again from the JSON files on next access.
+
+        Requests that pinned the current generation keep reading it.
+        """
+        with self._compact_lock, self._write_lock:
+            previous, self._current = self._current, None
+            self._entry_periods = None
+            self._unpublished.clear()
+            self._changes.clear()
+            self._generation += 1
+        if previous is not None:
+            previous.supersede()
+
+    def warm_up(self) -> None:
+        """Load all collections and build their indexes ahead of the first request."""
+        snapshot = self._latest()
+        for data_type in ("specialists", "projects", "payment_periods", "time_entries"):
+            snapshot.indexes(data_type)
+
+    def close(self) -> None:
+        """Commit pending journal records and close the journal."""
+        with self._write_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    @contextmanager
+    def pin(self) -> Iterator[None]:
+        """Make all reads in the current context see one generation of the data.
+
+        The generation is taken on the first read, so a context that reads
+        nothing loads nothing. Tasks and threads started from the context
+        share the pin. A write made in the context moves the pin to the
+        generation it publishes, so the context reads its own writes.
+        Nested pins keep the outer one.
+        """
+        if self._pinned.get() is not None:
+            yield
+            return
+        token = self._pinned.set(SnapshotPin())
+        try:
+            yield
+        finally:
+            self._pinned.reset(token)
+
+    def _get_journal(self) -> Optional[Journal]:
+        """Get the journal, opening it on first use.
+
+        Returns:
+            Journal, or None if no journal directory is configured
+        """
+        if self._journal is None and self.journal_dir is not None:
+            with self._write_lock:
+                if self._journal is None:
+                    self._journal = Journal(
+                        self.journal_dir, settings.JOURNAL_COMMIT_DELAY_MS / 1000
+                    )
+        return self._journal
+
+    def _source_dir(self) -> Path:
+        """Get the directory the data files are loaded from.
+
+        Returns:
+            Latest journal snapshot if there is one, the data directory otherwise
+        """
+        journal = self._get_journal()
+        if journal is not None and journal.snapshot_dir is not None:
+            return journal.snapshot_dir
+        return self.data_dir
     
     def _load_data(self, file_name: str, model_class: Type[T]) -> List[T]:
         """Load data from a JSON file and parse into model objects.
@@ -44,12 +226,13 @@ class MockDataService(Generic[T]):
             FileNotFoundError: If the file doesn't exist
             ValueError: If the data cannot be parsed
         """
-        file_path = self.data_dir / file_name
+        file_path = self._source_dir() / file_name
         
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return parse_obj_as(List[model_class], data)
+            with DATA_LOAD_SECONDS.labels("json", file_path.stem).time():
+                with open(file_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    return parse_obj_as(List[model_class], data)
         except FileNotFoundError:
             logger.error(f"Mock data file not found: {file_path}")
             return []
@@ -57,15 +240,175 @@ class MockDataService(Generic[T]):
             logger.error(f"Error loading mock data from {file_path}: {e}")
             return []
     
+    def _load_snapshot(self) -> DataSnapshot:
+        """Load the data files and replay the journal on top of them.
+
+        Returns:
+            Snapshot of the loaded data, not yet published
+
+        Raises:
+            JournalError: If a journal record cannot be applied
+        """
+        snapshot = DataSnapshot(
+            self._generation,
+            self._load_data("specialists.json", Specialist),
+            self._load_data("projects.json", Project),
+            self._load_data("payment_periods.json", PaymentPeriod),
+        )
+        self._entry_periods = None
+        journal = self._get_journal()
+        if journal is None:
+            return snapshot
+
+        # Records submitted before a reload must be on disk to be replayed
+        journal.flush()
+        self._journal_epoch = journal.epoch
+        self._build_entry_periods(snapshot)
+        # Nobody reads the loaded data yet, so the records are applied in place
+        builder = SnapshotBuilder(snapshot, shared=False)
+        count = 0
+        for record in journal.records(journal.snapshot_seq):
+            try:
+                self._apply(record.op, record.data, record.at, builder)
+            except (KeyError, ValueError, StopIteration) as e:
+                raise JournalError(
+                    f"Cannot replay journal record {record.seq} ({record.op}): {e!r}"
+                )
+            count += 1
+        if count:
+            logger.info(
+                f"Replayed {count} journal records on top of {self._source_dir()}"
+            )
+        return builder.build(self._generation)
+
+    def _latest(self) -> DataSnapshot:
+        """Get the latest generation, loading the data on first use.
+
+        Returns:
+            Latest published snapshot
+        """
+        snapshot = self._current
+        if snapshot is None:
+            with self._compact_lock, self._write_lock:
+                if self._current is None:
+                    self._publish(self._load_snapshot())
+                snapshot = self._current
+        return snapshot
+
+    def _snapshot(self) -> DataSnapshot:
+        """Get the generation reads see: the one pinned in the context, or the latest.
+
+        Returns:
+            Snapshot to read from
+        """
+        pin = self._pinned.get()
+        if pin is None:
+            return self._latest()
+        if pin.snapshot is None:
+            pin.snapshot = self._latest()
+        return pin.snapshot
+
+    def _publish(self, snapshot: DataSnapshot) -> None:
+        """Make a snapshot the latest generation; the write lock must be held.
+
+        Args:
+            snapshot: New generation
+        """
+        previous = self._current
+        snapshot.publish()
+        self._current = snapshot
+        self._generation = snapshot.generation
+        if previous is not None:
+            previous.supersede()
+
+    def _tip(self) -> DataSnapshot:
+        """Get the generation writes build on; the write lock must be held.
+
+        Returns:
+            Newest generation, including changes that are not durable yet
+        """
+        return self._unpublished[-1][1] if self._unpublished else self._current
+
+    def _publish_durable(self, journal: Journal) -> None:
+        """Publish the newest generation whose journal records are all durable.
+
+        The write lock must be held.
+
+        Args:
+            journal: Journal the records were submitted to
+        """
+        durable_seq = journal.durable_seq
+        snapshot = None
+        while self._unpublished and self._unpublished[0][0] <= durable_seq:
+            _, snapshot, record = self._unpublished.popleft()
+            self._changes.add(snapshot.generation, record)
+        if snapshot is not None:
+            self._publish(snapshot)
+
+    def _roll_back(self, journal: Journal) -> None:
+        """Drop the generations whose journal records failed to commit.
+
+        The write lock must be held.
+
+        Args:
+            journal: Journal whose commit failed
+        """
+        self._publish_durable(journal)
+        if self._unpublished:
+            logger.warning(
+                f"Rolled back {len(self._unpublished)} changes "
+                "after a failed journal commit"
+            )
+            self._unpublished.clear()
+        self._build_entry_periods(self._current)
+        self._journal_epoch = journal.epoch
+
+    def _get_collection(self, data_type: str) -> List[Any]:
+        """Get all items of a collection.
+
+        Args:
+            data_type: Type of data to get
+                ('specialists', 'projects', 'payment_periods', 'time_entries')
+
+        Returns:
+            List of items
+
+        Raises:
+            ValueError: If data_type is invalid
+        """
+        self._record_cache(data_type)
+        return self._snapshot().collection(data_type)
+
+    def _record_cache(self, data_type: str) -> None:
+        """Count a lookup of a collection as a hit, or a miss if the data is loaded.
+
+        Args:
+            data_type: Type of data
+        """
+        pin = self._pinned.get()
+        loaded = self._current is not None or (
+            pin is not None and pin.snapshot is not None
+        )
+        DATA_CACHE_REQUESTS.labels(data_type, "hit" if loaded else "miss").inc()
+
+    def _get_indexes(self, data_type: str) -> Indexes:
+        """Get the hash indexes of a collection, building them on first use.
+
+        Args:
+            data_type: Type of data
+
+        Returns:
+            Indexes of the collection by field name
+        """
+        return self._snapshot().indexes(data_type)
+
     def get_specialists(self) -> List[Specialist]:
         """Get all specialists.
         
         Returns:
             List of specialists
         """
-        if self._specialists is None:
-            self._specialists = self._load_data("specialists.json", Specialist)
-        return self._specialists
+        return self._get_collection("specialists")
     
     def get_specialist(self, specialist_id: str) -> Optional[Specialist]:
         """Get a specialist by ID.
@@ -76,11 +419,8 @@ class MockDataService(Generic[T]):
         Returns:
             Specialist if found, None otherwise
         """
-        specialists = self.get_specialists()
-        for specialist in specialists:
-            if specialist.id == specialist_id:
-                return specialist
-        return None
+        matches = self._get_indexes("specialists")["id"].get(specialist_id)
+        return matches[0] if matches else None
     
     def get_projects(self) -> List[Project]:
         """Get all projects.
@@ -88,9 +428,7 @@ class MockDataService(Generic[T]):
         Returns:
             List of projects
         """
-        if self._projects is None:
-            self._projects = self._load_data("projects.json", Project)
-        return self._projects
+        return self._get_collection("projects")
     
     def get_project(self, project_id: str) -> Optional[Project]:
         """Get a project by ID.
@@ -101,11 +439,8 @@ class MockDataService(Generic[T]):
         Returns:
             Project if found, None otherwise
         """
-        projects = self.get_projects()
-        for project in projects:
-            if project.id == project_id:
-                return project
-        return None
+        matches = self._get_indexes("projects")["id"].get(project_id)
+        return matches[0] if matches else None
     
     def get_payment_periods(self) -> List[PaymentPeriod]:
         """Get all payment periods.
@@ -113,9 +448,7 @@ class MockDataService(Generic[T]):
         Returns:
             List of payment periods
         """
-        if self._payment_periods is None:
-            self._payment_periods = self._load_data("payment_periods.json", PaymentPeriod)
-        return self._payment_periods
+        return self._get_collection("payment_periods")
     
     def get_payment_period(self, period_id: str) -> Optional[PaymentPeriod]:
         """Get a payment period by ID.
@@ -126,11 +459,142 @@ class MockDataService(Generic[T]):
         Returns:
             PaymentPeriod if found, None otherwise
         """
-        periods = self.get_payment_periods()
-        for period in periods:
-            if period.id == period_id:
-                return period
-        return None
+        matches = self._get_indexes("payment_periods")["id"].get(period_id)
+        return matches[0] if matches else None
+
+    def get_by_ids(self, data_type: str, ids: List[str]) -> Dict[str, Any]:
+        """Get items of a collection by their IDs in one pass over the ID index.
+
+        Args:
+            data_type: Type of data
+                ('specialists', 'projects', 'payment_periods', 'time_entries')
+            ids: IDs of the items
+
+        Returns:
+            Found items by ID, in the order of the IDs; missing IDs are left out
+
+        Raises:
+            ValueError: If data_type is invalid
+        """
+        index = self._get_indexes(data_type)["id"]
+        found = {}
+        for item_id in ids:
+            matches = index.get(item_id)
+            if matches:
+                found[item_id] = matches[0]
+        return found
+
+    def payment_period_exists(self, period_id: str) -> bool:
+        """Check whether a payment period exists.
+
+        Args:
+            period_id: ID of the payment period
+
+        Returns:
+            True if the payment period exists, False otherwise
+        """
+        return self.get_payment_period(period_id) is not None
+
+    @staticmethod
+    def _select_periods(
+        snapshot: DataSnapshot, period_id: Optional[str]
+    ) -> List[PaymentPeriod]:
+        """Select the periods a report is built from.
+
+        Args:
+            snapshot: Generation to read from
+            period_id: ID of a single payment period, or None for all periods
+
+        Returns:
+            List of selected payment periods
+        """
+        filters = {"id": period_id} if period_id is not None else {}
+        return run_query(
+            "payment_periods",
+            snapshot.payment_periods,
+            filters,
+            snapshot.indexes("payment_periods"),
+        )
+
+    def get_specialist_report_data(
+        self, period_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate hours and amounts per specialist.
+
+        Args:
+            period_id: Restrict the report to a single payment period
+
+        Returns:
+            List of report rows with specialist_id, full_name, role, total_hours,
+            hourly_rate and total_amount
+        """
+        snapshot = self._snapshot()
+        specialist_map = {s.id: s for s in snapshot.specialists}
+        rows: Dict[str, Dict[str, Any]] = {}
+
+        for period in self._select_periods(snapshot, period_id):
+            for specialist_id, hours in period.specialist_totals.items():
+                specialist = specialist_map.get(specialist_id)
+                if specialist is None:
+                    continue
+                if specialist_id not in rows:
+                    rows[specialist_id] = {
+                        "specialist_id": specialist_id,
+                        "full_name": specialist.full_name,
+                        "role": specialist.role.value,
+                        "total_hours": 0.0,
+                        "hourly_rate": specialist.hourly_rate,
+                        "total_amount": 0.0,
+                    }
+                row = rows[specialist_id]
+                row["total_hours"] += hours
+                row["total_amount"] = row["total_hours"] * specialist.hourly_rate
+
+        return list(rows.values())
+
+    def get_project_report_data(
+        self, period_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate hours and distinct specialists per project.
+
+        Args:
+            period_id: Restrict the report to a single payment period
+
+        Returns:
+            List of report rows with project_id, name, client_name, total_hours
+            and specialist_count
+        """
+        snapshot = self._snapshot()
+        project_map = {p.id: p for p in snapshot.projects}
+        rows: Dict[str, Dict[str, Any]] = {}
+        specialists_per_project: Dict[str, set] = {}
+
+        for period in self._select_periods(snapshot, period_id):
+            for entry in period.time_entries:
+                specialists_per_project.setdefault(entry.project_id, set()).add(
+                    entry.specialist_id
+                )
+
+            for project_id, hours in period.project_totals.items():
+                project = project_map.get(project_id)
+                if project is None:
+                    continue
+                if project_id not in rows:
+                    rows[project_id] = {
+                        "project_id": project_id,
+                        "name": project.name,
+                        "client_name": project.client_name,
+                        "total_hours": 0.0,
+                        "specialist_count": 0,
+                    }
+                rows[project_id]["total_hours"] += hours
+
+        for project_id, row in rows.items():
+            row["specialist_count"] = len(
+                specialists_per_project.get(project_id, set())
+            )
+
+        return list(rows.values())
     
     def get_time_entries(self, 
                        specialist_id: Optional[str] = None, 
@@ -148,18 +612,36 @@ class MockDataService(Generic[T]):
         Returns:
             List of time entries matching the filters
         """
-        periods = self.get_payment_periods()
-        result: List[TimeEntry] = []
+        filters = {
+            "specialist_id": specialist_id,
+            "project_id": project_id,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        return self.get_filtered_data(
+            "time_entries", {k: v for k, v in filters.items() if v is not None}
+        )
         
-        for period in periods:
-            for entry in period.time_entries:
-                if (specialist_id is None or entry.specialist_id == specialist_id) and \
-                   (project_id is None or entry.project_id == project_id) and \
-                   (start_date is None or entry.date >= start_date) and \
-                   (end_date is None or entry.date <= end_date):
-                    result.append(entry)
+    def iter_time_entry_columns(
+        self, batch_size: int, period_id: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, Sequence[Any]]]]:
+        """Iterate over time entries as columns, in batches, period by period.
         
-        return result
+        Args:
+            batch_size: Maximum number of entries per batch
+            period_id: Only iterate over the entries of this payment period
+
+        Returns:
+            Iterator over (period ID, values by TimeEntry field) pairs; a batch
+                never spans two periods
+        """
+        fields = tuple(TimeEntry.model_fields)
+        get_row = attrgetter(*fields)
+        for period in self._select_periods(self._snapshot(), period_id):
+            entries = period.time_entries
+            for start in range(0, len(entries), batch_size):
+                rows = list(map(get_row, entries[start : start + batch_size]))
+                yield period.id, dict(zip(fields, zip(*rows)))
     
     def get_filtered_data(self, 
                         data_type: str, 
@@ -174,43 +656,415 @@ class MockDataService(Generic[T]):
             List of data items matching the filters
             
         Raises:
-            ValueError: If data_type is invalid
+            ValueError: If data_type or a filter is invalid
         """
-        filters = filters or {}
+        self._record_cache(data_type)
+        snapshot = self._snapshot()
+        indexes = snapshot.indexes(data_type)
+        # The time entries are only collected if no index serves the query
+        return run_query(
+            data_type, lambda: snapshot.collection(data_type), filters, indexes
+        )
         
-        if data_type == "specialists":
-            data = self.get_specialists()
-            # Simple filtering for demonstration
-            if "active" in filters:
-                data = [s for s in data if s.active == filters["active"]]
-            if "role" in filters:
-                data = [s for s in data if s.role.value == filters["role"]]
-            return data
+    def _build_entry_periods(self, snapshot: DataSnapshot) -> None:
+        """Build the lookup of period IDs by time entry ID.
             
-        elif data_type == "projects":
-            data = self.get_projects()
-            if "status" in filters:
-                data = [p for p in data if p.status.value == filters["status"]]
-            if "project_type" in filters:
-                data = [p for p in data if p.project_type.value == filters["project_type"]]
-            return data
+        Args:
+            snapshot: Latest generation
+        """
+        self._entry_periods = {
+            e.id: p.id for p in snapshot.payment_periods for e in p.time_entries
+        }
             
-        elif data_type == "payment_periods":
-            data = self.get_payment_periods()
-            if "status" in filters:
-                data = [p for p in data if p.status.value == filters["status"]]
-            return data
+    @staticmethod
+    def _entry_position(period: PaymentPeriod, entry_id: str) -> int:
+        """Find the position of a time entry in its period."""
+        return next(
+            i for i, entry in enumerate(period.time_entries) if entry.id == entry_id
+        )
             
-        elif data_type == "time_entries":
-            return self.get_time_entries(
-                specialist_id=filters.get("specialist_id"),
-                project_id=filters.get("project_id"),
-                start_date=filters.get("start_date"),
-                end_date=filters.get("end_date")
+    def _apply(
+        self, op: str, data: Dict[str, Any], at: str, builder: SnapshotBuilder
+    ) -> Any:
+        """Apply a mutation in its logged form.
+
+        New calls and journal replay both go through here, so replaying the
+        journal rebuilds exactly the state the original calls produced.
+
+        Args:
+            op: Journal operation name
+            data: JSON data of the mutation
+            at: ISO timestamp of the mutation
+            builder: Builder of the next generation
+
+        Returns:
+            Record of the mutation
+
+        Raises:
+            JournalError: If the operation is unknown
+        """
+        timestamp = datetime.fromisoformat(at)
+        if op == "specialist.update":
+            specialists = builder.edit_specialists()
+            position = next(i for i, s in enumerate(specialists) if s.id == data["id"])
+            changes = SpecialistUpdate.model_validate(data["changes"])
+            update = {name: getattr(changes, name) for name in changes.model_fields_set}
+            before: Any = specialists[position]
+            result: Any = before.model_copy(update=update)
+            specialists[position] = result
+        elif op == "period.create":
+            period = PaymentPeriod.model_validate(data["period"])
+            builder.add_period(period)
+            before, result = None, period
+        elif op == "period.update":
+            before = builder.get_period(data["id"]).model_copy()
+            period = builder.edit_period(data["id"])
+            changes = PaymentPeriodUpdate.model_validate(data["changes"])
+            for name in changes.model_fields_set:
+                setattr(period, name, getattr(changes, name))
+            period.updated_at = timestamp
+            result = period
+        elif op == "entry.create":
+            entry = TimeEntry.model_validate(data["entry"])
+            period = builder.add_entry(data["period_id"], entry)
+            period.updated_at = timestamp
+            self._entry_periods[entry.id] = period.id
+            return MutationRecord(op, None, entry, period.id)
+        elif op == "entry.update":
+            period_id = self._entry_periods[data["id"]]
+            period = builder.get_period(period_id)
+            position = self._entry_position(period, data["id"])
+            changes = TimeEntryUpdate.model_validate(data["changes"])
+            update = {name: getattr(changes, name) for name in changes.model_fields_set}
+            before = period.time_entries[position]
+            result = before.model_copy(update={**update, "updated_at": timestamp})
+            period = builder.replace_entry(period_id, position, result)
+            period.recalculate_totals()
+            period.updated_at = timestamp
+            return MutationRecord(op, before, result, period_id)
+        elif op == "entry.delete":
+            period_id = self._entry_periods[data["id"]]
+            period = builder.get_period(period_id)
+            position = self._entry_position(period, data["id"])
+            before = period.time_entries[position]
+            period = builder.remove_entry(period_id, position)
+            del self._entry_periods[data["id"]]
+            period.recalculate_totals()
+            period.updated_at = timestamp
+            return MutationRecord(op, before, None, period_id)
+        else:
+            raise JournalError(f"Unknown journal operation: {op}")
+        return MutationRecord(op, before, result)
+
+    def _mutate(self, prepare: Callable[[datetime], Optional[Change]]) -> Any:
+        """Validate a mutation, log it to the journal and publish the new generation.
+
+        The record is submitted and applied under the write lock, so the
+        journal order is the order of the changes. Waiting for the record to
+        become durable happens outside the lock, which lets concurrent writes
+        share one group commit. Validation and the next write build on the
+        newest generation, but readers only get it once its record is
+        durable; if the commit fails, it is rolled back instead.
+
+        Args:
+            prepare: Function validating the mutation at the given time and
+                returning the change, or None if its target does not exist
+
+        Returns:
+            Result of the mutation, or None if its target does not exist
+
+        Raises:
+            ValueError: If the mutation is invalid
+            JournalError: If the journal cannot be written
+        """
+        while True:
+            snapshot = self._latest()
+            with self._write_lock:
+                # Load again if the data was reloaded in the meantime
+                if snapshot is not self._current:
+                    continue
+                journal = self._get_journal()
+                if journal is not None and journal.epoch != self._journal_epoch:
+                    self._roll_back(journal)
+                tip = self._tip()
+                if self._entry_periods is None:
+                    self._build_entry_periods(tip)
+                at = utcnow()
+                token = self._pinned.set(SnapshotPin(tip))
+                try:
+                    change = prepare(at)
+                finally:
+                    self._pinned.reset(token)
+                if change is None:
+                    return None
+                op, data = change
+                seq = (
+                    journal.submit(op, data, at.isoformat(), self._journal_epoch)
+                    if journal is not None
+                    else None
+                )
+                builder = SnapshotBuilder(tip)
+                record = self._apply(op, data, at.isoformat(), builder)
+                if seq is None:
+                    # Log the record first, so a reader seeing the generation
+                    # also finds its record
+                    self._changes.add(tip.generation + 1, record)
+                    self._publish(builder.build(tip.generation + 1))
+                else:
+                    self._unpublished.append(
+                        (seq, builder.build(tip.generation + 1), record)
+                    )
+            break
+
+        if seq is not None:
+            try:
+                journal.wait(seq)
+            finally:
+                with self._write_lock:
+                    self._publish_durable(journal)
+            self._maybe_compact(journal)
+        # Let the rest of the request read its own write
+        pin = self._pinned.get()
+        if pin is not None:
+            pin.snapshot = self._latest()
+        return record.after if record.after is not None else True
+
+    def update_specialist(
+        self, specialist_id: str, changes: SpecialistUpdate
+    ) -> Optional[Specialist]:
+        """Update a specialist.
+
+        Args:
+            specialist_id: ID of the specialist
+            changes: Fields to change
+
+        Returns:
+            Updated specialist, or None if not found
+
+        Raises:
+            ValueError: If the specialist would leave before being hired
+        """
+        values = changes.model_dump(exclude_unset=True)
+
+        def prepare(at: datetime) -> Optional[Change]:
+            specialist = self.get_specialist(specialist_id)
+            if specialist is None:
+                return None
+            check_specialist_dates(
+                values.get("hire_date", specialist.hire_date),
+                values.get("leave_date", specialist.leave_date),
             )
+            return "specialist.update", {
+                "id": specialist_id,
+                "changes": changes.model_dump(mode="json", exclude_unset=True),
+            }
             
-        else:
-            raise ValueError(f"Invalid data type: {data_type}")
+        return self._mutate(prepare)
+
+    def create_payment_period(self, data: PaymentPeriodCreate) -> PaymentPeriod:
+        """Create a payment period.
+
+        Args:
+            data: Payment period data
+
+        Returns:
+            Created payment period
+
+        Raises:
+            ValueError: If the period ends before it starts
+        """
+        check_period_dates(data.start_date, data.end_date)
+
+        def prepare(at: datetime) -> Change:
+            period = PaymentPeriod(
+                **data.model_dump(exclude_none=True), created_at=at, updated_at=at
+            )
+            return "period.create", {"period": period.model_dump(mode="json")}
+
+        return self._mutate(prepare)
+
+    def update_payment_period(
+        self, period_id: str, changes: PaymentPeriodUpdate
+    ) -> Optional[PaymentPeriod]:
+        """Update a payment period.
+
+        Args:
+            period_id: ID of the payment period
+            changes: Fields to change
+
+        Returns:
+            Updated payment period, or None if not found
+
+        Raises:
+            ValueError: If the new dates are invalid or leave time entries
+                outside the period
+        """
+        values = changes.model_dump(exclude_unset=True)
+
+        def prepare(at: datetime) -> Optional[Change]:
+            period = self.get_payment_period(period_id)
+            if period is None:
+                return None
+            start_date = values.get("start_date", period.start_date)
+            end_date = values.get("end_date", period.end_date)
+            check_period_dates(start_date, end_date)
+            if "start_date" in values or "end_date" in values:
+                for entry in period.time_entries:
+                    check_entry_date(entry.date, start_date, end_date)
+            # The record holds the generated name, so replay does not generate it again
+            completed = PaymentPeriodUpdate.model_validate(
+                complete_period_changes(
+                    period.name, period.start_date, period.end_date, values
+                )
+            )
+            return "period.update", {
+                "id": period_id,
+                "changes": completed.model_dump(mode="json", exclude_unset=True),
+            }
+
+        return self._mutate(prepare)
+
+    def add_time_entry(
+        self, period_id: str, data: TimeEntryCreate
+    ) -> Optional[TimeEntry]:
+        """Add a time entry to a payment period.
+
+        Args:
+            period_id: ID of the payment period
+            data: Time entry data
+
+        Returns:
+            Created time entry, or None if the payment period was not found
+
+        Raises:
+            ValueError: If the specialist or project does not exist, or the
+                date is outside the payment period
+        """
+
+        def prepare(at: datetime) -> Optional[Change]:
+            period = self.get_payment_period(period_id)
+            if period is None:
+                return None
+            check_references(self, data.specialist_id, data.project_id)
+            check_entry_date(data.date, period.start_date, period.end_date)
+            entry = TimeEntry(**data.model_dump(), created_at=at, updated_at=at)
+            return "entry.create", {
+                "period_id": period_id,
+                "entry": entry.model_dump(mode="json"),
+            }
+
+        return self._mutate(prepare)
+
+    def update_time_entry(
+        self, entry_id: str, changes: TimeEntryUpdate
+    ) -> Optional[TimeEntry]:
+        """Update a time entry.
+
+        Args:
+            entry_id: ID of the time entry
+            changes: Fields to change
+
+        Returns:
+            Updated time entry, or None if not found
+
+        Raises:
+            ValueError: If the specialist or project does not exist, or the
+                date is outside the payment period
+        """
+        values = changes.model_dump(exclude_unset=True)
+
+        def prepare(at: datetime) -> Optional[Change]:
+            period_id = self._entry_periods.get(entry_id)
+            if period_id is None:
+                return None
+            period = self.get_payment_period(period_id)
+            check_references(
+                self, values.get("specialist_id"), values.get("project_id")
+            )
+            if "date" in values:
+                check_entry_date(values["date"], period.start_date, period.end_date)
+            return "entry.update", {
+                "id": entry_id,
+                "changes": changes.model_dump(mode="json", exclude_unset=True),
+            }
+
+        return self._mutate(prepare)
+
+    def delete_time_entry(self, entry_id: str) -> bool:
+        """Delete a time entry.
+
+        Args:
+            entry_id: ID of the time entry
+
+        Returns:
+            True if the time entry was deleted, False if not found
+        """
+
+        def prepare(at: datetime) -> Optional[Change]:
+            if entry_id not in self._entry_periods:
+                return None
+            return "entry.delete", {"id": entry_id}
+
+        return self._mutate(prepare) is not None
+
+    def compact(self) -> Optional[Dict[str, Any]]:
+        """Write a journal snapshot of the current data and drop the records it covers.
+
+        Writes are blocked only while the journal is rotated; the generation
+        current at that point is immutable, so it is serialized and written
+        after the write lock is released.
+
+        Returns:
+            Sequence number and name of the snapshot, or None without a journal
+        """
+        if self._get_journal() is None:
+            return None
+        with self._compact_lock:
+            with self._write_lock:
+                journal = self._get_journal()
+                self._latest()
+                if journal.epoch != self._journal_epoch:
+                    self._roll_back(journal)
+                seq = journal.rotate()
+                # All records up to seq are durable now, so this generation
+                # reflects exactly them
+                self._publish_durable(journal)
+                snapshot = self._current
+            files = {
+                "specialists.json": [
+                    s.model_dump(mode="json") for s in snapshot.specialists
+                ],
+                "projects.json": [p.model_dump(mode="json") for p in snapshot.projects],
+                "payment_periods.json": [
+                    p.model_dump(mode="json") for p in snapshot.payment_periods
+                ],
+            }
+            path = journal.compact(seq, files)
+        return {"seq": seq, "snapshot": path.name}
+
+    def _maybe_compact(self, journal: Journal) -> None:
+        """Start a compaction in the background once the journal is large enough."""
+        if (
+            not settings.JOURNAL_COMPACT_BYTES
+            or journal.segment_bytes < settings.JOURNAL_COMPACT_BYTES
+        ):
+            return
+        with self._write_lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(
+            target=self._compact_in_background, name="feptm-compact", daemon=True
+        ).start()
+
+    def _compact_in_background(self) -> None:
+        """Run a compaction, logging instead of raising errors."""
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Journal compaction failed: {e}")
+        finally:
+            self._compacting = False
 
 
 # Singleton instance for easy access
@@ -0,0 +1,195 @@
+"""Validation and change records shared by the data services' mutation methods.
+
+Every mutation increments the data version. The data services keep the
+records of the latest mutations in a ChangeLog, so consumers holding data
+derived from one version can catch up with the changes since, rather than
+derive it again from all of the data.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from feptm.core.utils import format_date_range
+
+# Number of data versions whose mutation records are kept
+CHANGE_LOG_SIZE = 1024
+
+
+class StorageError(Exception):
+    """Raised when a change cannot be stored, e.g. the storage is failing or busy."""
+
+
+def utc(value: datetime) -> datetime:
+    """Make a datetime timezone-aware, treating naive values as UTC.
+
+    Args:
+        value: Datetime to convert
+
+    Returns:
+        Timezone-aware datetime
+    """
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def utcnow() -> datetime:
+    """Get the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
+def check_period_dates(start_date: datetime, end_date: datetime) -> None:
+    """Check that a payment period does not end before it starts.
+
+    Raises:
+        ValueError: If the end date is before the start date
+    """
+    if utc(end_date) < utc(start_date):
+        raise ValueError("Payment period end_date is before start_date")
+
+
+def check_specialist_dates(hire_date: datetime, leave_date: Optional[datetime]) -> None:
+    """Check that a specialist does not leave before being hired.
+
+    Raises:
+        ValueError: If the leave date is before the hire date
+    """
+    if leave_date is not None and utc(leave_date) < utc(hire_date):
+        raise ValueError("Specialist leave_date is before hire_date")
+
+
+def check_entry_date(date: datetime, start_date: datetime, end_date: datetime) -> None:
+    """Check that a time entry falls within its payment period.
+
+    Raises:
+        ValueError: If the date is outside the period
+    """
+    if not utc(start_date) <= utc(date) <= utc(end_date):
+        raise ValueError(
+            f"Time entry date {date.isoformat()} is outside the payment period "
+            f"{start_date.isoformat()} - {end_date.isoformat()}"
+        )
+
+
+def complete_period_changes(
+    name: Optional[str],
+    start_date: datetime,
+    end_date: datetime,
+    values: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Complete the changes to a payment period with its generated name.
+
+    A name generated from the dates follows them when they change, and a
+    cleared name is generated again, as for a new period.
+
+    Args:
+        name: Current name of the period
+        start_date: Current start date
+        end_date: Current end date
+        values: Changed fields
+
+    Returns:
+        Changed fields, with the name if it has to change
+    """
+    new_start = values.get("start_date", start_date)
+    new_end = values.get("end_date", end_date)
+    if "name" in values:
+        if values["name"] is not None:
+            return values
+    elif not (
+        ("start_date" in values or "end_date" in values)
+        and name == format_date_range(start_date, end_date)
+    ):
+        return values
+    return {**values, "name": format_date_range(new_start, new_end)}
+
+
+def check_references(
+    data_service: Any, specialist_id: Optional[str], project_id: Optional[str]
+) -> None:
+    """Check that the specialist and project of a time entry exist.
+
+    Args:
+        data_service: Data service to look them up in
+        specialist_id: Specialist ID, None to skip the check
+        project_id: Project ID, None to skip the check
+
+    Raises:
+        ValueError: If the specialist or project does not exist
+    """
+    if specialist_id is not None and data_service.get_specialist(specialist_id) is None:
+        raise ValueError(f"Specialist with ID {specialist_id} not found")
+    if project_id is not None and data_service.get_project(project_id) is None:
+        raise ValueError(f"Project with ID {project_id} not found")
+
+
+@dataclass(frozen=True)
+class MutationRecord:
+    """Change made by one mutation.
+
+    Payment periods may be recorded without their time entries.
+    """
+
+    # Journal operation name, such as 'entry.update'
+    op: str
+    # Item before the change, None if it was created
+    before: Any
+    # Item after the change, None if it was deleted
+    after: Any
+    # Payment period of a changed time entry
+    period_id: Optional[str] = None
+
+
+class ChangeLog:
+    """Mutation records of the latest data versions."""
+
+    def __init__(self, size: int = CHANGE_LOG_SIZE):
+        """Initialize an empty log.
+
+        Args:
+            size: Number of versions to keep
+        """
+        self.size = size
+        self._records: "OrderedDict[int, MutationRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, version: int, record: MutationRecord) -> None:
+        """Log the record of the mutation that produced a version.
+
+        Args:
+            version: Data version after the mutation
+            record: Record of the mutation
+        """
+        with self._lock:
+            self._records[version] = record
+            while len(self._records) > self.size:
+                self._records.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all records, as after the data was loaded again."""
+        with self._lock:
+            self._records.clear()
+
+    def between(
+        self, since_version: int, until_version: int
+    ) -> Optional[List[MutationRecord]]:
+        """Get the records of the versions after one up to another.
+
+        Args:
+            since_version: Version the caller is up to date with
+            until_version: Last version to return the record of
+
+        Returns:
+            Records in version order, or None if any of them is not logged
+        """
+        if until_version - since_version > self.size:
+            return None
+        with self._lock:
+            records = [
+                self._records.get(version)
+                for version in range(since_version + 1, until_version + 1)
+            ]
+        if any(record is None for record in records):
+            return None
+        return records  # type: ignore[return-value]
@@ -0,0 +1,579 @@
+"""Propagation of specialist changes to the timesheets linked to them.
+
+A dependency index maps each specialist to the timesheets of their projects
+(Project.timesheet_id) and to the open payment periods they logged time in.
+A change is planned as the cells it touches. The dispatcher coalesces
+pending cells, keeping the latest value of each, and sends them as one
+batch per spreadsheet with adjacent cells of a row merged into one range.
+
+Timesheet layout, with row 1 holding the headers and one row per project
+specialist in the order of Project.specialist_ids:
+
+- "Specialists" tab: full name, email, role, hourly rate, hire date, leave
+  date, active (columns A-G)
+- One tab per payment period, titled with the period name: full name, role,
+  hours, hourly rate and an amount formula (columns A-E)
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from feptm.core.config import settings
+from feptm.core.metrics import registry
+from feptm.models import PaymentPeriod, Specialist
+from feptm.models.payment import PaymentStatus, TimeEntry
+from feptm.models.specialist import SpecialistUpdate
+from feptm.services.data_service import data_service
+from feptm.services.mutations import MutationRecord
+from feptm.services.sheets import SheetsClient, create_sheets_client
+
+logger = logging.getLogger(__name__)
+
+SPECIALISTS_SHEET = "Specialists"
+
+# Row of the first specialist, below the headers
+FIRST_ROW = 2
+
+# Columns of the specialists tab by specialist field
+SPECIALIST_COLUMNS: Dict[str, str] = {
+    "full_name": "A",
+    "email": "B",
+    "role": "C",
+    "hourly_rate": "D",
+    "hire_date": "E",
+    "leave_date": "F",
+    "active": "G",
+}
+
+# Columns of a period tab by specialist field; hours and the amount formula
+# are not touched
+PERIOD_COLUMNS: Dict[str, str] = {
+    "full_name": "A",
+    "role": "B",
+    "hourly_rate": "D",
+}
+
+# Periods whose tabs keep the values they were approved with
+FROZEN_STATUSES = (PaymentStatus.APPROVED, PaymentStatus.PAID)
+
+# Maximum number of ranges in one batchUpdate request
+MAX_RANGES_PER_REQUEST = 500
+
+SHEETS_CELL_UPDATES = registry.counter(
+    "feptm_sheets_cell_updates",
+    "Planned cell updates of linked spreadsheets",
+    ("result",),
+)
+SHEETS_REQUESTS = registry.counter(
+    "feptm_sheets_requests", "Batch update requests sent to the Sheets API", ("result",)
+)
+
+# Dispatch key: (spreadsheet ID, tab title, row, column)
+CellKey = Tuple[str, str, int, str]
+
+
+@dataclass(frozen=True)
+class CellUpdate:
+    """Value to write to a cell of a spreadsheet."""
+
+    spreadsheet_id: str
+    sheet: str
+    row: int
+    column: str
+    value: Any
+
+    @property
+    def key(self) -> CellKey:
+        """Key identifying the cell."""
+        return self.spreadsheet_id, self.sheet, self.row, self.column
+
+
+@dataclass(frozen=True)
+class SheetLink:
+    """Row of a specialist in the timesheet of a project."""
+
+    project_id: str
+    spreadsheet_id: str
+    row: int
+
+
+# Logged time of a specialist on a project: (specialist ID, project ID)
+WorkPair = Tuple[str, str]
+
+
+@dataclass
+class DependencyIndex:
+    """Timesheets and period tabs that show each specialist.
+
+    The index is kept current by applying the mutation records of the data
+    service, which is cheaper than building it again for every change.
+    Projects are not changed by mutations; loading other data requires a
+    new index.
+    """
+
+    # Timesheet rows by specialist ID
+    sheets: Dict[str, List[SheetLink]] = field(default_factory=dict)
+    # Number of time entries by period ID, for each (specialist ID, project ID)
+    entry_counts: Dict[WorkPair, Dict[str, int]] = field(default_factory=dict)
+    # Tab titles of the open periods by period ID
+    open_tabs: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, data_service: Any) -> "DependencyIndex":
+        """Build the index from a data service.
+
+        Args:
+            data_service: Data service providing projects and payment periods
+
+        Returns:
+            Dependency index
+        """
+        index = cls()
+        for project in data_service.get_projects():
+            if not project.timesheet_id:
+                continue
+            for position, specialist_id in enumerate(project.specialist_ids):
+                index.sheets.setdefault(specialist_id, []).append(
+                    SheetLink(project.id, project.timesheet_id, FIRST_ROW + position)
+                )
+        for period in data_service.get_payment_periods():
+            index._set_period(period)
+            for entry in period.time_entries:
+                index._count_entry(entry, period.id, 1)
+        return index
+
+    def period_tabs(self, specialist_id: str, project_id: str) -> List[str]:
+        """Get the open period tabs in which a specialist logged time on a project."""
+        periods = self.entry_counts.get((specialist_id, project_id), {})
+        return [
+            self.open_tabs[period_id]
+            for period_id in periods
+            if period_id in self.open_tabs
+        ]
+
+    def apply(self, record: MutationRecord) -> None:
+        """Update the index with the change made by a mutation.
+
+        Args:
+            record: Record of the mutation
+        """
+        if record.op in ("period.create", "period.update"):
+            self._set_period(record.after)
+        elif record.op.startswith("entry."):
+            if record.before is not None:
+                self._count_entry(record.before, record.period_id, -1)
+            if record.after is not None:
+                self._count_entry(record.after, record.period_id, 1)
+
+    def _set_period(self, period: PaymentPeriod) -> None:
+        """Record the tab of a payment period if it is open."""
+        if period.status in FROZEN_STATUSES:
+            self.open_tabs.pop(period.id, None)
+        else:
+            self.open_tabs[period.id] = period_tab_title(period)
+
+    def _count_entry(self, entry: TimeEntry, period_id: str, delta: int) -> None:
+        """Count a time entry of a period in or out."""
+        pair = (entry.specialist_id, entry.project_id)
+        periods = self.entry_counts.setdefault(pair, {})
+        count = periods.get(period_id, 0) + delta
+        if count > 0:
+            periods[period_id] = count
+        else:
+            periods.pop(period_id, None)
+            if not periods:
+                del self.entry_counts[pair]
+
+
+def period_tab_title(period: PaymentPeriod) -> str:
+    """Get the title of the timesheet tab of a payment period."""
+    return period.name or period.id
+
+
+def column_number(column: str) -> int:
+    """Convert a column in A1 notation to its number, counting from 1 for A.
+
+    Args:
+        column: Column letters, such as 'C' or 'AA'
+
+    Returns:
+        Column number
+
+    Raises:
+        ValueError: If the column is not made of letters A-Z
+    """
+    if not column or not all("A" <= letter <= "Z" for letter in column):
+        raise ValueError(f"Invalid column: {column!r}")
+    number = 0
+    for letter in column:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def a1_range(sheet: str, first_column: str, last_column: str, row: int) -> str:
+    """Build a single-row range in A1 notation.
+
+    Args:
+        sheet: Tab title
+        first_column: First column letter
+        last_column: Last column letter
+        row: Row number
+
+    Returns:
+        Range such as 'Specialists'!C3:D3
+    """
+    quoted = sheet.replace("'", "''")
+    if first_column == last_column:
+        return f"'{quoted}'!{first_column}{row}"
+    return f"'{quoted}'!{first_column}{row}:{last_column}{row}"
+
+
+def cell_value(value: Any) -> Any:
+    """Convert a model field to a cell value."""
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value
+
+
+def merge_ranges(cells: List[CellUpdate]) -> List[Tuple[str, List[List[Any]]]]:
+    """Merge cell updates into as few ranges as possible.
+
+    Adjacent cells of a row become one range, including across Z and AA;
+    cells are expected to belong to one spreadsheet.
+
+    Args:
+        cells: Cell updates, at most one per cell
+
+    Returns:
+        Ranges in A1 notation and their values
+
+    Raises:
+        ValueError: If a cell has an invalid column
+    """
+    rows: Dict[Tuple[str, int], Dict[int, CellUpdate]] = {}
+    for cell in cells:
+        rows.setdefault((cell.sheet, cell.row), {})[column_number(cell.column)] = cell
+
+    ranges: List[Tuple[str, List[List[Any]]]] = []
+    for (sheet, row), by_number in rows.items():
+        run: List[int] = []
+        for number in sorted(by_number) + [None]:
+            if run and (number is None or number != run[-1] + 1):
+                first, last = by_number[run[0]].column, by_number[run[-1]].column
+                ranges.append(
+                    (
+                        a1_range(sheet, first, last, row),
+                        [[by_number[n].value for n in run]],
+                    )
+                )
+                run = []
+            if number is not None:
+                run.append(number)
+    return ranges
+
+
+def plan_specialist_change(
+    index: DependencyIndex, before: Specialist, after: Specialist
+) -> List[CellUpdate]:
+    """Plan the cell updates reflecting a specialist change in linked timesheets.
+
+    Only changed fields are written: the specialist's row in the specialists
+    tab of each project timesheet, and in the tabs of open periods in which
+    the specialist logged time on the project.
+
+    Args:
+        index: Dependency index
+        before: Specialist before the change
+        after: Specialist after the change
+
+    Returns:
+        Cell updates
+    """
+    changed = {
+        name: cell_value(getattr(after, name))
+        for name in SPECIALIST_COLUMNS
+        if getattr(before, name) != getattr(after, name)
+    }
+    if not changed:
+        return []
+    period_fields = {
+        name: value for name, value in changed.items() if name in PERIOD_COLUMNS
+    }
+
+    updates: List[CellUpdate] = []
+    for link in index.sheets.get(after.id, []):
+        tabs = [(SPECIALISTS_SHEET, SPECIALIST_COLUMNS, changed)]
+        if period_fields:
+            tabs.extend(
+                (title, PERIOD_COLUMNS, period_fields)
+                for title in index.period_tabs(after.id, link.project_id)
+            )
+        for sheet, columns, fields in tabs:
+            updates.extend(
+                CellUpdate(link.spreadsheet_id, sheet, link.row, columns[name], value)
+                for name, value in fields.items()
+            )
+    return updates
+
+
+class SheetsDispatcher:
+    """Sends planned cell updates in coalesced batches.
+
+    Updates are collected for a short delay; a newer update of the same cell
+    replaces a pending one. Each flush sends one batchUpdate request per
+    spreadsheet, with adjacent cells merged into ranges. Failed updates are
+    retried with the next flush, unless a newer update of the cell is
+    pending or they ran out of attempts.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], SheetsClient],
+        delay: float,
+        max_ranges: int = MAX_RANGES_PER_REQUEST,
+        max_attempts: int = 3,
+    ):
+        """Initialize the dispatcher.
+
+        Args:
+            client_factory: Function creating the Sheets client on first dispatch
+            delay: Time updates are collected before a flush, in seconds
+            max_ranges: Maximum number of ranges per request
+            max_attempts: Number of times an update is sent before it is dropped
+        """
+        self.client_factory = client_factory
+        self.delay = delay
+        self.max_ranges = max_ranges
+        self.max_attempts = max_attempts
+        self._client: Optional[SheetsClient] = None
+        self._pending: Dict[CellKey, CellUpdate] = {}
+        self._attempts: Dict[CellKey, int] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def client(self) -> SheetsClient:
+        """Get the Sheets client, creating it on first use."""
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    @property
+    def pending(self) -> int:
+        """Number of cell updates waiting to be sent."""
+        with self._cond:
+            return len(self._pending)
+
+    def submit(self, updates: List[CellUpdate]) -> None:
+        """Queue cell updates for the next flush.
+
+        Args:
+            updates: Cell updates to send
+        """
+        if not updates:
+            return
+        with self._cond:
+            for update in updates:
+                if self._pending.pop(update.key, None) is not None:
+                    SHEETS_CELL_UPDATES.labels("coalesced").inc()
+                self._pending[update.key] = update
+                self._attempts.pop(update.key, None)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="feptm-sheets", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """Flush pending updates until closed."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            time.sleep(self.delay)
+            self.flush()
+
+    def flush(self) -> int:
+        """Send all pending updates.
+
+        Returns:
+            Number of cell updates sent
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                attempts = {key: self._attempts.pop(key, 0) for key in batch}
+
+            by_spreadsheet: Dict[str, List[CellUpdate]] = {}
+            for update in batch.values():
+                by_spreadsheet.setdefault(update.spreadsheet_id, []).append(update)
+
+            sent = 0
+            for spreadsheet_id, cells in by_spreadsheet.items():
+                ranges = merge_ranges(cells)
+                for start in range(0, len(ranges), self.max_ranges):
+                    try:
+                        self.client.batch_update_values(
+                            spreadsheet_id, ranges[start : start + self.max_ranges]
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"Updating spreadsheet {spreadsheet_id} failed: {e}"
+                        )
+                        SHEETS_REQUESTS.labels("error").inc()
+                        self._retry(cells, attempts)
+                        break
+                    SHEETS_REQUESTS.labels("ok").inc()
+                else:
+                    SHEETS_CELL_UPDATES.labels("sent").inc(len(cells))
+                    sent += len(cells)
+            return sent
+
+    def _retry(self, updates: List[CellUpdate], attempts: Dict[CellKey, int]) -> None:
+        """Queue failed updates again unless superseded or out of attempts."""
+        with self._cond:
+            for update in updates:
+                if update.key in self._pending:
+                    continue
+                if attempts[update.key] + 1 >= self.max_attempts:
+                    logger.error(
+                        "Dropping update of "
+                        f"{update.sheet}!{update.column}{update.row} "
+                        f"in spreadsheet {update.spreadsheet_id}"
+                    )
+                    SHEETS_CELL_UPDATES.labels("dropped").inc()
+                    continue
+                self._pending[update.key] = update
+                self._attempts[update.key] = attempts[update.key] + 1
+
+    def close(self) -> None:
+        """Stop the dispatch thread and send the pending updates."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        if self.pending:
+            self.flush()
+
+
+class PropagationService:
+    """Service applying specialist changes and propagating them to linked timesheets."""
+
+    def __init__(self, data_service: Any, dispatcher: SheetsDispatcher):
+        """Initialize the propagation service.
+
+        Args:
+            data_service: Data service holding specialists, projects and periods
+            dispatcher: Dispatcher sending the planned updates
+        """
+        self.data_service = data_service
+        self.dispatcher = dispatcher
+        self._index: Optional[DependencyIndex] = None
+        self._data_version: Optional[int] = None
+        self._lock = threading.Lock()
+        # Changes are planned from the latest data and queued one at a time
+        self._update_lock = threading.Lock()
+
+    def index(self) -> DependencyIndex:
+        """Get the dependency index, bringing it up to date with the latest data.
+
+        The index follows the latest data version, not the one the request
+        pinned, so requests reading an older version use it as is. The
+        mutation records since the version the index is current for are
+        applied to it; it is only built again if they are not all known.
+
+        Returns:
+            Current dependency index
+        """
+        version = self.data_service.data_version
+        if self._data_version is None or version > self._data_version:
+            with self._lock:
+                # A fresh context, so the index is brought up to the latest
+                # data rather than the generation the request pinned
+                contextvars.Context().run(self._catch_up)
+        return self._index
+
+    def _catch_up(self) -> None:
+        """Bring the index up to the latest data version; the lock must be held."""
+        version = self.data_service.data_version
+        if self._data_version is not None and version <= self._data_version:
+            return
+        records = None
+        if self._index is not None:
+            records = self.data_service.get_changes(self._data_version, version)
+        if records is None:
+            with self.data_service.pin():
+                self._data_version = self.data_service.data_version
+                self._index = DependencyIndex.build(self.data_service)
+            return
+        for record in records:
+            self._index.apply(record)
+        self._data_version = version
+
+    def update_specialist(
+        self, specialist_id: str, changes: SpecialistUpdate
+    ) -> Optional[Specialist]:
+        """Update a specialist and queue the updates of linked timesheets.
+
+        Args:
+            specialist_id: ID of the specialist
+            changes: Fields to change
+
+        Returns:
+            Updated specialist, or None if not found
+
+        Raises:
+            ValueError: If the change is invalid
+            StorageError: If the change cannot be stored
+        """
+        before = self.data_service.get_specialist(specialist_id)
+        if before is None:
+            return None
+        # The lock is not held while the change becomes durable, so concurrent
+        # changes share a journal commit
+        after = self.data_service.update_specialist(specialist_id, changes)
+        if after is None:
+            return None
+        with self._update_lock:
+            # Planning from the latest state rather than this change alone
+            # queues the newest values whatever order concurrent changes are
+            # planned in
+            latest = contextvars.Context().run(
+                self.data_service.get_specialist, specialist_id
+            )
+            updates = plan_specialist_change(self.index(), before, latest or after)
+            self.dispatcher.submit(updates)
+        if updates:
+            logger.info(
+                f"Queued {len(updates)} timesheet cell updates "
+                f"for specialist {specialist_id}"
+            )
+        return after
+
+    def close(self) -> None:
+        """Send the pending timesheet updates."""
+        self.dispatcher.close()
+
+
+# Singleton instance for easy access
+propagation_service = PropagationService(
+    data_service,
+    SheetsDispatcher(create_sheets_client, settings.SHEETS_DISPATCH_DELAY_MS / 1000),
+)
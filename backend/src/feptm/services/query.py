@@ -0,0 +1,444 @@
+"""Filter compilation and execution for data collections.
+
+A filter dict maps ``field`` or ``field__op`` keys to values, for example
+``{"active": True, "role__in": ["QA", "DevOps"], "hire_date__gte": date}``.
+The reserved ``order_by`` key takes a comma-separated list of fields, each
+optionally prefixed with ``-`` for descending order.
+
+Filters are split into a shape (collection, fields, operators, ordering) and
+the bound values. Compiled plans are cached by shape, so repeated requests
+with the same filter combination reuse one fused predicate.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+# Supported operators and the Python expressions they compile to
+OPERATORS: Dict[str, str] = {
+    "eq": "{field} == {value}",
+    "ne": "{field} != {value}",
+    "in": "{field} in {value}",
+    "gt": "{field} > {value}",
+    "gte": "{field} >= {value}",
+    "lt": "{field} < {value}",
+    "lte": "{field} <= {value}",
+}
+
+RANGE_OPERATORS = frozenset({"gt", "gte", "lt", "lte"})
+
+# Types accepted as the values of an 'in' filter; a string would otherwise
+# match its characters
+IN_VALUE_TYPES = (list, tuple, set, frozenset)
+
+# Filterable fields per collection and their kinds
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "specialists": {
+        "id": "str",
+        "full_name": "str",
+        "email": "str",
+        "role": "enum",
+        "hourly_rate": "number",
+        "active": "bool",
+        "hire_date": "datetime",
+        "leave_date": "datetime",
+    },
+    "projects": {
+        "id": "str",
+        "name": "str",
+        "client_name": "str",
+        "status": "enum",
+        "project_type": "enum",
+        "timesheet_id": "str",
+        "start_date": "datetime",
+        "end_date": "datetime",
+        "budget": "number",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    },
+    "payment_periods": {
+        "id": "str",
+        "name": "str",
+        "start_date": "datetime",
+        "end_date": "datetime",
+        "status": "enum",
+        "report_id": "str",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    },
+    "time_entries": {
+        "id": "str",
+        "specialist_id": "str",
+        "project_id": "str",
+        "date": "datetime",
+        "hours": "number",
+        "created_at": "datetime",
+        "updated_at": "datetime",
+    },
+}
+
+# Filter names kept for compatibility with the API query parameters
+ALIASES: Dict[str, Dict[str, Tuple[str, str]]] = {
+    "time_entries": {
+        "start_date": ("date", "gte"),
+        "end_date": ("date", "lte"),
+    },
+}
+
+# Fields with hash indexes, in order of preference for index plans
+INDEXED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "specialists": ("id",),
+    "projects": ("id",),
+    "payment_periods": ("id",),
+    "time_entries": ("id", "specialist_id", "project_id"),
+}
+
+Indexes = Dict[str, Mapping[Any, List[Any]]]
+
+# Items of a collection, or a function getting them
+Items = Union[Sequence[Any], Callable[[], Sequence[Any]]]
+
+
+class PartitionedIndex(Mapping[Any, List[Any]]):
+    """Hash index on one field made of the indexes of consecutive partitions.
+
+    A lookup concatenates the matches of each partition in order, so it
+    returns the items in the order of the whole collection. A change to one
+    partition only requires rebuilding that partition's index.
+    """
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: List[Dict[Any, List[Any]]]):
+        """Initialize the index.
+
+        Args:
+            parts: Index of each partition, in collection order
+        """
+        self.parts = parts
+
+    def get(self, value: Any, default: Any = None) -> Any:
+        matches: List[Any] = []
+        for part in self.parts:
+            found = part.get(value)
+            if found:
+                matches.extend(found)
+        return matches if matches else default
+
+    def __getitem__(self, value: Any) -> List[Any]:
+        matches = self.get(value)
+        if matches is None:
+            raise KeyError(value)
+        return matches
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter({value: None for part in self.parts for value in part})
+
+    def __len__(self) -> int:
+        return len({value for part in self.parts for value in part})
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """Value-independent description of a query, used as the plan cache key."""
+
+    collection: str
+    conditions: Tuple[Tuple[str, str], ...]
+    order_by: Tuple[Tuple[str, bool], ...] = ()
+
+
+def normalize_datetime(value: datetime) -> datetime:
+    """Make a datetime timezone-aware, treating naive values as UTC.
+
+    Args:
+        value: Datetime to normalize
+
+    Returns:
+        Timezone-aware datetime
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _normalize_value(kind: str, op: str, value: Any) -> Any:
+    """Convert a filter value to the form the compiled predicate compares with.
+
+    Args:
+        kind: Kind of the filtered field
+        op: Operator of the condition
+        value: Raw filter value
+
+    Returns:
+        Normalized value
+    """
+    if op == "in":
+        return frozenset(_normalize_value(kind, "eq", v) for v in value)
+    if isinstance(value, Enum):
+        return value.value
+    if kind == "datetime" and isinstance(value, datetime):
+        return normalize_datetime(value)
+    if kind == "bool" and value is not None:
+        return bool(value)
+    return value
+
+
+def parse_order_by(collection: str, order_by: Any) -> Tuple[Tuple[str, bool], ...]:
+    """Parse an order_by value into (field, descending) pairs.
+
+    Args:
+        collection: Name of the collection
+        order_by: Comma-separated string or sequence of field names
+
+    Returns:
+        Tuple of (field, descending) pairs
+
+    Raises:
+        ValueError: If a field is not supported
+    """
+    if isinstance(order_by, str):
+        order_by = order_by.split(",")
+    schema = SCHEMAS[collection]
+    result = []
+    for item in order_by:
+        item = item.strip()
+        descending = item.startswith("-")
+        field = item.lstrip("-+")
+        if field not in schema:
+            raise ValueError(f"Unsupported sort field for {collection}: {field}")
+        result.append((field, descending))
+    return tuple(result)
+
+
+def parse_filters(
+    collection: str, filters: Optional[Dict[str, Any]] = None
+) -> Tuple[QueryShape, Tuple[Any, ...]]:
+    """Split a filter dict into a query shape and its bound values.
+
+    Args:
+        collection: Name of the collection
+            ('specialists', 'projects', 'payment_periods', 'time_entries')
+        filters: Filters to apply
+
+    Returns:
+        Query shape and the values for its conditions
+
+    Raises:
+        ValueError: If the collection, a field or an operator is not supported,
+            a range operator is given None, or an 'in' filter is not given a
+            list of values
+    """
+    if collection not in SCHEMAS:
+        raise ValueError(f"Invalid data type: {collection}")
+    schema = SCHEMAS[collection]
+    aliases = ALIASES.get(collection, {})
+
+    conditions: List[Tuple[str, str]] = []
+    values: List[Any] = []
+    order_by: Tuple[Tuple[str, bool], ...] = ()
+
+    for key, value in sorted((filters or {}).items()):
+        if key == "order_by":
+            order_by = parse_order_by(collection, value) if value else ()
+            continue
+        if key in aliases:
+            field, op = aliases[key]
+        else:
+            field, _, op = key.partition("__")
+            op = op or "eq"
+        if field not in schema:
+            raise ValueError(f"Unsupported filter for {collection}: {key}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator for {collection}: {key}")
+        if op in RANGE_OPERATORS and value is None:
+            raise ValueError(f"Filter {key} of {collection} cannot compare with None")
+        if op == "in" and not isinstance(value, IN_VALUE_TYPES):
+            raise ValueError(f"Filter {key} of {collection} needs a list of values")
+        conditions.append((field, op))
+        values.append(_normalize_value(schema[field], op, value))
+
+    return QueryShape(collection, tuple(conditions), order_by), tuple(values)
+
+
+def _sort_key(field: str, kind: str) -> Callable[[Any], Any]:
+    """Build a sort key that orders None values last.
+
+    Args:
+        field: Name of the field
+        kind: Kind of the field
+
+    Returns:
+        Sort key function
+    """
+
+    def key(item: Any) -> Tuple[bool, Any]:
+        value = getattr(item, field)
+        if kind == "enum" and value is not None:
+            value = value.value
+        return (value is None, value)
+
+    return key
+
+
+class QueryPlan:
+    """Compiled query: one fused predicate, an optional index lookup and ordering."""
+
+    def __init__(self, shape: QueryShape):
+        """Compile a query shape.
+
+        Args:
+            shape: Shape of the query
+        """
+        self.shape = shape
+        schema = SCHEMAS[shape.collection]
+
+        # Use the first equality condition on an indexed field as the index lookup
+        self.index_position: Optional[int] = None
+        for field in INDEXED_FIELDS.get(shape.collection, ()):
+            if (field, "eq") in shape.conditions:
+                self.index_position = shape.conditions.index((field, "eq"))
+                break
+
+        clauses = []
+        for position, (field, op) in enumerate(shape.conditions):
+            if position == self.index_position:
+                continue
+            accessor = f"item.{field}"
+            if schema[field] == "enum":
+                accessor = f"getattr({accessor}, 'value', None)"
+            clause = OPERATORS[op].format(field=accessor, value=f"values[{position}]")
+            if op in RANGE_OPERATORS:
+                clause = f"{accessor} is not None and {clause}"
+            clauses.append(f"({clause})")
+
+        self.predicate: Optional[Callable[[Any, Tuple[Any, ...]], bool]] = None
+        if clauses:
+            source = (
+                "def predicate(item, values):\n    return "
+                + " and ".join(clauses)
+                + "\n"
+            )
+            namespace: Dict[str, Any] = {}
+            exec(compile(source, f"<query {shape.collection}>", "exec"), namespace)
+            self.predicate = namespace["predicate"]
+
+        self.sort_keys = [
+            (_sort_key(field, schema[field]), descending)
+            for field, descending in shape.order_by
+        ]
+
+    def execute(
+        self, items: Items, values: Tuple[Any, ...], indexes: Optional[Indexes] = None
+    ) -> List[Any]:
+        """Run the query over a collection.
+
+        Args:
+            items: Items of the collection, or a function getting them that
+                is only called if no index serves the query
+            values: Values bound to the query conditions
+            indexes: Hash indexes of the collection by field name
+
+        Returns:
+            List of matching items
+        """
+        field = None
+        if self.index_position is not None:
+            field = self.shape.conditions[self.index_position][0]
+        if field is not None and indexes is not None and field in indexes:
+            candidates: Sequence[Any] = indexes[field].get(
+                values[self.index_position], []
+            )
+        else:
+            candidates = items() if callable(items) else items
+            if field is not None:
+                value = values[self.index_position]
+                candidates = [
+                    item for item in candidates if getattr(item, field) == value
+                ]
+
+        predicate = self.predicate
+        if predicate is None:
+            result = list(candidates)
+        else:
+            result = [item for item in candidates if predicate(item, values)]
+
+        # Stable sorts applied from the last key to the first
+        for key, descending in reversed(self.sort_keys):
+            result.sort(key=key, reverse=descending)
+        return result
+
+
+@lru_cache(maxsize=256)
+def compile_query(shape: QueryShape) -> QueryPlan:
+    """Compile a query shape into a cached plan.
+
+    Args:
+        shape: Shape of the query
+
+    Returns:
+        Compiled query plan
+    """
+    logger.debug(f"Compiling query plan for {shape}")
+    return QueryPlan(shape)
+
+
+def build_indexes(
+    collection: str, items: Sequence[Any]
+) -> Dict[str, Dict[Any, List[Any]]]:
+    """Build hash indexes for the indexed fields of a collection.
+
+    Args:
+        collection: Name of the collection
+        items: Items of the collection
+
+    Returns:
+        Mapping of field name to value to list of items
+    """
+    indexes: Dict[str, Dict[Any, List[Any]]] = {}
+    for field in INDEXED_FIELDS.get(collection, ()):
+        index: Dict[Any, List[Any]] = {}
+        for item in items:
+            index.setdefault(getattr(item, field), []).append(item)
+        indexes[field] = index
+    return indexes
+
+
+def run_query(
+    collection: str,
+    items: Items,
+    filters: Optional[Dict[str, Any]] = None,
+    indexes: Optional[Indexes] = None,
+) -> List[Any]:
+    """Filter and sort a collection in one call.
+
+    Args:
+        collection: Name of the collection
+        items: Items of the collection, or a function getting them that is
+            only called if no index serves the query
+        filters: Filters to apply
+        indexes: Hash indexes of the collection by field name
+
+    Returns:
+        List of matching items
+
+    Raises:
+        ValueError: If a filter is not supported
+    """
+    shape, values = parse_filters(collection, filters)
+    return compile_query(shape).execute(items, values, indexes)
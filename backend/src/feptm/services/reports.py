@@ -0,0 +1,150 @@
+"""Memoized report computations with coalescing of concurrent requests."""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from feptm.core.config import settings
+from feptm.core.metrics import REPORT_SECONDS, registry
+from feptm.core.profiling import profiled_thread
+from feptm.services.data_service import data_service
+
+logger = logging.getLogger(__name__)
+
+# Data service methods computing each report
+REPORTS = {
+    "specialists": "get_specialist_report_data",
+    "projects": "get_project_report_data",
+}
+
+REPORT_CACHE_REQUESTS = registry.counter(
+    "feptm_report_cache_requests", "Report cache lookups", ("report", "result")
+)
+REPORT_CACHE_ENTRIES = registry.gauge(
+    "feptm_report_cache_entries", "Reports held in the report cache"
+)
+
+# Cache key: (report, period ID, data version)
+ReportKey = Tuple[str, Optional[str], Any]
+ReportRows = List[Dict[str, Any]]
+
+
+class ReportService:
+    """Service computing reports once per data version.
+
+    Results are kept in an LRU cache keyed by report, period and the data
+    version the request reads, so a change to the data makes them unreachable;
+    they are dropped as soon as a request sees a newer version. Concurrent
+    requests for a report that is being computed wait for the same task
+    instead of computing it again.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, data_service: Any, max_entries: int):
+        """Initialize the report service.
+
+        Args:
+            data_service: Data service computing the report data
+            max_entries: Maximum number of cached reports, 0 disables caching
+                but keeps coalescing
+        """
+        self.data_service = data_service
+        self.max_entries = max_entries
+        self._results: "OrderedDict[ReportKey, ReportRows]" = OrderedDict()
+        self._in_flight: Dict[ReportKey, "asyncio.Task[ReportRows]"] = {}
+        self._version: Any = None
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def clear(self) -> None:
+        """Drop all cached reports."""
+        self._results.clear()
+        REPORT_CACHE_ENTRIES.set(0)
+
+    async def get(self, report: str, period_id: Optional[str] = None) -> ReportRows:
+        """Get the rows of a report, computing it once per data version.
+
+        The report is computed in a worker thread, which shares the data pin
+        of the request that started it; requests coalesced onto it read the
+        same data version.
+
+        Args:
+            report: Report type ('specialists' or 'projects')
+            period_id: Restrict the report to a single payment period
+
+        Returns:
+            List of report rows; they are shared and must not be changed
+
+        Raises:
+            ValueError: If the report type is invalid
+        """
+        if report not in REPORTS:
+            raise ValueError(f"Invalid report: {report}")
+        version = self.data_service.data_version
+        if self._version is None or version > self._version:
+            self._version = version
+            self.clear()
+        key = (report, period_id, version)
+
+        rows = self._results.get(key)
+        if rows is not None:
+            self._results.move_to_end(key)
+            REPORT_CACHE_REQUESTS.labels(report, "hit").inc()
+            return rows
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            REPORT_CACHE_REQUESTS.labels(report, "coalesced").inc()
+        else:
+            REPORT_CACHE_REQUESTS.labels(report, "miss").inc()
+            task = asyncio.ensure_future(
+                asyncio.to_thread(self._compute, report, period_id)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # A cancelled request must not cancel the computation others wait for
+        return await asyncio.shield(task)
+
+    def _compute(self, report: str, period_id: Optional[str]) -> ReportRows:
+        """Compute a report from the data service.
+
+        Runs in a worker thread, which the profiler of the request, if any,
+        samples too.
+
+        Args:
+            report: Report type
+            period_id: Restrict the report to a single payment period
+
+        Returns:
+            List of report rows
+        """
+        with profiled_thread(), REPORT_SECONDS.labels(report).time():
+            return getattr(self.data_service, REPORTS[report])(period_id)
+
+    def _finish(self, key: ReportKey, task: "asyncio.Task[ReportRows]") -> None:
+        """Store the result of a finished computation.
+
+        Failed computations are not stored, so the next request tries again.
+        Results for a data version older than the latest one seen are not
+        stored either.
+
+        Args:
+            key: Cache key of the report
+            task: Finished task
+        """
+        del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.max_entries <= 0 or key[2] != self._version:
+            return
+        self._results[key] = task.result()
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        REPORT_CACHE_ENTRIES.set(len(self._results))
+
+
+# Singleton instance for easy access
+report_service = ReportService(data_service, settings.REPORT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,632 @@
+"""Full-text search over time entries and projects."""
+
+import asyncio
+import contextvars
+import heapq
+import logging
+import math
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from functools import reduce
+from operator import and_
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from feptm.core.text import analyze
+from feptm.models import Project
+from feptm.models.payment import TimeEntry
+from feptm.services.data_service import data_service
+from feptm.services.mutations import MutationRecord
+
+logger = logging.getLogger(__name__)
+
+D = TypeVar("D")
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Terms with at least this many postings get their ranking precomputed on build
+PRERANK_MIN_POSTINGS = 1000
+
+# Up to this many matches are scored directly instead of walking the rankings
+DIRECT_SCORING_MAX_MATCHES = 20000
+
+SEARCH_SCOPES = ("entries", "projects")
+
+# Share of the documents by which the collection may change before the
+# index, whose rankings use the statistics of when they were computed, is
+# built again, and the number of documents it may change by in any case
+STATS_DRIFT_REBUILD = 0.1
+STATS_DRIFT_MIN_DOCUMENTS = 1000
+
+NONZERO_BYTE = re.compile(b"[^\\x00]")
+
+
+@dataclass
+class Ranking:
+    """Documents of a term ordered by descending BM25 weight.
+
+    The weights use the collection statistics of when the ranking was
+    computed, and documents added or changed later are weighted with the
+    same ones, so the order stays consistent until the index is rebuilt.
+    """
+
+    order: List[int]
+    weights: Dict[int, float]
+    idf: float
+    average_length: float
+    # Bitmap of the documents, built on first use for intersections
+    bits: Optional[int] = None
+
+    def weight(self, frequency: int, length: int) -> float:
+        """Compute the BM25 weight of the term in a document.
+
+        Args:
+            frequency: Number of occurrences of the term in the document
+            length: Number of terms in the document
+
+        Returns:
+            Weight of the term
+        """
+        norm = 1 - BM25_B + BM25_B * length / self.average_length
+        return self.idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+
+    def insert(self, doc_id: int, weight: float) -> None:
+        """Add a document to the ranking.
+
+        Args:
+            doc_id: Document number
+            weight: Weight of the term in the document
+        """
+        self.weights[doc_id] = weight
+        weights = self.weights
+        insort(self.order, doc_id, key=lambda d: (-weights[d], d))
+        if self.bits is not None:
+            self.bits |= 1 << doc_id
+
+    def remove(self, doc_id: int) -> None:
+        """Remove a document from the ranking.
+
+        Args:
+            doc_id: Document number
+        """
+        weights = self.weights
+        position = bisect_left(
+            self.order, (-weights[doc_id], doc_id), key=lambda d: (-weights[d], d)
+        )
+        del self.order[position]
+        del weights[doc_id]
+        if self.bits is not None:
+            self.bits &= ~(1 << doc_id)
+
+
+def _bitmap(doc_ids: Iterable[int], size: int) -> int:
+    """Build a bitmap with the bits of the given document numbers set.
+
+    Args:
+        doc_ids: Document numbers, all below size
+        size: Number of bits
+
+    Returns:
+        Bitmap as an integer
+    """
+    data = bytearray((size + 7) // 8)
+    for doc_id in doc_ids:
+        data[doc_id >> 3] |= 1 << (doc_id & 7)
+    return int.from_bytes(data, "little")
+
+
+def _bit_positions(bits: int) -> List[int]:
+    """List the positions of the set bits of a bitmap in ascending order.
+
+    Args:
+        bits: Bitmap as an integer
+
+    Returns:
+        Positions of the set bits
+    """
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    positions = []
+    for match in NONZERO_BYTE.finditer(data):
+        offset = match.start()
+        byte = data[offset]
+        positions.extend(offset * 8 + bit for bit in range(8) if byte >> bit & 1)
+    return positions
+
+
+class InvertedIndex(Generic[D]):
+    """In-memory inverted index with BM25 ranking.
+
+    Queries match documents containing all query terms. Each term keeps a
+    cached ranking of its documents by BM25 weight, so single-term queries
+    cost O(limit) and multi-term queries only visit the top of each ranking.
+    Frequent terms are intersected as bitmaps.
+
+    Documents are added, replaced and removed in place, patching the cached
+    rankings of their terms. needs_rebuild() tells when the collection
+    drifted too far from the statistics the rankings use.
+    """
+
+    def __init__(self, text_of: Callable[[D], str], key_of: Callable[[D], str]):
+        """Initialize an empty index.
+
+        Args:
+            text_of: Function returning the searchable text of a document
+            key_of: Function returning the unique key of a document
+        """
+        self.text_of = text_of
+        self.key_of = key_of
+        # Removed documents leave None behind, so document numbers are stable
+        self.documents: List[Optional[D]] = []
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._ranked: Dict[str, Ranking] = {}
+        self._ranked_count = 0
+        self._ranked_length = 0
+
+    def __len__(self) -> int:
+        """Get the number of indexed documents.
+
+        Returns:
+            Number of documents
+        """
+        return len(self._doc_ids)
+
+    def add(self, document: D) -> None:
+        """Add a document to the index, replacing the one with the same key.
+
+        Args:
+            document: Document to add
+        """
+        key = self.key_of(document)
+        doc_id = self._doc_ids.get(key)
+        if doc_id is None:
+            doc_id = self._doc_ids[key] = len(self.documents)
+            self.documents.append(None)
+            self.doc_lengths.append(0)
+        else:
+            self._unindex(doc_id)
+
+        terms = analyze(self.text_of(document))
+        self.documents[doc_id] = document
+        self.doc_lengths[doc_id] = len(terms)
+        self.total_length += len(terms)
+        frequencies: Dict[str, int] = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+            ranking = self._ranked.get(term)
+            if ranking is not None:
+                ranking.insert(doc_id, ranking.weight(frequency, len(terms)))
+
+    def remove(self, key: str) -> bool:
+        """Remove a document from the index.
+
+        Args:
+            key: Key of the document
+
+        Returns:
+            True if the document was removed, False if it is not indexed
+        """
+        doc_id = self._doc_ids.pop(key, None)
+        if doc_id is None:
+            return False
+        self._unindex(doc_id)
+        self.documents[doc_id] = None
+        return True
+
+    def _unindex(self, doc_id: int) -> None:
+        """Remove the terms of a document from the postings and rankings.
+
+        Args:
+            doc_id: Document number
+        """
+        for term in set(analyze(self.text_of(self.documents[doc_id]))):
+            postings = self.postings[term]
+            del postings[doc_id]
+            ranking = self._ranked.get(term)
+            if not postings:
+                del self.postings[term]
+                self._ranked.pop(term, None)
+            elif ranking is not None:
+                ranking.remove(doc_id)
+        self.total_length -= self.doc_lengths[doc_id]
+        self.doc_lengths[doc_id] = 0
+
+    def needs_rebuild(self) -> bool:
+        """Check whether the collection drifted from the statistics of the rankings.
+
+        Returns:
+            True if the number of documents, their total length or the
+            number of removed documents changed by more than
+            STATS_DRIFT_REBUILD of the documents, and at least
+            STATS_DRIFT_MIN_DOCUMENTS, since prerank()
+        """
+        limit = max(STATS_DRIFT_REBUILD * self._ranked_count, STATS_DRIFT_MIN_DOCUMENTS)
+        average_length = self._ranked_length / max(self._ranked_count, 1)
+        return (
+            abs(len(self) - self._ranked_count) > limit
+            or abs(self.total_length - self._ranked_length) > limit * average_length
+            or len(self.documents) - len(self) > limit
+        )
+
+    def prerank(self, min_postings: int = PRERANK_MIN_POSTINGS) -> None:
+        """Precompute rankings for frequent terms, and bitmaps for the most frequent.
+
+        The current statistics become the baseline of needs_rebuild().
+
+        Args:
+            min_postings: Minimum number of postings for a term to be preranked
+        """
+        self._ranked_count = len(self)
+        self._ranked_length = self.total_length
+        for term, postings in self.postings.items():
+            if len(postings) >= min_postings and term not in self._ranked:
+                self._ranked[term] = self._rank_term(term)
+            if len(postings) > DIRECT_SCORING_MAX_MATCHES:
+                self._get_bits(self._get_ranking(term))
+
+    def _rank_term(self, term: str) -> Ranking:
+        """Compute BM25 weights of a term and sort its documents by weight.
+
+        Args:
+            term: Indexed term
+
+        Returns:
+            Ranking of the term
+        """
+        postings = self.postings[term]
+        count = len(self)
+        idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+        average_length = (self.total_length / count if count else 0.0) or 1.0
+        ranking = Ranking([], {}, idf, average_length)
+        doc_lengths = self.doc_lengths
+        weights = ranking.weights = {
+            doc_id: ranking.weight(frequency, doc_lengths[doc_id])
+            for doc_id, frequency in postings.items()
+        }
+        ranking.order = sorted(weights, key=lambda doc_id: (-weights[doc_id], doc_id))
+        return ranking
+
+    def _get_ranking(self, term: str) -> Ranking:
+        """Get the cached ranking of a term, computing it on first use.
+
+        Args:
+            term: Indexed term
+
+        Returns:
+            Ranking of the term
+        """
+        ranking = self._ranked.get(term)
+        if ranking is None:
+            ranking = self._ranked[term] = self._rank_term(term)
+        return ranking
+
+    def _get_bits(self, ranking: Ranking) -> int:
+        """Get the bitmap of the documents of a ranking, building it on first use.
+
+        Args:
+            ranking: Ranking of a term
+
+        Returns:
+            Bitmap of the documents
+        """
+        if ranking.bits is None:
+            ranking.bits = _bitmap(ranking.weights, len(self.documents))
+        return ranking.bits
+
+    def search(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> Tuple[int, List[Tuple[float, D]]]:
+        """Find documents containing all terms of a query.
+
+        Args:
+            query: Query text
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Total number of matches and a page of (score, document) pairs
+        """
+        terms = sorted(set(analyze(query)), key=lambda t: len(self.postings.get(t, ())))
+        if not terms or any(term not in self.postings for term in terms):
+            return 0, []
+
+        rankings = [self._get_ranking(term) for term in terms]
+        if len(terms) == 1:
+            order, weights = rankings[0].order, rankings[0].weights
+            page = order[offset : offset + limit]
+            return len(order), [
+                (weights[doc_id], self.documents[doc_id]) for doc_id in page
+            ]
+
+        # Start from the rarest term; frequent ones are intersected as bitmaps
+        k = offset + limit
+        rarest = self.postings[terms[0]]
+        others = [self.postings[term] for term in terms[1:]]
+        if len(rarest) <= DIRECT_SCORING_MAX_MATCHES:
+            matches = [d for d in rarest if all(d in other for other in others)]
+            return len(matches), self._score(rankings, matches, k)[offset:]
+        bits = reduce(and_, (self._get_bits(ranking) for ranking in rankings))
+        count = bits.bit_count()
+        if count <= DIRECT_SCORING_MAX_MATCHES:
+            return count, self._score(rankings, _bit_positions(bits), k)[offset:]
+        return count, self._walk_rankings(rankings, [rarest, *others], k)[offset:]
+
+    def _score(
+        self, rankings: List[Ranking], matches: List[int], k: int
+    ) -> List[Tuple[float, D]]:
+        """Score the matching documents directly and select the k best.
+
+        Args:
+            rankings: Rankings of the query terms
+            matches: Documents containing all query terms
+            k: Number of documents to select
+
+        Returns:
+            List of (score, document) pairs ordered by descending score
+        """
+        if k <= 0:
+            return []
+        # Negated document numbers make ties resolve to the earlier document
+        scored = (
+            (sum(r.weights[doc_id] for r in rankings), -doc_id) for doc_id in matches
+        )
+        top = heapq.nlargest(k, scored)
+        return [(score, self.documents[-neg_doc_id]) for score, neg_doc_id in top]
+
+    def _walk_rankings(
+        self, rankings: List[Ranking], postings: List[Dict[int, int]], k: int
+    ) -> List[Tuple[float, D]]:
+        """Select the k best of many matching documents with the threshold algorithm.
+
+        The per-term rankings are walked in parallel, stopping once the k-th
+        best score found so far is at least the best score any unseen
+        document could still reach, so typically only the top of each
+        ranking is visited.
+
+        Args:
+            rankings: Rankings of the query terms
+            postings: Postings of the query terms, to check matches with
+            k: Number of documents to select
+
+        Returns:
+            List of (score, document) pairs ordered by descending score
+        """
+        if k <= 0:
+            return []
+        heap: List[Tuple[float, int]] = []
+        seen: Set[int] = set()
+        depth = 0
+        longest = max(len(r.order) for r in rankings)
+        while depth < longest:
+            threshold = 0.0
+            for ranking in rankings:
+                if depth >= len(ranking.order):
+                    continue
+                doc_id = ranking.order[depth]
+                threshold += ranking.weights[doc_id]
+                if doc_id in seen or not all(doc_id in p for p in postings):
+                    continue
+                seen.add(doc_id)
+                item = (sum(r.weights[doc_id] for r in rankings), -doc_id)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+            if len(heap) == k and heap[0][0] >= threshold:
+                break
+            depth += 1
+
+        top = sorted(heap, reverse=True)
+        return [(score, self.documents[-neg_doc_id]) for score, neg_doc_id in top]
+
+
+def _time_entry_text(entry: TimeEntry) -> str:
+    """Get the searchable text of a time entry."""
+    return entry.description
+
+
+def _project_text(project: Project) -> str:
+    """Get the searchable text of a project."""
+    return f"{project.name} {project.description} {project.client_name}"
+
+
+def _key(item: Any) -> str:
+    """Get the key of a time entry or project in its index."""
+    return item.id
+
+
+class SearchService:
+    """Service keeping search indexes in sync with a data service.
+
+    A search seeing a newer data version applies the mutation records since
+    the version of the indexes to them. The indexes are only built again,
+    in a worker thread while searches keep using the previous ones, if the
+    records are not all known any more or the rankings drifted from the
+    data; only the first build is waited for. At most one build runs at a
+    time, and the records since the version it read are applied once it
+    finished. Requests pinned to an older version use the indexes as they
+    are.
+
+    All methods must be called from the event loop thread, which is the
+    only one using the indexes once they are built.
+    """
+
+    def __init__(self, data_service: Any):
+        """Initialize the search service.
+
+        Args:
+            data_service: Data service providing time entries and projects
+        """
+        self.data_service = data_service
+        self._indexes: Dict[str, InvertedIndex] = {}
+        self._data_version: Optional[int] = None
+        self._rebuild: Optional[
+            "asyncio.Future[Tuple[int, Dict[str, InvertedIndex]]]"
+        ] = None
+
+    async def _ensure_current(self) -> Dict[str, InvertedIndex]:
+        """Get the indexes, bringing them up to the data version of the request.
+
+        Returns:
+            Current indexes by scope, or the previous ones while a rebuild runs
+        """
+        version = self.data_service.data_version
+        self._catch_up(version)
+        if self._rebuild is None and (
+            self._data_version is None
+            or version > self._data_version
+            or any(index.needs_rebuild() for index in self._indexes.values())
+        ):
+            # A fresh context, so the build pins the latest data rather than
+            # the request's
+            self._rebuild = asyncio.ensure_future(
+                asyncio.to_thread(contextvars.Context().run, self._build_pinned)
+            )
+            self._rebuild.add_done_callback(self._finish_rebuild)
+        if not self._indexes and self._rebuild is not None:
+            await asyncio.shield(self._rebuild)
+            self._catch_up(version)
+        return self._indexes
+
+    def _catch_up(self, version: int) -> None:
+        """Apply the mutation records up to a data version to the indexes.
+
+        Nothing is applied while a rebuild runs, or if the records are not
+        all known, which the caller then rebuilds for.
+
+        Args:
+            version: Data version to bring the indexes up to
+        """
+        if (
+            self._rebuild is not None
+            or self._data_version is None
+            or version <= self._data_version
+        ):
+            return
+        records = self.data_service.get_changes(self._data_version, version)
+        if records is None:
+            return
+        for record in records:
+            self._apply(record)
+        self._data_version = version
+
+    def _apply(self, record: MutationRecord) -> None:
+        """Apply the record of a mutation to the indexes.
+
+        Only time entries are indexed and changed by mutations.
+
+        Args:
+            record: Record of the mutation
+        """
+        if not record.op.startswith("entry."):
+            return
+        entries = self._indexes["entries"]
+        if record.after is not None:
+            entries.add(record.after)
+        else:
+            entries.remove(record.before.id)
+
+    def _build_pinned(self) -> Tuple[int, Dict[str, InvertedIndex]]:
+        """Build the indexes from one state of the data.
+
+        Returns:
+            Data version and indexes by scope
+        """
+        with self.data_service.pin():
+            return self.data_service.data_version, self.build_indexes()
+
+    def _finish_rebuild(
+        self, rebuild: "asyncio.Future[Tuple[int, Dict[str, InvertedIndex]]]"
+    ) -> None:
+        """Switch to the indexes of a finished rebuild.
+
+        Args:
+            rebuild: Finished rebuild
+        """
+        self._rebuild = None
+        if rebuild.cancelled():
+            return
+        error = rebuild.exception()
+        if error is not None:
+            logger.error(f"Failed to rebuild search indexes: {error}")
+            return
+        self._data_version, self._indexes = rebuild.result()
+
+    def build_indexes(self) -> Dict[str, InvertedIndex]:
+        """Build the indexes from the data service.
+
+        Returns:
+            Indexes by scope
+        """
+        entries: InvertedIndex[TimeEntry] = InvertedIndex(_time_entry_text, _key)
+        for entry in self.data_service.get_time_entries():
+            entries.add(entry)
+        projects: InvertedIndex[Project] = InvertedIndex(_project_text, _key)
+        for project in self.data_service.get_projects():
+            projects.add(project)
+        for index in (entries, projects):
+            index.prerank()
+        logger.info(
+            f"Built search indexes: {len(entries)} time entries, "
+            f"{len(projects)} projects"
+        )
+        return {"entries": entries, "projects": projects}
+
+    async def search(
+        self, query: str, scope: Optional[str] = None, limit: int = 20, offset: int = 0
+    ) -> Tuple[int, List[Tuple[str, float, Any]]]:
+        """Search time entries and projects.
+
+        BM25 scores depend on the statistics of the index they come from, so
+        scores are normalized by the best score of their scope before the
+        scopes are merged: the best match of each scope scores 1.0.
+
+        Args:
+            query: Query text
+            scope: Restrict the search to 'entries' or 'projects', None for both
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Total number of matches and a page of (scope, score, item) results
+
+        Raises:
+            ValueError: If scope is invalid
+        """
+        if scope is not None and scope not in SEARCH_SCOPES:
+            raise ValueError(f"Invalid search scope: {scope}")
+        indexes = await self._ensure_current()
+        scopes = [scope] if scope is not None else list(SEARCH_SCOPES)
+
+        total = 0
+        results: List[Tuple[str, float, Any]] = []
+        for name in scopes:
+            count, hits = indexes[name].search(query, limit=offset + limit)
+            total += count
+            if hits:
+                best = hits[0][0] or 1.0
+                results.extend((name, score / best, item) for score, item in hits)
+
+        results.sort(key=lambda result: result[1], reverse=True)
+        return total, results[offset : offset + limit]
+
+
+# Singleton instance for easy access
+search_service = SearchService(data_service)
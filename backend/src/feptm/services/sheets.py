@@ -0,0 +1,128 @@
+"""Clients writing values to Google Sheets.
+
+The Google client imports the API libraries on first use, so they stay off
+the startup path. The fake client keeps the written values in memory and is
+used for development and tests.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from feptm.core.config import settings
+
+SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+SHEETS_CLIENTS = ("google", "fake")
+
+# A range in A1 notation and the rows of values written to it
+ValueRange = Tuple[str, List[List[Any]]]
+
+
+class SheetsClient(Protocol):
+    """Client able to write several ranges of a spreadsheet in one request."""
+
+    def batch_update_values(self, spreadsheet_id: str, data: List[ValueRange]) -> None:
+        """Write values to ranges of a spreadsheet.
+
+        Args:
+            spreadsheet_id: ID of the spreadsheet
+            data: Ranges and their values
+        """
+        ...
+
+
+class GoogleSheetsClient:
+    """Client for the Google Sheets API v4.
+
+    Not thread-safe; the dispatcher calls it from a single thread.
+    """
+
+    def __init__(self, token_file: Optional[Path] = None):
+        """Initialize the client.
+
+        Args:
+            token_file: Authorized user token file, defaults to GOOGLE_TOKEN_FILE
+        """
+        self.token_file = token_file or settings.GOOGLE_TOKEN_FILE
+        self._service: Any = None
+
+    def _get_service(self) -> Any:
+        """Build the Sheets API service on first use.
+
+        Raises:
+            RuntimeError: If no token file is configured
+        """
+        if self._service is None:
+            if self.token_file is None:
+                raise RuntimeError("GOOGLE_TOKEN_FILE is not set")
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+
+            credentials = Credentials.from_authorized_user_file(
+                str(self.token_file), SHEETS_SCOPES
+            )
+            self._service = build(
+                "sheets", "v4", credentials=credentials, cache_discovery=False
+            )
+        return self._service
+
+    def batch_update_values(self, spreadsheet_id: str, data: List[ValueRange]) -> None:
+        """Write values to ranges of a spreadsheet with spreadsheets.values.batchUpdate.
+
+        Args:
+            spreadsheet_id: ID of the spreadsheet
+            data: Ranges and their values
+        """
+        body = {
+            "valueInputOption": "USER_ENTERED",
+            "data": [{"range": range_, "values": values} for range_, values in data],
+        }
+        self._get_service().spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=body
+        ).execute()
+
+
+class FakeSheetsClient:
+    """In-memory client recording the requests and the latest values per range."""
+
+    def __init__(self):
+        """Initialize an empty fake."""
+        self.values: Dict[str, Dict[str, List[List[Any]]]] = {}
+        self.requests: List[Tuple[str, List[ValueRange]]] = []
+        self._lock = threading.Lock()
+
+    def batch_update_values(self, spreadsheet_id: str, data: List[ValueRange]) -> None:
+        """Record the written values.
+
+        Args:
+            spreadsheet_id: ID of the spreadsheet
+            data: Ranges and their values
+        """
+        with self._lock:
+            self.requests.append((spreadsheet_id, list(data)))
+            sheet = self.values.setdefault(spreadsheet_id, {})
+            for range_, values in data:
+                sheet[range_] = values
+
+
+def create_sheets_client(kind: Optional[str] = None) -> SheetsClient:
+    """Create the configured Sheets client.
+
+    Args:
+        kind: 'google' or 'fake', defaults to SHEETS_CLIENT
+
+    Returns:
+        Sheets client
+
+    Raises:
+        ValueError: If kind is invalid
+    """
+    kind = kind or settings.SHEETS_CLIENT
+    if kind == "google":
+        return GoogleSheetsClient()
+    if kind == "fake":
+        return FakeSheetsClient()
+    raise ValueError(
+        f"Invalid Sheets client: {kind}, expected one of {', '.join(SHEETS_CLIENTS)}"
+    )
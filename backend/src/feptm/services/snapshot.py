@@ -0,0 +1,455 @@
+"""Immutable generations of the in-memory data.
+
+The JSON data service keeps its data in a DataSnapshot that is never changed
+once published. A write builds the next generation with a SnapshotBuilder,
+which copies only the lists and payment periods on the path to the change
+and shares everything else with the previous generation, including the
+indexes of unchanged collections. Time entries are indexed per payment
+period, so a change to a period's entries only reindexes that period. The
+new generation is then published by replacing a single reference.
+
+A request pins the generation it first reads, so reports reading several
+collections or periods see one state without taking locks, however long they
+run. A superseded generation is retired when the last request pinning it
+finishes and it is garbage collected.
+"""
+
+import time
+import weakref
+from itertools import chain
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from feptm.core.metrics import registry
+from feptm.models import PaymentPeriod, Project, Specialist
+from feptm.models.payment import TimeEntry
+from feptm.services.query import (
+    INDEXED_FIELDS,
+    Indexes,
+    PartitionedIndex,
+    build_indexes,
+)
+
+DATA_GENERATION = registry.gauge(
+    "feptm_data_generation", "Current generation of the in-memory data"
+)
+GENERATIONS_PUBLISHED = registry.counter(
+    "feptm_data_generations_published", "Data generations published by loads and writes"
+)
+GENERATIONS_RETIRED = registry.counter(
+    "feptm_data_generations_retired",
+    "Superseded data generations released by all readers",
+)
+GENERATIONS_LIVE = registry.gauge(
+    "feptm_data_generations_live",
+    "Published data generations still in memory, including the current one",
+)
+GENERATION_RETIRE_SECONDS = registry.histogram(
+    "feptm_data_generation_retire_seconds",
+    "Time from a data generation being superseded to being retired",
+)
+
+
+class _Lifecycle:
+    """Publication state of a snapshot.
+
+    Kept apart from the snapshot, so the finalizer does not reference it.
+    """
+
+    __slots__ = ("superseded_at",)
+
+    def __init__(self) -> None:
+        self.superseded_at: Optional[float] = None
+
+
+def _retire(lifecycle: _Lifecycle) -> None:
+    """Record that a published snapshot was garbage collected."""
+    GENERATIONS_LIVE.dec()
+    if lifecycle.superseded_at is not None:
+        GENERATIONS_RETIRED.inc()
+        GENERATION_RETIRE_SECONDS.observe(time.perf_counter() - lifecycle.superseded_at)
+
+
+class DataSnapshot:
+    """One generation of specialists, projects and payment periods.
+
+    The collections and the models in them must not be changed. Derived data,
+    the flat list of time entries and the hash indexes, is built on first use;
+    two threads may build it at the same time, which only wastes work. The
+    indexes of time entries are partitioned by payment period, and the index
+    of each period is kept for the next generation unless its entries change.
+    """
+
+    def __init__(
+        self,
+        generation: int,
+        specialists: List[Specialist],
+        projects: List[Project],
+        payment_periods: List[PaymentPeriod],
+        indexes: Optional[Dict[str, Indexes]] = None,
+        time_entries: Optional[List[TimeEntry]] = None,
+        period_indexes: Optional[
+            Dict[str, Dict[str, Dict[Any, List[TimeEntry]]]]
+        ] = None,
+    ):
+        """Initialize the snapshot.
+
+        Args:
+            generation: Generation number, the data version readers see
+            specialists: All specialists
+            projects: All projects
+            payment_periods: All payment periods with their time entries
+            indexes: Indexes shared with the previous generation by collection
+            time_entries: Flat list of time entries shared with the previous generation
+            period_indexes: Indexes of the time entries of unchanged periods by
+                period ID
+        """
+        self.generation = generation
+        self.specialists = specialists
+        self.projects = projects
+        self.payment_periods = payment_periods
+        self._indexes: Dict[str, Indexes] = dict(indexes or {})
+        self._time_entries = time_entries
+        self._period_indexes = dict(period_indexes or {})
+        self._lifecycle: Optional[_Lifecycle] = None
+
+    @property
+    def time_entries(self) -> List[TimeEntry]:
+        """All time entries of all payment periods."""
+        if self._time_entries is None:
+            self._time_entries = list(
+                chain.from_iterable(p.time_entries for p in self.payment_periods)
+            )
+        return self._time_entries
+
+    def collection(self, data_type: str) -> List[Any]:
+        """Get all items of a collection.
+
+        Args:
+            data_type: Type of data
+                ('specialists', 'projects', 'payment_periods', 'time_entries')
+
+        Returns:
+            List of items
+
+        Raises:
+            ValueError: If data_type is invalid
+        """
+        if data_type == "specialists":
+            return self.specialists
+        elif data_type == "projects":
+            return self.projects
+        elif data_type == "payment_periods":
+            return self.payment_periods
+        elif data_type == "time_entries":
+            return self.time_entries
+        raise ValueError(f"Invalid data type: {data_type}")
+
+    def indexes(self, data_type: str) -> Indexes:
+        """Get the hash indexes of a collection, building them on first use.
+
+        Args:
+            data_type: Type of data
+
+        Returns:
+            Indexes of the collection by field name
+        """
+        indexes = self._indexes.get(data_type)
+        if indexes is None:
+            if data_type == "time_entries":
+                parts = [self._period_index(period) for period in self.payment_periods]
+                indexes = {
+                    field: PartitionedIndex([part[field] for part in parts])
+                    for field in INDEXED_FIELDS["time_entries"]
+                }
+            else:
+                indexes = build_indexes(data_type, self.collection(data_type))
+            self._indexes[data_type] = indexes
+        return indexes
+
+    def _period_index(
+        self, period: PaymentPeriod
+    ) -> Dict[str, Dict[Any, List[TimeEntry]]]:
+        """Get the hash indexes of the time entries of a period, building them once."""
+        index = self._period_indexes.get(period.id)
+        if index is None:
+            index = self._period_indexes[period.id] = build_indexes(
+                "time_entries", period.time_entries
+            )
+        return index
+
+    def publish(self) -> None:
+        """Start tracking the snapshot as a published generation."""
+        self._lifecycle = _Lifecycle()
+        weakref.finalize(self, _retire, self._lifecycle)
+        GENERATIONS_PUBLISHED.inc()
+        GENERATIONS_LIVE.inc()
+        DATA_GENERATION.set(self.generation)
+
+    def supersede(self) -> None:
+        """Mark the snapshot as not current; it retires once no reader holds it."""
+        if self._lifecycle is not None and self._lifecycle.superseded_at is None:
+            self._lifecycle.superseded_at = time.perf_counter()
+
+
+# A changed time entry: (old, new), None for an added or removed entry
+EntryChange = Tuple[Optional[TimeEntry], Optional[TimeEntry]]
+
+
+def _patch_index(
+    index: Dict[str, Dict[Any, List[Any]]], changes: List[EntryChange]
+) -> Optional[Dict[str, Dict[Any, List[Any]]]]:
+    """Apply changed time entries to a copy of the index of their period.
+
+    Entry lists of the index are copied when they change; the others are
+    shared with the base index. Added entries are appended, as they are to
+    the period.
+
+    Args:
+        index: Index of the period in the base snapshot
+        changes: Changed entries, in order
+
+    Returns:
+        Patched index, or None if an entry moved to another value of an
+        indexed field and the period has to be reindexed
+    """
+    patched = {field: dict(values) for field, values in index.items()}
+    copied: Set[Tuple[str, Any]] = set()
+
+    def entries(field: str, value: Any) -> List[Any]:
+        if (field, value) not in copied:
+            copied.add((field, value))
+            patched[field][value] = list(patched[field].get(value, ()))
+        return patched[field][value]
+
+    def position(items: List[Any], entry: TimeEntry) -> int:
+        return next(i for i, item in enumerate(items) if item is entry)
+
+    for old, new in changes:
+        for field in patched:
+            if old is not None and new is not None:
+                value = getattr(old, field)
+                if getattr(new, field) != value:
+                    return None
+                items = entries(field, value)
+                items[position(items, old)] = new
+            elif old is not None:
+                value = getattr(old, field)
+                items = entries(field, value)
+                del items[position(items, old)]
+                if not items:
+                    del patched[field][value]
+                    copied.discard((field, value))
+            elif new is not None:
+                entries(field, getattr(new, field)).append(new)
+    return patched
+
+
+class SnapshotBuilder:
+    """Builds the next generation from a snapshot, copying on first change.
+
+    Collections and payment periods of the base snapshot are shared until
+    they are changed. The first change copies them; later changes made
+    through the same builder reuse the copy, so replaying many changes in
+    one builder copies each period at most once.
+    """
+
+    def __init__(self, base: DataSnapshot, shared: bool = True):
+        """Initialize the builder.
+
+        Args:
+            base: Snapshot to build on
+            shared: Whether the base may be read by others; if not, as for a
+                snapshot just loaded, it is changed in place instead of copied
+        """
+        self.base = base
+        self.specialists = base.specialists
+        self.projects = base.projects
+        self.payment_periods = base.payment_periods
+        self._owned: Set[int] = set()
+        self._changed: Set[str] = set()
+        # IDs of the periods whose time entries changed
+        self._changed_entries: Set[str] = set()
+        # Changed time entries, (old, new), of the periods with a base index
+        self._entry_changes: Dict[str, List[EntryChange]] = {}
+        self._period_positions: Optional[Dict[str, int]] = None
+        if not shared:
+            self._owned.update(
+                map(id, (base.specialists, base.projects, base.payment_periods))
+            )
+            for period in base.payment_periods:
+                self._owned.update((id(period), id(period.time_entries)))
+
+    def _own(self, items: List[Any]) -> List[Any]:
+        """Get a copy of a shared list that this builder may change."""
+        if id(items) in self._owned:
+            return items
+        items = list(items)
+        self._owned.add(id(items))
+        return items
+
+    def edit_specialists(self) -> List[Specialist]:
+        """Get the specialists as a list that may be changed."""
+        self.specialists = self._own(self.specialists)
+        self._changed.add("specialists")
+        return self.specialists
+
+    def _positions(self) -> Dict[str, int]:
+        """Get the positions of the payment periods by ID."""
+        if self._period_positions is None:
+            self._period_positions = {
+                p.id: i for i, p in enumerate(self.payment_periods)
+            }
+        return self._period_positions
+
+    def _position(self, period_id: str) -> int:
+        return self._positions()[period_id]
+
+    def get_period(self, period_id: str) -> PaymentPeriod:
+        """Get a payment period as currently built, without copying it.
+
+        Raises:
+            KeyError: If the period does not exist
+        """
+        return self.payment_periods[self._position(period_id)]
+
+    def add_period(self, period: PaymentPeriod) -> None:
+        """Add a payment period owned by the builder."""
+        self.payment_periods = self._own(self.payment_periods)
+        self._changed.update(("payment_periods", "time_entries"))
+        self._changed_entries.add(period.id)
+        self._positions()[period.id] = len(self.payment_periods)
+        self.payment_periods.append(period)
+        self._owned.add(id(period))
+        self._owned.add(id(period.time_entries))
+
+    def edit_period(self, period_id: str) -> PaymentPeriod:
+        """Get a payment period that may be changed, copying it on first use.
+
+        The copy shares the list of time entries with the base; it is changed
+        through add_entry, replace_entry and remove_entry only.
+
+        Raises:
+            KeyError: If the period does not exist
+        """
+        position = self._position(period_id)
+        period = self.payment_periods[position]
+        self._changed.add("payment_periods")
+        if id(period) not in self._owned:
+            period = period.model_copy()
+            self._owned.add(id(period))
+            self.payment_periods = self._own(self.payment_periods)
+            self.payment_periods[position] = period
+        return period
+
+    def _edit_entries(self, period_id: str) -> PaymentPeriod:
+        """Get a payment period whose list of time entries may be changed."""
+        period = self.edit_period(period_id)
+        period.time_entries = self._own(period.time_entries)
+        self._changed.add("time_entries")
+        self._changed_entries.add(period_id)
+        return period
+
+    def _record(
+        self, period_id: str, old: Optional[TimeEntry], new: Optional[TimeEntry]
+    ) -> None:
+        """Record a changed time entry for patching the index of its period."""
+        if period_id in self.base._period_indexes:
+            self._entry_changes.setdefault(period_id, []).append((old, new))
+
+    def add_entry(self, period_id: str, entry: TimeEntry) -> PaymentPeriod:
+        """Append a time entry to a payment period and update its totals.
+
+        Raises:
+            KeyError: If the period does not exist
+        """
+        period = self._edit_entries(period_id)
+        period.add_time_entry(entry)
+        self._record(period_id, None, entry)
+        return period
+
+    def replace_entry(
+        self, period_id: str, position: int, entry: TimeEntry
+    ) -> PaymentPeriod:
+        """Replace the time entry at a position of a payment period.
+
+        The totals of the period are not updated.
+
+        Raises:
+            KeyError: If the period does not exist
+        """
+        period = self._edit_entries(period_id)
+        old = period.time_entries[position]
+        period.time_entries[position] = entry
+        self._record(period_id, old, entry)
+        return period
+
+    def remove_entry(self, period_id: str, position: int) -> PaymentPeriod:
+        """Remove the time entry at a position of a payment period.
+
+        The totals of the period are not updated.
+
+        Raises:
+            KeyError: If the period does not exist
+        """
+        period = self._edit_entries(period_id)
+        old = period.time_entries.pop(position)
+        self._record(period_id, old, None)
+        return period
+
+    def build(self, generation: int) -> DataSnapshot:
+        """Create the snapshot, sharing unchanged collections and their indexes.
+
+        The small collections are reindexed on first use when they change.
+        The time entries keep the index of every period whose entries did not
+        change and patch a copy of the index of every period whose entries
+        did, so a write costs time in the size of its period's index rather
+        than in the number of time entries.
+
+        Args:
+            generation: Generation number of the new snapshot
+
+        Returns:
+            New snapshot
+        """
+        base = self.base
+        unchanged = {
+            "specialists",
+            "projects",
+            "payment_periods",
+            "time_entries",
+        } - self._changed
+        shared = {
+            data_type: base._indexes[data_type]
+            for data_type in unchanged
+            if data_type in base._indexes
+        }
+        period_indexes = {}
+        for period_id, index in base._period_indexes.items():
+            if period_id in self._changed_entries:
+                index = _patch_index(index, self._entry_changes.get(period_id, []))
+            if index is not None:
+                period_indexes[period_id] = index
+        # Later changes through this builder must not reach the published lists
+        self._owned.clear()
+        return DataSnapshot(
+            generation,
+            self.specialists,
+            self.projects,
+            self.payment_periods,
+            indexes=shared,
+            time_entries=base._time_entries if "time_entries" in unchanged else None,
+            period_indexes=period_indexes,
+        )
+
+
+class SnapshotPin:
+    """Generation pinned by a request.
+
+    The pin is shared by all tasks and threads working on the request,
+    which get copies of the request's context holding the same pin object.
+    """
+
+    __slots__ = ("snapshot",)
+
+    def __init__(self, snapshot: Optional[DataSnapshot] = None) -> None:
+        self.snapshot = snapshot
@@ -0,0 +1,1307 @@
+"""Service for providing data from a local SQLite database."""
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from feptm.core.metrics import DATA_LOAD_SECONDS
+from feptm.models import PaymentPeriod, Project, Specialist
+from feptm.models.payment import (
+    PaymentPeriodCreate,
+    PaymentPeriodUpdate,
+    TimeEntry,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from feptm.models.specialist import SpecialistUpdate
+from feptm.services.mock_data_service import MockDataService
+from feptm.services.mutations import (
+    ChangeLog,
+    MutationRecord,
+    StorageError,
+    check_entry_date,
+    check_period_dates,
+    check_references,
+    check_specialist_dates,
+    complete_period_changes,
+    utcnow,
+)
+from feptm.services.query import QueryShape, parse_filters
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS specialists (
+    id TEXT PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    role TEXT NOT NULL,
+    hourly_rate REAL NOT NULL,
+    active INTEGER NOT NULL,
+    hire_date TEXT NOT NULL,
+    leave_date TEXT
+);
+
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    client_name TEXT NOT NULL,
+    client_contact_email TEXT,
+    client_contact_phone TEXT,
+    status TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    timesheet_id TEXT,
+    start_date TEXT NOT NULL,
+    end_date TEXT,
+    budget REAL,
+    repository_url TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS project_specialists (
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    specialist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (project_id, specialist_id)
+);
+
+CREATE TABLE IF NOT EXISTS payment_periods (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    report_id TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS time_entries (
+    id TEXT PRIMARY KEY,
+    period_id TEXT NOT NULL REFERENCES payment_periods(id) ON DELETE CASCADE,
+    specialist_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    hours REAL NOT NULL,
+    description TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_specialists_role ON specialists(role);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
+CREATE INDEX IF NOT EXISTS idx_project_specialists_specialist
+    ON project_specialists(specialist_id);
+CREATE INDEX IF NOT EXISTS idx_payment_periods_status ON payment_periods(status);
+CREATE INDEX IF NOT EXISTS idx_time_entries_specialist_date
+    ON time_entries(specialist_id, date);
+CREATE INDEX IF NOT EXISTS idx_time_entries_project_date
+    ON time_entries(project_id, date);
+CREATE INDEX IF NOT EXISTS idx_time_entries_period ON time_entries(period_id);
+"""
+
+TIME_ENTRY_COLUMNS = (
+    "id, specialist_id, project_id, date, hours, description, created_at, updated_at"
+)
+TIME_ENTRY_FIELDS = tuple(column.strip() for column in TIME_ENTRY_COLUMNS.split(","))
+
+
+def _to_db_datetime(value: Optional[datetime]) -> Optional[str]:
+    """Convert a datetime to a sortable UTC string.
+
+    Naive datetimes are treated as UTC. The fixed-width format keeps
+    lexicographic order equal to chronological order, which the date
+    indexes rely on.
+
+    Args:
+        value: Datetime to convert
+
+    Returns:
+        ISO 8601 string with microseconds, or None
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+
+# SQL templates for the query engine operators
+SQL_OPERATORS: Dict[str, str] = {
+    "eq": "{column} IS ?",
+    "ne": "{column} IS NOT ?",
+    "in": "({column} IN (SELECT value FROM json_each(?)) OR ({column} IS NULL AND ?))",
+    "gt": "{column} > ?",
+    "gte": "{column} >= ?",
+    "lt": "{column} < ?",
+    "lte": "{column} <= ?",
+}
+
+
+@lru_cache(maxsize=256)
+def compile_sql(shape: QueryShape) -> Tuple[str, str]:
+    """Compile a query shape into SQL WHERE and ORDER BY clauses.
+
+    Field names come from the query schemas, so they are safe to interpolate.
+    Conditions treat None as the in-memory query engine does: 'eq' and 'ne'
+    compile to IS and IS NOT, so None matches NULL, and 'in' matches NULL
+    if its values hold None. None values sort last in ascending and first
+    in descending order, as in the in-memory query engine.
+
+    Args:
+        shape: Shape of the query
+
+    Returns:
+        WHERE condition (empty for no conditions) and ORDER BY clause
+    """
+    where = " AND ".join(
+        SQL_OPERATORS[op].format(column=field) for field, op in shape.conditions
+    )
+    order = [
+        f"{field} DESC NULLS FIRST" if descending else f"{field} ASC NULLS LAST"
+        for field, descending in shape.order_by
+    ]
+    order.append("rowid")
+    return where, ", ".join(order)
+
+
+def _to_db_value(value: Any) -> Any:
+    """Convert a normalized filter value to an SQLite parameter.
+
+    Args:
+        value: Filter value
+
+    Returns:
+        SQLite parameter value
+    """
+    if isinstance(value, datetime):
+        return _to_db_datetime(value)
+    return value
+
+
+def _bind_sql_values(shape: QueryShape, values: Tuple[Any, ...]) -> List[Any]:
+    """Convert query values into parameters for the compiled SQL.
+
+    Args:
+        shape: Shape of the query
+        values: Values bound to the query conditions
+
+    Returns:
+        List of SQL parameters
+    """
+    params = []
+    for (field, op), value in zip(shape.conditions, values):
+        if op == "in":
+            params.append(json.dumps(sorted((_to_db_value(v) for v in value), key=str)))
+            params.append(None in value)
+        else:
+            params.append(_to_db_value(value))
+    return params
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _timed_load(collection: str) -> Callable[[F], F]:
+    """Record the duration of a loader in the data load metrics.
+
+    Args:
+        collection: Name of the loaded collection
+
+    Returns:
+        Decorator for the loader
+    """
+
+    def decorator(method: F) -> F:
+        @wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with DATA_LOAD_SECONDS.labels("sqlite", collection).time():
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _writes(method: F) -> F:
+    """Run a mutation outside the read transaction of the pin of the context.
+
+    The read transaction is ended first, so the mutation validates against
+    and changes the latest data, and reopened afterwards, so the context
+    reads its own write.
+    """
+
+    @wraps(method)
+    def wrapper(self: "SQLiteDataService", *args: Any, **kwargs: Any) -> Any:
+        conn = self._pinned.get()
+        if conn is None:
+            return method(self, *args, **kwargs)
+        conn.commit()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            conn.execute("BEGIN")
+
+    return wrapper  # type: ignore[return-value]
+
+
+class SQLiteDataService:
+    """Service for working with data stored in a local SQLite database.
+
+    Implements the same read interface as MockDataService, but filtering
+    and report aggregation are done by SQLite using indexed queries.
+    """
+
+    def __init__(self, db_path: Path):
+        """Initialize the SQLite data service.
+
+        Args:
+            db_path: Path to the SQLite database file, created if missing
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+        # Connection holding the read transaction of the pin of the context
+        self._pinned: ContextVar[Optional[sqlite3.Connection]] = ContextVar(
+            f"feptm_sqlite_pin_{id(self)}", default=None
+        )
+        # Idle connections for pins, reused by later pins
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        # Mutation records of the latest data versions written by this service
+        self._changes = ChangeLog()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the database connection for the current context.
+
+        Returns:
+            Connection of the pin of the context, or of the current thread
+        """
+        conn = self._pinned.get()
+        if conn is None:
+            conn = self._thread_connection()
+        return conn
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening it on first use."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._local.connection = self._connect()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a database connection, creating the schema if needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        """Create tables and indexes if they don't exist, once per service.
+
+        Args:
+            conn: Connection to create the schema with
+        """
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            with conn:
+                conn.executescript(SCHEMA)
+            self._schema_ready = True
+
+    def warm_up(self) -> None:
+        """Open the database ahead of the first request."""
+        if self.is_empty():
+            logger.warning(
+                f"SQLite database {self.db_path} has no data, "
+                "import it with bin/import_sqlite.py"
+            )
+
+    @property
+    def data_version(self) -> int:
+        """Get the version of the stored data, incremented on every import.
+
+        Returns:
+            Data version
+        """
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'data_version'"
+        ).fetchone()
+        return row["value"] if row else 0
+
+    @contextmanager
+    def pin(self) -> Iterator[None]:
+        """Make all reads in the current context see one state of the data.
+
+        The context gets a connection of its own with an open read
+        transaction, which in WAL mode reads the database snapshot taken by
+        its first statement while writers carry on. Tasks and threads started
+        from the context share the connection. A write made in the context
+        ends the transaction and opens a new one, so the context reads its
+        own writes. Nested pins keep the outer one.
+        """
+        if self._pinned.get() is not None:
+            yield
+            return
+        with self._readers_lock:
+            conn = self._readers.pop() if self._readers else None
+        if conn is None:
+            conn = self._connect()
+        conn.execute("BEGIN")
+        token = self._pinned.set(conn)
+        try:
+            yield
+        finally:
+            self._pinned.reset(token)
+            conn.rollback()
+            with self._readers_lock:
+                self._readers.append(conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a mutation in a write transaction of the connection of the context.
+
+        The transaction takes the write lock up front (BEGIN IMMEDIATE), so
+        the validation reads made in it see the data the mutation changes,
+        and no concurrent writer can change it in between. Waiting for the
+        lock is bounded by the busy timeout of the connection.
+
+        Yields:
+            Connection in the transaction, committed if the block succeeds
+
+        Raises:
+            StorageError: If the write lock cannot be taken in time
+        """
+        conn = self.connection
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            raise StorageError(f"SQLite database is busy: {e}") from e
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def is_empty(self) -> bool:
+        """Check whether the database has no data yet.
+
+        Returns:
+            True if no specialists, projects or payment periods are stored
+        """
+        for table in ("specialists", "projects", "payment_periods"):
+            if self.connection.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    @_writes
+    def import_json(
+        self, data_dir: Optional[Path] = None, replace: bool = False
+    ) -> Dict[str, int]:
+        """Import data from the JSON data files.
+
+        The import is skipped if the database already has data, unless
+        replace is set, in which case existing rows are deleted first.
+
+        Args:
+            data_dir: Directory with the JSON data files, read as they are; defaults
+                to the configured data with its journal replayed
+            replace: Replace existing data instead of skipping the import
+
+        Returns:
+            Number of imported rows per table
+        """
+        counts = {
+            "specialists": 0,
+            "projects": 0,
+            "payment_periods": 0,
+            "time_entries": 0,
+        }
+        if not replace and not self.is_empty():
+            logger.info(
+                f"SQLite database {self.db_path} already has data, skipping import"
+            )
+            return counts
+
+        source = MockDataService(data_dir)
+        specialists = source.get_specialists()
+        projects = source.get_projects()
+        periods = source.get_payment_periods()
+
+        with self.connection as conn:
+            if replace:
+                for table in (
+                    "time_entries",
+                    "payment_periods",
+                    "project_specialists",
+                    "projects",
+                    "specialists",
+                ):
+                    conn.execute(f"DELETE FROM {table}")
+
+            conn.executemany(
+                "INSERT INTO specialists VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        s.id,
+                        s.full_name,
+                        s.email,
+                        s.role.value,
+                        s.hourly_rate,
+                        int(s.active),
+                        _to_db_datetime(s.hire_date),
+                        _to_db_datetime(s.leave_date),
+                    )
+                    for s in specialists
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO projects "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        p.id,
+                        p.name,
+                        p.description,
+                        p.client_name,
+                        p.client_contact_email,
+                        p.client_contact_phone,
+                        p.status.value,
+                        p.project_type.value,
+                        p.timesheet_id,
+                        _to_db_datetime(p.start_date),
+                        _to_db_datetime(p.end_date),
+                        p.budget,
+                        str(p.repository_url) if p.repository_url else None,
+                        _to_db_datetime(p.created_at),
+                        _to_db_datetime(p.updated_at),
+                    )
+                    for p in projects
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO project_specialists VALUES (?, ?, ?)",
+                (
+                    (p.id, specialist_id, position)
+                    for p in projects
+                    for position, specialist_id in enumerate(p.specialist_ids)
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO payment_periods VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        p.id,
+                        p.name,
+                        _to_db_datetime(p.start_date),
+                        _to_db_datetime(p.end_date),
+                        p.status.value,
+                        p.report_id,
+                        _to_db_datetime(p.created_at),
+                        _to_db_datetime(p.updated_at),
+                    )
+                    for p in periods
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO time_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        e.id,
+                        p.id,
+                        e.specialist_id,
+                        e.project_id,
+                        _to_db_datetime(e.date),
+                        e.hours,
+                        e.description,
+                        _to_db_datetime(e.created_at),
+                        _to_db_datetime(e.updated_at),
+                    )
+                    for p in periods
+                    for e in p.time_entries
+                ),
+            )
+            self._bump_data_version(conn)
+        # Consumers have to derive their data again from the imported data
+        self._changes.clear()
+
+        counts["specialists"] = len(specialists)
+        counts["projects"] = len(projects)
+        counts["payment_periods"] = len(periods)
+        counts["time_entries"] = sum(len(p.time_entries) for p in periods)
+        logger.info(f"Imported {counts} into {self.db_path}")
+        return counts
+
+    @_timed_load("specialists")
+    def _query_specialists(
+        self, where: str = "", params: Iterable[Any] = (), order_by: str = "rowid"
+    ) -> List[Specialist]:
+        """Load specialists matching a WHERE clause.
+
+        Args:
+            where: SQL condition, empty for all rows
+            params: Parameters for the condition
+            order_by: SQL ordering of the rows
+
+        Returns:
+            List of specialists
+        """
+        sql = "SELECT * FROM specialists"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order_by}"
+        return [
+            Specialist.model_validate(dict(row))
+            for row in self.connection.execute(sql, tuple(params))
+        ]
+
+    @_timed_load("projects")
+    def _query_projects(
+        self, where: str = "", params: Iterable[Any] = (), order_by: str = "rowid"
+    ) -> List[Project]:
+        """Load projects matching a WHERE clause, with their specialist IDs.
+
+        Args:
+            where: SQL condition, empty for all rows
+            params: Parameters for the condition
+            order_by: SQL ordering of the rows
+
+        Returns:
+            List of projects
+        """
+        sql = "SELECT * FROM projects"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order_by}"
+        rows = [dict(row) for row in self.connection.execute(sql, tuple(params))]
+        if not rows:
+            return []
+
+        specialist_ids: Dict[str, List[str]] = {row["id"]: [] for row in rows}
+        placeholders = ", ".join("?" for _ in rows)
+        for link in self.connection.execute(
+            f"SELECT project_id, specialist_id FROM project_specialists "
+            f"WHERE project_id IN ({placeholders}) ORDER BY project_id, position",
+            tuple(specialist_ids),
+        ):
+            specialist_ids[link["project_id"]].append(link["specialist_id"])
+
+        return [
+            Project.model_validate({**row, "specialist_ids": specialist_ids[row["id"]]})
+            for row in rows
+        ]
+
+    @_timed_load("payment_periods")
+    def _query_payment_periods(
+        self, where: str = "", params: Iterable[Any] = (), order_by: str = "rowid"
+    ) -> List[PaymentPeriod]:
+        """Load payment periods matching a WHERE clause, with their time entries.
+
+        Period totals are computed from the stored time entries.
+
+        Args:
+            where: SQL condition, empty for all rows
+            params: Parameters for the condition
+            order_by: SQL ordering of the rows
+
+        Returns:
+            List of payment periods
+        """
+        sql = "SELECT * FROM payment_periods"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order_by}"
+        rows = [dict(row) for row in self.connection.execute(sql, tuple(params))]
+        if not rows:
+            return []
+
+        entries: Dict[str, List[TimeEntry]] = {row["id"]: [] for row in rows}
+        placeholders = ", ".join("?" for _ in rows)
+        for entry in self.connection.execute(
+            f"SELECT period_id, {TIME_ENTRY_COLUMNS} FROM time_entries "
+            f"WHERE period_id IN ({placeholders}) ORDER BY rowid",
+            tuple(entries),
+        ):
+            entry = dict(entry)
+            entries[entry.pop("period_id")].append(TimeEntry.model_validate(entry))
+
+        periods = []
+        for row in rows:
+            specialist_totals: Dict[str, float] = {}
+            project_totals: Dict[str, float] = {}
+            for entry in entries[row["id"]]:
+                specialist_totals[entry.specialist_id] = (
+                    specialist_totals.get(entry.specialist_id, 0.0) + entry.hours
+                )
+                project_totals[entry.project_id] = (
+                    project_totals.get(entry.project_id, 0.0) + entry.hours
+                )
+            periods.append(
+                PaymentPeriod.model_validate(
+                    {
+                        **row,
+                        "time_entries": entries[row["id"]],
+                        "specialist_totals": specialist_totals,
+                        "project_totals": project_totals,
+                        "total_hours": sum(project_totals.values()),
+                    }
+                )
+            )
+        return periods
+
+    def get_specialists(self) -> List[Specialist]:
+        """Get all specialists.
+
+        Returns:
+            List of specialists
+        """
+        return self._query_specialists()
+
+    def get_specialist(self, specialist_id: str) -> Optional[Specialist]:
+        """Get a specialist by ID.
+
+        Args:
+            specialist_id: ID of the specialist
+
+        Returns:
+            Specialist if found, None otherwise
+        """
+        specialists = self._query_specialists("id = ?", (specialist_id,))
+        return specialists[0] if specialists else None
+
+    def get_projects(self) -> List[Project]:
+        """Get all projects.
+
+        Returns:
+            List of projects
+        """
+        return self._query_projects()
+
+    def get_project(self, project_id: str) -> Optional[Project]:
+        """Get a project by ID.
+
+        Args:
+            project_id: ID of the project
+
+        Returns:
+            Project if found, None otherwise
+        """
+        projects = self._query_projects("id = ?", (project_id,))
+        return projects[0] if projects else None
+
+    def get_payment_periods(self) -> List[PaymentPeriod]:
+        """Get all payment periods.
+
+        Returns:
+            List of payment periods
+        """
+        return self._query_payment_periods()
+
+    def get_payment_period(self, period_id: str) -> Optional[PaymentPeriod]:
+        """Get a payment period by ID.
+
+        Args:
+            period_id: ID of the payment period
+
+        Returns:
+            PaymentPeriod if found, None otherwise
+        """
+        periods = self._query_payment_periods("id = ?", (period_id,))
+        return periods[0] if periods else None
+
+    def get_by_ids(self, data_type: str, ids: List[str]) -> Dict[str, Any]:
+        """Get items of a collection by their IDs with a single query.
+
+        Args:
+            data_type: Type of data
+                ('specialists', 'projects', 'payment_periods', 'time_entries')
+            ids: IDs of the items
+
+        Returns:
+            Found items by ID, in the order of the IDs; missing IDs are left out
+
+        Raises:
+            ValueError: If data_type is invalid
+        """
+        if not ids:
+            return {}
+        items = {
+            item.id: item
+            for item in self.get_filtered_data(data_type, {"id__in": list(ids)})
+        }
+        return {item_id: items[item_id] for item_id in ids if item_id in items}
+
+    def payment_period_exists(self, period_id: str) -> bool:
+        """Check whether a payment period exists.
+
+        Args:
+            period_id: ID of the payment period
+
+        Returns:
+            True if the payment period exists, False otherwise
+        """
+        row = self.connection.execute(
+            "SELECT 1 FROM payment_periods WHERE id = ?", (period_id,)
+        ).fetchone()
+        return row is not None
+
+    def get_time_entries(
+        self,
+        specialist_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[TimeEntry]:
+        """Get time entries with optional filtering.
+
+        Args:
+            specialist_id: Filter by specialist ID
+            project_id: Filter by project ID
+            start_date: Filter entries after this date
+            end_date: Filter entries before this date
+
+        Returns:
+            List of time entries matching the filters
+        """
+        filters = {
+            "specialist_id": specialist_id,
+            "project_id": project_id,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        return self.get_filtered_data(
+            "time_entries", {k: v for k, v in filters.items() if v is not None}
+        )
+
+    @_timed_load("time_entries")
+    def _query_time_entries(
+        self, where: str = "", params: Iterable[Any] = (), order_by: str = "rowid"
+    ) -> List[TimeEntry]:
+        """Load time entries matching a WHERE clause.
+
+        Args:
+            where: SQL condition, empty for all rows
+            params: Parameters for the condition
+            order_by: SQL ordering of the rows
+
+        Returns:
+            List of time entries
+        """
+        sql = f"SELECT {TIME_ENTRY_COLUMNS} FROM time_entries"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order_by}"
+        return [
+            TimeEntry.model_validate(dict(row))
+            for row in self.connection.execute(sql, tuple(params))
+        ]
+
+    def iter_time_entry_columns(
+        self, batch_size: int, period_id: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, Sequence[Any]]]]:
+        """Iterate over time entries as columns, in batches, period by period.
+
+        Rows are not converted to models: datetimes are returned as the
+        stored ISO 8601 strings. Each batch is a separate keyset query on
+        the calling thread's connection, so no cursor stays open between
+        batches.
+
+        Args:
+            batch_size: Maximum number of entries per batch
+            period_id: Only iterate over the entries of this payment period
+
+        Returns:
+            Iterator over (period ID, values by TimeEntry field) pairs; a batch
+                never spans two periods
+        """
+        where, params = (
+            ("WHERE id = ?", (period_id,)) if period_id is not None else ("", ())
+        )
+        period_ids = [
+            row["id"]
+            for row in self.connection.execute(
+                f"SELECT id FROM payment_periods {where} ORDER BY rowid", params
+            )
+        ]
+        for current in period_ids:
+            last_rowid = 0
+            while True:
+                rows = self.connection.execute(
+                    f"SELECT rowid, {TIME_ENTRY_COLUMNS} FROM time_entries "
+                    f"WHERE period_id = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (current, last_rowid, batch_size),
+                ).fetchall()
+                if not rows:
+                    break
+                last_rowid = rows[-1]["rowid"]
+                yield current, dict(zip(TIME_ENTRY_FIELDS, list(zip(*rows))[1:]))
+                if len(rows) < batch_size:
+                    break
+
+    def get_specialist_report_data(
+        self, period_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate hours and amounts per specialist.
+
+        Args:
+            period_id: Restrict the report to a single payment period
+
+        Returns:
+            List of report rows with specialist_id, full_name, role, total_hours,
+            hourly_rate and total_amount
+        """
+        where, params = self._period_condition(period_id)
+        sql = f"""
+            SELECT s.id AS specialist_id, s.full_name, s.role,
+                   SUM(e.hours) AS total_hours, s.hourly_rate,
+                   SUM(e.hours) * s.hourly_rate AS total_amount
+            FROM time_entries e
+            JOIN specialists s ON s.id = e.specialist_id
+            {where}
+            GROUP BY s.id
+            ORDER BY MIN(e.rowid)
+        """
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def get_project_report_data(
+        self, period_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregate hours and distinct specialists per project.
+
+        Args:
+            period_id: Restrict the report to a single payment period
+
+        Returns:
+            List of report rows with project_id, name, client_name, total_hours
+            and specialist_count
+        """
+        where, params = self._period_condition(period_id)
+        sql = f"""
+            SELECT p.id AS project_id, p.name, p.client_name,
+                   SUM(e.hours) AS total_hours,
+                   COUNT(DISTINCT e.specialist_id) AS specialist_count
+            FROM time_entries e
+            JOIN projects p ON p.id = e.project_id
+            {where}
+            GROUP BY p.id
+            ORDER BY MIN(e.rowid)
+        """
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    @staticmethod
+    def _period_condition(period_id: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
+        """Build the WHERE clause restricting time entries to a period.
+
+        Args:
+            period_id: ID of the payment period, or None for all periods
+
+        Returns:
+            SQL clause and its parameters
+        """
+        if period_id is None:
+            return "", ()
+        return "WHERE e.period_id = ?", (period_id,)
+
+    def get_filtered_data(
+        self, data_type: str, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Union[Specialist, Project, PaymentPeriod, TimeEntry]]:
+        """Get data of specified type with optional filtering.
+
+        Args:
+            data_type: Type of data to get
+                ('specialists', 'projects', 'payment_periods', 'time_entries')
+            filters: Filters to apply to the data
+
+        Returns:
+            List of data items matching the filters
+
+        Raises:
+            ValueError: If data_type or a filter is invalid
+        """
+        shape, values = parse_filters(data_type, filters)
+        where, order_by = compile_sql(shape)
+        params = _bind_sql_values(shape, values)
+
+        if data_type == "specialists":
+            return self._query_specialists(where, params, order_by)
+        elif data_type == "projects":
+            return self._query_projects(where, params, order_by)
+        elif data_type == "payment_periods":
+            return self._query_payment_periods(where, params, order_by)
+        else:
+            return self._query_time_entries(where, params, order_by)
+
+    def close(self) -> None:
+        """Close the connection of the current thread and the idle connections of pins.
+
+        Every mutation is committed in its own transaction, so nothing is pending.
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is not None:
+            conn.close()
+            self._local.connection = None
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+
+    def compact(self) -> Optional[Dict[str, Any]]:
+        """Checkpoint the SQLite write-ahead log into the database file.
+
+        Returns:
+            Result of the checkpoint
+        """
+        # Not the connection of a pin, whose read transaction would keep the log
+        busy, log_frames, checkpointed = (
+            self._thread_connection()
+            .execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            .fetchone()
+        )
+        return {
+            "busy": bool(busy),
+            "log_frames": log_frames,
+            "checkpointed_frames": checkpointed,
+        }
+
+    @staticmethod
+    def _bump_data_version(conn: sqlite3.Connection) -> int:
+        """Increment the data version within the current transaction.
+
+        Returns:
+            New data version
+        """
+        conn.execute(
+            "INSERT INTO meta VALUES ('data_version', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+        return conn.execute(
+            "SELECT value FROM meta WHERE key = 'data_version'"
+        ).fetchone()["value"]
+
+    def get_changes(
+        self, since_version: int, until_version: int
+    ) -> Optional[List[MutationRecord]]:
+        """Get the records of the mutations producing a range of data versions.
+
+        Only mutations made through this service are recorded, so versions
+        written by other processes, such as an import, are unknown.
+
+        Args:
+            since_version: Data version the caller is up to date with
+            until_version: Last data version to return the record of
+
+        Returns:
+            Records in order, or None if they are not all known
+        """
+        return self._changes.between(since_version, until_version)
+
+    def _period_row(self, period_id: str) -> Optional[PaymentPeriod]:
+        """Get a payment period without its time entries, or None if not found."""
+        row = self.connection.execute(
+            "SELECT * FROM payment_periods WHERE id = ?", (period_id,)
+        ).fetchone()
+        return PaymentPeriod.model_validate(dict(row)) if row is not None else None
+
+    def _period_dates(self, period_id: str) -> Optional[Tuple[datetime, datetime]]:
+        """Get the start and end date of a payment period, or None if not found."""
+        row = self.connection.execute(
+            "SELECT start_date, end_date FROM payment_periods WHERE id = ?",
+            (period_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return datetime.fromisoformat(row["start_date"]), datetime.fromisoformat(
+            row["end_date"]
+        )
+
+    @staticmethod
+    def _update_row(
+        conn: sqlite3.Connection, table: str, row_id: str, values: Dict[str, Any]
+    ) -> None:
+        """Update columns of a row from validated model fields."""
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        params = [
+            value.value if isinstance(value, Enum) else _to_db_value(value)
+            for value in values.values()
+        ]
+        conn.execute(
+            f"UPDATE {table} SET {assignments} WHERE id = ?", (*params, row_id)
+        )
+
+    @_writes
+    def update_specialist(
+        self, specialist_id: str, changes: SpecialistUpdate
+    ) -> Optional[Specialist]:
+        """Update a specialist.
+
+        Args:
+            specialist_id: ID of the specialist
+            changes: Fields to change
+
+        Returns:
+            Updated specialist, or None if not found
+
+        Raises:
+            ValueError: If the specialist would leave before being hired
+            StorageError: If the database is busy
+        """
+        values = changes.model_dump(exclude_unset=True)
+        with self._transaction() as conn:
+            specialist = self.get_specialist(specialist_id)
+            if specialist is None:
+                return None
+            check_specialist_dates(
+                values.get("hire_date", specialist.hire_date),
+                values.get("leave_date", specialist.leave_date),
+            )
+            if not values:
+                return specialist
+            self._update_row(conn, "specialists", specialist_id, values)
+            version = self._bump_data_version(conn)
+            updated = self.get_specialist(specialist_id)
+        self._changes.add(
+            version, MutationRecord("specialist.update", specialist, updated)
+        )
+        return updated
+
+    @_writes
+    def create_payment_period(self, data: PaymentPeriodCreate) -> PaymentPeriod:
+        """Create a payment period.
+
+        Args:
+            data: Payment period data
+
+        Returns:
+            Created payment period
+
+        Raises:
+            ValueError: If the period ends before it starts
+            StorageError: If the database is busy
+        """
+        check_period_dates(data.start_date, data.end_date)
+        now = utcnow()
+        period = PaymentPeriod(
+            **data.model_dump(exclude_none=True), created_at=now, updated_at=now
+        )
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO payment_periods VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    period.id,
+                    period.name,
+                    _to_db_datetime(period.start_date),
+                    _to_db_datetime(period.end_date),
+                    period.status.value,
+                    period.report_id,
+                    _to_db_datetime(period.created_at),
+                    _to_db_datetime(period.updated_at),
+                ),
+            )
+            version = self._bump_data_version(conn)
+        self._changes.add(version, MutationRecord("period.create", None, period))
+        return period
+
+    @_writes
+    def update_payment_period(
+        self, period_id: str, changes: PaymentPeriodUpdate
+    ) -> Optional[PaymentPeriod]:
+        """Update a payment period.
+
+        Args:
+            period_id: ID of the payment period
+            changes: Fields to change
+
+        Returns:
+            Updated payment period, or None if not found
+
+        Raises:
+            ValueError: If the new dates are invalid or leave time entries
+                outside the period
+            StorageError: If the database is busy
+        """
+        values = changes.model_dump(exclude_unset=True)
+        with self._transaction() as conn:
+            before = self._period_row(period_id)
+            if before is None:
+                return None
+            start_date = values.get("start_date", before.start_date)
+            end_date = values.get("end_date", before.end_date)
+            check_period_dates(start_date, end_date)
+            values = complete_period_changes(
+                before.name, before.start_date, before.end_date, values
+            )
+            if "start_date" in values or "end_date" in values:
+                outside = conn.execute(
+                    "SELECT date FROM time_entries "
+                    "WHERE period_id = ? AND (date < ? OR date > ?) LIMIT 1",
+                    (period_id, _to_db_datetime(start_date), _to_db_datetime(end_date)),
+                ).fetchone()
+                if outside is not None:
+                    check_entry_date(
+                        datetime.fromisoformat(outside["date"]), start_date, end_date
+                    )
+            self._update_row(
+                conn, "payment_periods", period_id, {**values, "updated_at": utcnow()}
+            )
+            version = self._bump_data_version(conn)
+            period = self.get_payment_period(period_id)
+        self._changes.add(version, MutationRecord("period.update", before, period))
+        return period
+
+    @_writes
+    def add_time_entry(
+        self, period_id: str, data: TimeEntryCreate
+    ) -> Optional[TimeEntry]:
+        """Add a time entry to a payment period.
+
+        Args:
+            period_id: ID of the payment period
+            data: Time entry data
+
+        Returns:
+            Created time entry, or None if the payment period was not found
+
+        Raises:
+            ValueError: If the specialist or project does not exist, or the
+                date is outside the payment period
+            StorageError: If the database is busy
+        """
+        now = utcnow()
+        entry = TimeEntry(**data.model_dump(), created_at=now, updated_at=now)
+        with self._transaction() as conn:
+            dates = self._period_dates(period_id)
+            if dates is None:
+                return None
+            check_references(self, entry.specialist_id, entry.project_id)
+            check_entry_date(entry.date, *dates)
+            conn.execute(
+                "INSERT INTO time_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.id,
+                    period_id,
+                    entry.specialist_id,
+                    entry.project_id,
+                    _to_db_datetime(entry.date),
+                    entry.hours,
+                    entry.description,
+                    _to_db_datetime(entry.created_at),
+                    _to_db_datetime(entry.updated_at),
+                ),
+            )
+            version = self._bump_data_version(conn)
+        self._changes.add(
+            version, MutationRecord("entry.create", None, entry, period_id)
+        )
+        return entry
+
+    @_writes
+    def update_time_entry(
+        self, entry_id: str, changes: TimeEntryUpdate
+    ) -> Optional[TimeEntry]:
+        """Update a time entry.
+
+        Args:
+            entry_id: ID of the time entry
+            changes: Fields to change
+
+        Returns:
+            Updated time entry, or None if not found
+
+        Raises:
+            ValueError: If the specialist or project does not exist, or the
+                date is outside the payment period
+            StorageError: If the database is busy
+        """
+        values = changes.model_dump(exclude_unset=True)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT p.id, p.start_date, p.end_date FROM time_entries e "
+                "JOIN payment_periods p ON p.id = e.period_id WHERE e.id = ?",
+                (entry_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            before = self._query_time_entries("id = ?", (entry_id,))[0]
+            check_references(
+                self, values.get("specialist_id"), values.get("project_id")
+            )
+            if "date" in values:
+                check_entry_date(
+                    values["date"],
+                    datetime.fromisoformat(row["start_date"]),
+                    datetime.fromisoformat(row["end_date"]),
+                )
+            self._update_row(
+                conn, "time_entries", entry_id, {**values, "updated_at": utcnow()}
+            )
+            version = self._bump_data_version(conn)
+            entries = self._query_time_entries("id = ?", (entry_id,))
+        self._changes.add(
+            version, MutationRecord("entry.update", before, entries[0], row["id"])
+        )
+        return entries[0]
+
+    @_writes
+    def delete_time_entry(self, entry_id: str) -> bool:
+        """Delete a time entry.
+
+        Args:
+            entry_id: ID of the time entry
+
+        Returns:
+            True if the time entry was deleted, False if not found
+
+        Raises:
+            StorageError: If the database is busy
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                f"SELECT period_id, {TIME_ENTRY_COLUMNS} "
+                "FROM time_entries WHERE id = ?",
+                (entry_id,),
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM time_entries WHERE id = ?", (entry_id,))
+            version = self._bump_data_version(conn)
+        before = TimeEntry.model_validate(
+            {name: row[name] for name in TIME_ENTRY_FIELDS}
+        )
+        self._changes.add(
+            version, MutationRecord("entry.delete", before, None, row["period_id"])
+        )
+        return True
@@ -0,0 +1,100 @@
+"""Fixtures for the unit tests."""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from feptm.models.payment import TimeEntryCreate
+from feptm.services import MockDataService, SQLiteDataService
+from feptm.services.data_service import data_service
+
+DATA_DIR = Path(__file__).parent.parent / "src" / "feptm" / "data"
+
+
+def dump_state(service: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """Dump all collections of a data service as JSON data for comparisons."""
+    return {
+        "specialists": [s.model_dump(mode="json") for s in service.get_specialists()],
+        "projects": [p.model_dump(mode="json") for p in service.get_projects()],
+        "payment_periods": [
+            p.model_dump(mode="json") for p in service.get_payment_periods()
+        ],
+    }
+
+
+def entry_like(
+    service: Any, period_id: str, hours: float = 1.0, description: str = "Test entry"
+) -> TimeEntryCreate:
+    """Build a valid time entry for a period from one of its existing entries."""
+    entry = service.get_payment_period(period_id).time_entries[0]
+    return TimeEntryCreate(
+        specialist_id=entry.specialist_id,
+        project_id=entry.project_id,
+        date=entry.date,
+        hours=hours,
+        description=description,
+    )
+
+
+@pytest.fixture
+def data_dir() -> Path:
+    """Directory with the bundled JSON data files."""
+    return DATA_DIR
+
+
+@pytest.fixture
+def journal_dir(tmp_path: Path) -> Path:
+    """Empty journal directory."""
+    return tmp_path / "journal"
+
+
+@pytest.fixture
+def open_service(
+    data_dir: Path, journal_dir: Path
+) -> Iterator[Callable[[], MockDataService]]:
+    """Open JSON data services on the bundled data and a shared journal.
+
+    The services are closed after the test.
+    """
+    services: List[MockDataService] = []
+
+    def open_() -> MockDataService:
+        service = MockDataService(data_dir, journal_dir=journal_dir)
+        services.append(service)
+        return service
+
+    yield open_
+    for service in services:
+        service.close()
+
+
+@pytest.fixture
+def sqlite_service(data_dir: Path, tmp_path: Path) -> Iterator[SQLiteDataService]:
+    """SQLite data service with the bundled data imported into a new database."""
+    service = SQLiteDataService(tmp_path / "feptm.sqlite3")
+    service.import_json(data_dir)
+    yield service
+    service.close()
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def service(request: Any) -> Any:
+    """Data service of each backend, on the bundled data."""
+    if request.param == "json":
+        return request.getfixturevalue("open_service")()
+    return request.getfixturevalue("sqlite_service")
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """Test client for the application on the global data service.
+
+    The lifespan is not run, so the services stay open for the next test, and
+    changes made through the client are dropped after the test.
+    """
+    from feptm.main import app
+
+    yield TestClient(app)
+    data_service.reload()
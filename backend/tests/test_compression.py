@@ -0,0 +1,149 @@
+"""Tests for content negotiation and the response cache."""
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from feptm.api.middleware.compression import CompressionMiddleware
+from feptm.core.compression import negotiate_encoding
+
+SUPPORTED = ["zstd", "gzip"]
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, zstd", "zstd"),
+        ("zstd;q=0.5, gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=0, zstd;q=0", None),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "gzip"),
+        ("gzip;q=invalid", None),
+    ],
+)
+def test_negotiate_encoding(
+    accept_encoding: Optional[str], expected: Optional[str]
+) -> None:
+    assert negotiate_encoding(accept_encoding, SUPPORTED) == expected
+
+
+class JsonApp:
+    """ASGI application returning the data version and path as padded JSON."""
+
+    def __init__(self) -> None:
+        self.version = 1
+        self.calls: List[str] = []
+        self.size = 4096
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        self.calls.append(scope["path"])
+        body = json.dumps(
+            {
+                "version": self.version,
+                "path": scope["path"],
+                "padding": "x" * self.size,
+            }
+        ).encode()
+        headers = [(b"content-type", b"application/json")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture
+def app() -> JsonApp:
+    return JsonApp()
+
+
+def client_for(app: JsonApp, cache_max_bytes: int = 1024 * 1024) -> TestClient:
+    return TestClient(
+        CompressionMiddleware(
+            app, version_of=lambda: app.version, cache_max_bytes=cache_max_bytes
+        )
+    )
+
+
+def fetch(client: TestClient, path: str, accept_encoding: str = "identity") -> Any:
+    response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    return response
+
+
+def test_gzip_is_negotiated(app: JsonApp) -> None:
+    client = client_for(app)
+    with client.stream(
+        "GET", "/api/items", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert json.loads(gzip.decompress(raw))["path"] == "/api/items"
+
+
+def test_zero_quality_disables_compression(app: JsonApp) -> None:
+    response = fetch(client_for(app), "/api/items", "gzip;q=0")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json()["path"] == "/api/items"
+
+
+def test_small_responses_are_not_compressed(app: JsonApp) -> None:
+    app.size = 0
+    response = fetch(client_for(app), "/api/items", "gzip")
+    assert "content-encoding" not in response.headers
+
+
+def test_encodings_share_one_computation(app: JsonApp) -> None:
+    client = client_for(app)
+    for accept_encoding in ("gzip", "identity", "gzip", "gzip;q=0"):
+        response = fetch(client, "/api/items", accept_encoding)
+        assert response.json()["path"] == "/api/items"
+    assert app.calls == ["/api/items"]
+
+
+def test_admin_and_uncached_requests_are_forwarded(app: JsonApp) -> None:
+    client = client_for(app)
+    fetch(client, "/api/admin/profile")
+    fetch(client, "/api/admin/profile")
+    fetch(client, "/other")
+    fetch(client, "/other")
+    client.get("/api/items", headers={"Cache-Control": "no-cache"})
+    client.get("/api/items", headers={"Cache-Control": "no-cache"})
+    assert app.calls == ["/api/admin/profile"] * 2 + ["/other"] * 2 + ["/api/items"] * 2
+
+
+def test_entries_are_kept_per_version(app: JsonApp) -> None:
+    client = client_for(app)
+    for version in (1, 2, 1, 2, 1):
+        app.version = version
+        assert fetch(client, "/api/items", "gzip").json()["version"] == version
+    assert app.calls == ["/api/items"] * 2
+
+
+def test_least_recently_used_entries_are_evicted(app: JsonApp) -> None:
+    client = client_for(app, cache_max_bytes=3 * app.size)
+    for path in ("/api/a", "/api/b", "/api/a", "/api/c", "/api/a", "/api/b"):
+        fetch(client, path)
+    assert app.calls == ["/api/a", "/api/b", "/api/c", "/api/b"]
+
+
+def test_writes_invalidate_cached_responses(client: TestClient) -> None:
+    specialist_id = client.get("/api/specialists/").json()[0]["id"]
+    path = f"/api/specialists/{specialist_id}"
+    headers = {"Accept-Encoding": "gzip"}
+    before = client.get(path, headers=headers).json()
+    assert client.get(path, headers=headers).json() == before
+
+    response = client.patch(path, json={"full_name": "Renamed Specialist"})
+    assert response.status_code == 200
+    for accept_encoding in ("gzip", "identity"):
+        after = client.get(path, headers={"Accept-Encoding": accept_encoding}).json()
+        assert after["full_name"] == "Renamed Specialist"
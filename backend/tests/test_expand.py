@@ -0,0 +1,103 @@
+"""Tests for the expand parameter and the batch lookup endpoints."""
+
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from feptm.api.v1.batch import MAX_BATCH_SIZE
+from feptm.services.data_service import data_service
+
+
+def entries(client: TestClient, expand: str) -> List[Dict[str, Any]]:
+    response = client.get("/api/timesheets/time-entries", params={"expand": expand})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize(
+    "expand, present, absent",
+    [
+        ("specialist", {"specialist"}, {"project"}),
+        ("project", {"project"}, {"specialist"}),
+        ("specialist,project", {"specialist", "project"}, set()),
+        ("", set(), {"specialist", "project"}),
+    ],
+)
+def test_only_requested_relations_are_serialized(
+    client: TestClient, expand: str, present: set, absent: set
+) -> None:
+    for entry in entries(client, expand):
+        assert present <= entry.keys()
+        assert not absent & entry.keys()
+        for relation in present:
+            assert entry[relation]["id"] == entry[f"{relation}_id"]
+
+
+def test_dangling_reference_is_serialized_as_null(
+    client: TestClient, monkeypatch: Any
+) -> None:
+    get_by_ids = data_service.get_by_ids
+    missing = entries(client, "")[0]["specialist_id"]
+
+    def without_missing(data_type: str, ids: List[str]) -> Dict[str, Any]:
+        return get_by_ids(data_type, [i for i in ids if i != missing])
+
+    monkeypatch.setattr(data_service, "get_by_ids", without_missing)
+    for entry in entries(client, "specialist"):
+        if entry["specialist_id"] == missing:
+            assert entry["specialist"] is None
+        else:
+            assert entry["specialist"]["id"] == entry["specialist_id"]
+        assert "project" not in entry
+
+
+def test_projects_expand_specialists(client: TestClient) -> None:
+    plain = client.get("/api/projects/").json()
+    expanded = client.get("/api/projects/", params={"expand": "specialists"}).json()
+    assert all("specialists" not in project for project in plain)
+    for project in expanded:
+        ids = [specialist["id"] for specialist in project["specialists"]]
+        assert ids == project["specialist_ids"]
+
+
+def test_unsupported_relation_is_rejected(client: TestClient) -> None:
+    response = client.get("/api/timesheets/time-entries", params={"expand": "period"})
+    assert response.status_code == 400
+
+
+def test_batch_get_keeps_order_and_reports_unknown_ids(client: TestClient) -> None:
+    ids = [s["id"] for s in client.get("/api/specialists/").json()][:3]
+    requested = [ids[2], "unknown-1", ids[0], ids[2], "unknown-1", ids[1]]
+    response = client.post("/api/specialists:batchGet", json={"ids": requested})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [ids[2], ids[0], ids[1]]
+    assert body["not_found"] == ["unknown-1"]
+
+
+def test_batch_get_projects_expands_specialists(client: TestClient) -> None:
+    ids = [p["id"] for p in client.get("/api/projects/").json()][:2]
+    plain = client.post("/api/projects:batchGet", json={"ids": ids[::-1]}).json()
+    expanded = client.post(
+        "/api/projects:batchGet",
+        params={"expand": "specialists"},
+        json={"ids": ids[::-1]},
+    ).json()
+    assert [item["id"] for item in expanded["items"]] == ids[::-1]
+    assert all("specialists" not in item for item in plain["items"])
+    assert all("specialists" in item for item in expanded["items"])
+
+
+@pytest.mark.parametrize("size", [0, MAX_BATCH_SIZE + 1])
+def test_batch_get_size_limits(client: TestClient, size: int) -> None:
+    ids = [f"unknown-{i}" for i in range(size)]
+    response = client.post("/api/specialists:batchGet", json={"ids": ids})
+    assert response.status_code == 422
+
+
+def test_batch_get_accepts_the_maximum_size(client: TestClient) -> None:
+    ids = [f"unknown-{i}" for i in range(MAX_BATCH_SIZE)]
+    response = client.post("/api/specialists:batchGet", json={"ids": ids})
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "not_found": ids}
@@ -0,0 +1,161 @@
+"""Tests for the Arrow and Parquet exports, run against both data services."""
+
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from feptm.services.export import ARROW_STREAM_MEDIA_TYPE, EXPORT_TABLES, ArrowExporter
+
+ipc = pytest.importorskip("pyarrow.ipc")
+pq = pytest.importorskip("pyarrow.parquet")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+def normalize(value: Any) -> Any:
+    """Convert a model value to what the export holds."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    return value
+
+
+def expected_rows(service: Any, table: str) -> List[Dict[str, Any]]:
+    """Build the rows an export of a table should contain from the models."""
+    if table == "time_entries":
+        items = [
+            (entry, {"period_id": period.id})
+            for period in service.get_payment_periods()
+            for entry in period.time_entries
+        ]
+    elif table == "payment_periods":
+        items = [
+            (period, {"entry_count": len(period.time_entries)})
+            for period in service.get_payment_periods()
+        ]
+    else:
+        getter = {
+            "specialists": service.get_specialists,
+            "projects": service.get_projects,
+        }[table]
+        items = [(item, {}) for item in getter()]
+
+    names = ArrowExporter(service).schema(table).names
+    rows = []
+    for item, extra in items:
+        values = {name: getattr(item, name, None) for name in names}
+        values.update(extra)
+        rows.append({name: normalize(value) for name, value in values.items()})
+    return rows
+
+
+def read_stream(exporter: ArrowExporter, table: str, **kwargs: Any) -> Any:
+    return ipc.open_stream(b"".join(exporter.stream(table, **kwargs)))
+
+
+@pytest.mark.parametrize("table", EXPORT_TABLES)
+def test_stream_round_trips_each_table(service: Any, table: str) -> None:
+    exporter = ArrowExporter(service, batch_rows=7)
+    reader = read_stream(exporter, table)
+    assert reader.schema == exporter.schema(table)
+    assert reader.read_all().to_pylist() == expected_rows(service, table)
+
+
+def test_stream_of_one_period(service: Any) -> None:
+    period = max(service.get_payment_periods(), key=lambda p: len(p.time_entries))
+    exporter = ArrowExporter(service, batch_rows=7)
+    rows = read_stream(exporter, "time_entries", period_id=period.id).read_all()
+    assert rows.to_pylist() == [
+        row
+        for row in expected_rows(service, "time_entries")
+        if row["period_id"] == period.id
+    ]
+    with pytest.raises(ValueError):
+        list(exporter.stream("specialists", period_id=period.id))
+
+
+def test_dictionaries_are_sent_as_deltas(service: Any) -> None:
+    exporter = ArrowExporter(service, batch_rows=2)
+    reader = read_stream(exporter, "time_entries")
+    batches = list(reader)
+    periods = {p.id for p in service.get_payment_periods() if p.time_entries}
+    assert len(batches) > len(periods) > 1
+
+    previous: List[str] = []
+    for batch in batches:
+        dictionary = batch.column("period_id").dictionary.to_pylist()
+        # Dictionaries only grow, so each one extends the one before
+        assert dictionary[: len(previous)] == previous
+        previous = dictionary
+    assert set(previous) == periods
+    assert reader.stats.num_dictionary_deltas > 0
+    assert reader.stats.num_replaced_dictionaries == 0
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_write_dataset_partitions_time_entries_by_period(
+    service: Any, tmp_path: Path, format: str
+) -> None:
+    # Several batches per period, all written to the period's one file
+    exporter = ArrowExporter(service, batch_rows=2)
+    output_dir = tmp_path / "export"
+    counts = exporter.write_dataset(output_dir, format)
+
+    periods = [p for p in service.get_payment_periods() if p.time_entries]
+    files = {
+        path.relative_to(output_dir).as_posix() for path in output_dir.rglob("*.*")
+    }
+    assert files == {
+        f"specialists.{format}",
+        f"projects.{format}",
+        f"payment_periods.{format}",
+        *(f"time_entries/period_id={p.id}/part-0.{format}" for p in periods),
+    }
+    assert counts == {
+        table: len(expected_rows(service, table)) for table in EXPORT_TABLES
+    }
+
+    dataset = ds.dataset(
+        output_dir / "time_entries",
+        format="parquet" if format == "parquet" else "ipc",
+        partitioning="hive",
+    )
+    rows = dataset.to_table().to_pylist()
+    assert sorted((row["period_id"], row["id"]) for row in rows) == sorted(
+        (row["period_id"], row["id"]) for row in expected_rows(service, "time_entries")
+    )
+    assert "period_id" not in exporter.schema("time_entries", partitioned=True).names
+    if format == "parquet":
+        table = pq.read_table(output_dir / "specialists.parquet")
+    else:
+        table = ipc.open_file(output_dir / "specialists.arrow").read_all()
+    assert table.to_pylist() == expected_rows(service, "specialists")
+
+
+def test_export_endpoint(client: TestClient) -> None:
+    period_id = client.get("/api/periods/").json()[0]["id"]
+    response = client.get("/api/export/time_entries", params={"period_id": period_id})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+    rows = ipc.open_stream(response.content).read_all().to_pylist()
+    assert rows and {row["period_id"] for row in rows} == {period_id}
+
+
+@pytest.mark.parametrize(
+    "path, params, status",
+    [
+        ("/api/export/invoices", {}, 404),
+        ("/api/export/time_entries", {"period_id": "unknown-period"}, 404),
+        ("/api/export/specialists", {"period_id": "any-period"}, 400),
+    ],
+)
+def test_export_endpoint_errors(
+    client: TestClient, path: str, params: Dict[str, str], status: int
+) -> None:
+    assert client.get(path, params=params).status_code == status
@@ -0,0 +1,166 @@
+"""Tests for the write-ahead journal and its replay by the JSON data service."""
+
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from feptm.models.payment import PaymentPeriodUpdate, TimeEntryUpdate
+from feptm.services import MockDataService
+from feptm.services import journal as journal_module
+from feptm.services.journal import Journal, JournalError, list_segments
+from tests.conftest import dump_state, entry_like
+
+OpenService = Callable[[], MockDataService]
+
+
+def make_changes(service: MockDataService) -> None:
+    """Apply one change of each kind."""
+    period = service.get_payment_periods()[0]
+    added = service.add_time_entry(period.id, entry_like(service, period.id, hours=2.5))
+    service.update_time_entry(added.id, TimeEntryUpdate(hours=4.0))
+    service.delete_time_entry(period.time_entries[0].id)
+    service.update_payment_period(period.id, PaymentPeriodUpdate(name="Checked"))
+
+
+def failing_fsync(failures: int) -> Callable[[int], None]:
+    """Build an fsync that fails the given number of times before syncing again."""
+    real_fsync = os.fsync
+    calls = {"count": 0}
+
+    def fsync(fd: int) -> None:
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise OSError(5, "Input/output error")
+        real_fsync(fd)
+
+    return fsync
+
+
+def test_replay_equals_live_state(open_service: OpenService) -> None:
+    service = open_service()
+    make_changes(service)
+    live = dump_state(service)
+    service.close()
+
+    assert dump_state(open_service()) == live
+
+
+def test_torn_tail_is_truncated(open_service: OpenService, journal_dir: Path) -> None:
+    service = open_service()
+    make_changes(service)
+    live = dump_state(service)
+    service.close()
+    _, segment = list_segments(journal_dir)[-1]
+    size = segment.stat().st_size
+    with open(segment, "ab") as f:
+        f.write(b'0badc0de {"seq": 99, "op": "entry.del')
+
+    reopened = open_service()
+    assert dump_state(reopened) == live
+    assert segment.stat().st_size == size
+
+    # Records appended after the repaired tail replay as well
+    make_changes(reopened)
+    live = dump_state(reopened)
+    reopened.close()
+    assert dump_state(open_service()) == live
+
+
+def test_corrupt_record_before_the_last_segment_is_an_error(journal_dir: Path) -> None:
+    journal = Journal(journal_dir, commit_delay=0)
+    journal.wait(journal.submit("entry.delete", {"id": "a"}, "2024-01-01T00:00:00"))
+    journal.rotate()
+    journal.wait(journal.submit("entry.delete", {"id": "b"}, "2024-01-01T00:00:00"))
+    journal.close()
+    _, first = list_segments(journal_dir)[0]
+    first.write_bytes(first.read_bytes().replace(b'"a"', b'"x"'))
+
+    with pytest.raises(JournalError):
+        Journal(journal_dir)
+
+
+def test_compaction_then_replay_equals_live_state(
+    open_service: OpenService, journal_dir: Path
+) -> None:
+    service = open_service()
+    make_changes(service)
+    result = service.compact()
+    make_changes(service)
+    live = dump_state(service)
+    service.close()
+
+    assert result["seq"] == 4
+    assert (journal_dir / result["snapshot"]).is_dir()
+    # Segments covered by the snapshot are dropped
+    assert [first for first, _ in list_segments(journal_dir)] == [5]
+    assert dump_state(open_service()) == live
+
+
+def test_failed_commit_is_not_visible(
+    open_service: OpenService, monkeypatch: Any
+) -> None:
+    service = open_service()
+    period = service.get_payment_periods()[0]
+    service.add_time_entry(period.id, entry_like(service, period.id))
+    before = dump_state(service)
+    version = service.data_version
+
+    monkeypatch.setattr(journal_module.os, "fsync", failing_fsync(1))
+    with pytest.raises(JournalError):
+        service.add_time_entry(period.id, entry_like(service, period.id, hours=3.0))
+    monkeypatch.undo()
+
+    assert service.data_version == version
+    assert dump_state(service) == before
+
+    # The journal recovers, and the failed change is not replayed
+    added = service.add_time_entry(period.id, entry_like(service, period.id, hours=5.0))
+    assert service.get_payment_period(period.id).time_entries[-1].id == added.id
+    live = dump_state(service)
+    assert (
+        len(live["payment_periods"][0]["time_entries"])
+        == len(before["payment_periods"][0]["time_entries"]) + 1
+    )
+    service.close()
+    assert dump_state(open_service()) == live
+
+
+def test_unrepairable_journal_rejects_writes(
+    open_service: OpenService, monkeypatch: Any
+) -> None:
+    service = open_service()
+    period = service.get_payment_periods()[0]
+    before = dump_state(service)
+
+    # The commit and the truncation repairing the segment both fail
+    monkeypatch.setattr(journal_module.os, "fsync", failing_fsync(2))
+    with pytest.raises(JournalError):
+        service.add_time_entry(period.id, entry_like(service, period.id))
+    monkeypatch.undo()
+
+    with pytest.raises(JournalError):
+        service.add_time_entry(period.id, entry_like(service, period.id))
+    assert dump_state(service) == before
+
+
+def test_stale_epoch_is_rejected(journal_dir: Path, monkeypatch: Any) -> None:
+    journal = Journal(journal_dir, commit_delay=0)
+    epoch = journal.epoch
+    monkeypatch.setattr(journal_module.os, "fsync", failing_fsync(1))
+    seq = journal.submit("entry.delete", {"id": "a"}, "2024-01-01T00:00:00", epoch)
+    with pytest.raises(JournalError):
+        journal.wait(seq)
+    monkeypatch.undo()
+
+    with pytest.raises(JournalError):
+        journal.submit("entry.delete", {"id": "b"}, "2024-01-01T00:00:00", epoch)
+    journal.wait(
+        journal.submit(
+            "entry.delete", {"id": "c"}, "2024-01-01T00:00:00", journal.epoch
+        )
+    )
+    journal.close()
+
+    assert [record.data["id"] for record in Journal(journal_dir).records()] == ["c"]
@@ -0,0 +1,122 @@
+"""Tests for the request metrics and their Prometheus text exposition."""
+
+import re
+from typing import Dict, List, Tuple
+
+from fastapi.testclient import TestClient
+
+from feptm.api.middleware.metrics import UNMATCHED_ROUTE
+from feptm.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry
+
+SAMPLE = re.compile(
+    r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]+="(?:[^"\\]|\\.)*",?)*\})? (\S+)$'
+)
+LABEL = re.compile(r'([a-zA-Z_]+)="((?:[^"\\]|\\.)*)"')
+
+Samples = Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]
+
+
+def parse(text: str) -> Samples:
+    """Parse a text exposition into sample values by name and labels.
+
+    Also checks that every sample follows the HELP and TYPE lines of its
+    metric.
+    """
+    samples: Samples = {}
+    typed: List[str] = []
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            typed.append(line.split()[2])
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"Invalid sample line: {line}"
+        name, labels, value = match.groups()
+        assert name.startswith(typed[-1])
+        samples[(name, tuple(LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+def scrape(client: TestClient) -> Samples:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    return parse(response.text)
+
+
+def requests(samples: Samples, route: str, status: str) -> float:
+    labels = (("method", "GET"), ("route", route), ("status", status))
+    return samples.get(("feptm_http_requests_total", labels), 0)
+
+
+def buckets(samples: Samples, name: str, route: str) -> List[Tuple[str, float]]:
+    return [
+        (dict(labels)["le"], value)
+        for (sample, labels), value in samples.items()
+        if sample == f"{name}_bucket" and dict(labels)["route"] == route
+    ]
+
+
+def test_requests_are_counted_by_route_template(client: TestClient) -> None:
+    specialist_id = client.get("/api/specialists/").json()[0]["id"]
+    route = "/api/specialists/{specialist_id}"
+    before = scrape(client)
+
+    client.get(f"/api/specialists/{specialist_id}")
+    client.get("/api/specialists/unknown-specialist")
+    client.get("/no/such/path")
+    client.get("/another/unknown/path")
+    after = scrape(client)
+
+    for route_, status, count in (
+        (route, "200", 1),
+        (route, "404", 1),
+        (UNMATCHED_ROUTE, "404", 2),
+    ):
+        counted = requests(after, route_, status) - requests(before, route_, status)
+        assert counted == count
+    # Concrete paths never become labels
+    assert not any(
+        specialist_id in value or "unknown" in value
+        for _, labels in after
+        for _, value in labels
+    )
+
+
+def test_histogram_buckets_are_cumulative(client: TestClient) -> None:
+    for _ in range(3):
+        client.get("/api/projects/")
+    samples = scrape(client)
+    route = "/api/projects/"
+
+    for name in (
+        "feptm_http_request_duration_seconds",
+        "feptm_http_response_size_bytes",
+    ):
+        counts = buckets(samples, name, route)
+        assert counts[-1][0] == "+Inf"
+        bounds = [float(le) for le, _ in counts[:-1]]
+        assert bounds == sorted(bounds)
+        values = [value for _, value in counts]
+        assert values == sorted(values)
+        labels = (("method", "GET"), ("route", route))
+        assert samples[(f"{name}_count", labels)] == values[-1] >= 3
+        assert samples[(f"{name}_sum", labels)] > 0
+
+
+def test_label_values_are_escaped() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("test_events", "Events", ("name",))
+    counter.labels('quote " backslash \\ newline \n end').inc()
+    counter.labels("plain").inc(2)
+
+    text = registry.render()
+    assert text.splitlines() == [
+        "# HELP test_events Events",
+        "# TYPE test_events counter",
+        'test_events_total{name="quote \\" backslash \\\\ newline \\n end"} 1',
+        'test_events_total{name="plain"} 2',
+    ]
+    escaped = 'quote \\" backslash \\\\ newline \\n end'
+    assert parse(text)[("test_events_total", (("name", escaped),))] == 1
@@ -0,0 +1,126 @@
+"""Tests for the mutation methods shared by the data services."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from feptm.models.payment import (
+    PaymentPeriodCreate,
+    PaymentPeriodUpdate,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from feptm.models.specialist import SpecialistUpdate
+from tests.conftest import dump_state, entry_like
+
+
+def test_null_clears_nullable_fields(service: Any) -> None:
+    specialist = service.get_specialists()[0]
+    service.update_specialist(
+        specialist.id, SpecialistUpdate(leave_date=datetime(2030, 1, 1))
+    )
+    assert service.get_specialist(specialist.id).leave_date is not None
+
+    updated = service.update_specialist(
+        specialist.id, SpecialistUpdate(leave_date=None)
+    )
+    assert updated.leave_date is None
+    assert service.get_specialist(specialist.id).leave_date is None
+
+    period = service.create_payment_period(
+        PaymentPeriodCreate(
+            start_date=datetime(2024, 1, 1),
+            end_date=datetime(2024, 1, 31),
+            report_id="report",
+        )
+    )
+    assert (
+        service.update_payment_period(
+            period.id, PaymentPeriodUpdate(report_id=None)
+        ).report_id
+        is None
+    )
+    assert service.get_payment_period(period.id).report_id is None
+
+
+def test_unset_fields_are_kept(service: Any) -> None:
+    specialist = service.get_specialists()[0]
+    service.update_specialist(
+        specialist.id, SpecialistUpdate(leave_date=datetime(2030, 1, 1))
+    )
+    updated = service.update_specialist(
+        specialist.id, SpecialistUpdate(hourly_rate=99.0)
+    )
+    assert updated.hourly_rate == 99.0
+    assert updated.leave_date is not None
+
+
+def test_null_is_rejected_for_required_fields() -> None:
+    with pytest.raises(ValidationError):
+        SpecialistUpdate(full_name=None)
+    with pytest.raises(ValidationError):
+        TimeEntryUpdate.model_validate({"hours": None})
+    with pytest.raises(ValidationError):
+        PaymentPeriodUpdate(start_date=None)
+
+
+def test_generated_period_name_follows_the_dates(service: Any) -> None:
+    period = service.create_payment_period(
+        PaymentPeriodCreate(
+            start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31)
+        )
+    )
+    assert period.name == "Jan 2024"
+
+    updated = service.update_payment_period(
+        period.id, PaymentPeriodUpdate(end_date=datetime(2024, 2, 29))
+    )
+    assert updated.name == "Jan - Feb 2024"
+
+    service.update_payment_period(period.id, PaymentPeriodUpdate(name="Winter"))
+    updated = service.update_payment_period(
+        period.id, PaymentPeriodUpdate(end_date=datetime(2024, 3, 31))
+    )
+    assert updated.name == "Winter"
+
+    # Clearing the name generates it again
+    assert (
+        service.update_payment_period(period.id, PaymentPeriodUpdate(name=None)).name
+        == "Jan - Mar 2024"
+    )
+
+
+def test_cleared_fields_are_replayed(open_service: Any) -> None:
+    service = open_service()
+    specialist = service.get_specialists()[0]
+    service.update_specialist(
+        specialist.id, SpecialistUpdate(leave_date=datetime(2030, 1, 1))
+    )
+    service.update_specialist(specialist.id, SpecialistUpdate(leave_date=None))
+    live = dump_state(service)
+    service.close()
+
+    assert dump_state(open_service()) == live
+
+
+def test_naive_datetimes_are_stored_as_utc(service: Any) -> None:
+    period = service.get_payment_periods()[0]
+    entry = entry_like(service, period.id)
+    naive = entry.date.replace(tzinfo=None)
+    added = service.add_time_entry(
+        period.id, TimeEntryCreate(**{**entry.model_dump(), "date": naive})
+    )
+    assert added.date == naive.replace(tzinfo=timezone.utc)
+
+    after = naive.replace(tzinfo=timezone.utc) - timedelta(days=1)
+    entries = service.get_filtered_data(
+        "time_entries", {"date__gte": after, "order_by": "date"}
+    )
+    assert added.id in [e.id for e in entries]
+    assert [e.date for e in entries] == sorted(e.date for e in entries)
+
+    updated = service.update_time_entry(added.id, TimeEntryUpdate(date=naive))
+    assert updated.date.tzinfo is not None
+    service.get_filtered_data("time_entries", {"order_by": "-date"})
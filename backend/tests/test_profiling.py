@@ -0,0 +1,74 @@
+"""Tests for request profiling across worker threads."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from feptm.api.middleware.profiling import ProfilingMiddleware
+from feptm.core.config import settings
+from feptm.services.reports import ReportService
+
+API_KEY = "test-key"
+
+
+def busy(seconds: float) -> None:
+    """Keep the current thread on the CPU."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SlowReports:
+    """Data service whose reports take a while to compute."""
+
+    data_version = 1
+
+    def get_specialist_report_data(
+        self, period_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        busy(0.1)
+        return []
+
+
+def profile(app: Any, monkeypatch: Any) -> str:
+    """Send a profiled GET request to an ASGI app and return the collapsed profile."""
+    monkeypatch.setattr(settings, "API_KEY", API_KEY)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"x-profile", b"collapsed"), (b"x-api-key", API_KEY.encode())],
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    asyncio.run(ProfilingMiddleware(app)(scope, receive, send))
+    assert messages[0]["status"] == 200
+    return b"".join(m.get("body", b"") for m in messages[1:]).decode()
+
+
+def test_report_worker_thread_is_sampled(monkeypatch: Any) -> None:
+    reports = ReportService(SlowReports(), max_entries=0)
+
+    async def app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        await reports.get("specialists")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"[]"})
+
+    collapsed = profile(app, monkeypatch)
+    assert "ReportService._compute" in collapsed
+    assert "SlowReports.get_specialist_report_data" in collapsed
+
+
+def test_threads_outside_profiled_thread_are_not_sampled(monkeypatch: Any) -> None:
+    async def app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        await asyncio.to_thread(busy, 0.1)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    assert "busy" not in profile(app, monkeypatch)
@@ -0,0 +1,279 @@
+"""Tests for the propagation of specialist changes to linked timesheets."""
+
+import contextvars
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, List
+
+import pytest
+
+from feptm.models.payment import (
+    PaymentPeriodCreate,
+    PaymentPeriodUpdate,
+    PaymentStatus,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from feptm.models.specialist import SpecialistUpdate
+from feptm.services.propagation import (
+    FIRST_ROW,
+    SPECIALISTS_SHEET,
+    CellUpdate,
+    DependencyIndex,
+    PropagationService,
+    SheetsDispatcher,
+    merge_ranges,
+    plan_specialist_change,
+)
+from feptm.services.sheets import FakeSheetsClient, ValueRange
+from tests.conftest import entry_like
+
+
+class FailingSheetsClient:
+    """Client failing every request."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def batch_update_values(self, spreadsheet_id: str, data: List[ValueRange]) -> None:
+        self.calls += 1
+        raise RuntimeError("Sheets API unavailable")
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Wait until a condition holds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+def assert_index_current(propagation: PropagationService, service: Any) -> None:
+    """Check that the maintained index equals one built from the data."""
+    index = propagation.index()
+    built = DependencyIndex.build(service)
+    assert index.sheets == built.sheets
+    assert index.entry_counts == built.entry_counts
+    assert index.open_tabs == built.open_tabs
+
+
+def test_index_follows_mutations(service: Any) -> None:
+    propagation = PropagationService(
+        service, SheetsDispatcher(FakeSheetsClient, delay=0)
+    )
+    index = propagation.index()
+    project = next(p for p in service.get_projects() if p.timesheet_id)
+    other_project = next(p for p in service.get_projects() if p.id != project.id)
+    specialist_id = project.specialist_ids[0]
+
+    period = service.create_payment_period(
+        PaymentPeriodCreate(
+            start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31)
+        )
+    )
+    assert_index_current(propagation, service)
+
+    def add(specialist: str, project_id: str) -> str:
+        data = TimeEntryCreate(
+            specialist_id=specialist,
+            project_id=project_id,
+            date=datetime(2024, 1, 10),
+            hours=2.0,
+            description="Work",
+        )
+        return service.add_time_entry(period.id, data).id
+
+    first = add(specialist_id, project.id)
+    second = add(specialist_id, project.id)
+    assert_index_current(propagation, service)
+    assert propagation.index().period_tabs(specialist_id, project.id) == [period.name]
+
+    service.update_time_entry(second, TimeEntryUpdate(project_id=other_project.id))
+    service.delete_time_entry(first)
+    assert_index_current(propagation, service)
+    assert propagation.index().period_tabs(specialist_id, project.id) == []
+
+    service.update_payment_period(period.id, PaymentPeriodUpdate(name="January"))
+    assert propagation.index().period_tabs(specialist_id, other_project.id) == [
+        "January"
+    ]
+    service.update_payment_period(
+        period.id, PaymentPeriodUpdate(status=PaymentStatus.APPROVED)
+    )
+    assert_index_current(propagation, service)
+    assert propagation.index().period_tabs(specialist_id, other_project.id) == []
+
+    # The records were applied to the index instead of building a new one
+    assert propagation.index() is index
+
+
+def test_index_is_built_again_when_changes_are_unknown(open_service: Any) -> None:
+    service = open_service()
+    propagation = PropagationService(
+        service, SheetsDispatcher(FakeSheetsClient, delay=0)
+    )
+    index = propagation.index()
+    service.reload()
+    assert propagation.index() is not index
+
+
+def test_older_pins_do_not_build_the_index_again(
+    open_service: Any, monkeypatch: Any
+) -> None:
+    service = open_service()
+    propagation = PropagationService(
+        service, SheetsDispatcher(FakeSheetsClient, delay=0)
+    )
+    index = propagation.index()
+    specialist = service.get_specialists()[0]
+    period = service.get_payment_periods()[0]
+
+    def build(data_service: Any) -> DependencyIndex:
+        raise AssertionError("The index was built again")
+
+    monkeypatch.setattr(DependencyIndex, "build", build)
+    with service.pin():
+        pinned = service.data_version
+        service.get_specialists()
+        # Writes from other requests
+        contextvars.Context().run(
+            service.update_specialist,
+            specialist.id,
+            SpecialistUpdate(full_name="Renamed Specialist"),
+        )
+        contextvars.Context().run(
+            service.add_time_entry, period.id, entry_like(service, period.id)
+        )
+        # Another request brings the index up to the latest data
+        assert contextvars.Context().run(propagation.index) is index
+        assert service.data_version == pinned
+        assert propagation.index() is index
+    monkeypatch.undo()
+    assert_index_current(propagation, service)
+
+
+def test_durable_wait_does_not_block_other_updates(open_service: Any) -> None:
+    service = open_service()
+    propagation = PropagationService(
+        service, SheetsDispatcher(FakeSheetsClient, delay=0)
+    )
+    first, second = service.get_specialists()[:2]
+    journal = service._get_journal()
+    wait = journal.wait
+    waiting = threading.Event()
+    durable = threading.Event()
+
+    def slow_wait(seq: int) -> None:
+        if not waiting.is_set():
+            waiting.set()
+            durable.wait(5)
+        wait(seq)
+
+    def update(specialist_id: str, name: str) -> threading.Thread:
+        thread = threading.Thread(
+            target=propagation.update_specialist,
+            args=(specialist_id, SpecialistUpdate(full_name=name)),
+        )
+        thread.start()
+        return thread
+
+    journal.wait = slow_wait
+    slow = update(first.id, "Slow Write")
+    try:
+        assert waiting.wait(5)
+        fast = update(second.id, "Fast Write")
+        fast.join(2)
+        assert not fast.is_alive()
+    finally:
+        durable.set()
+        slow.join()
+    assert service.get_specialist(first.id).full_name == "Slow Write"
+    assert service.get_specialist(second.id).full_name == "Fast Write"
+
+
+def test_ranges_merge_across_single_and_double_letter_columns() -> None:
+    cells = [
+        CellUpdate("sheet", "Tab", 2, column, column)
+        for column in ("AB", "Y", "AA", "Z", "AD")
+    ]
+    assert merge_ranges(cells) == [
+        ("'Tab'!Y2:AB2", [["Y", "Z", "AA", "AB"]]),
+        ("'Tab'!AD2", [["AD"]]),
+    ]
+
+
+def test_invalid_columns_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        merge_ranges([CellUpdate("sheet", "Tab", 2, "a", 1)])
+
+
+def test_plan_touches_the_rows_of_the_specialist(open_service: Any) -> None:
+    service = open_service()
+    project = next(p for p in service.get_projects() if p.timesheet_id)
+    position = 1
+    specialist = service.get_specialist(project.specialist_ids[position])
+    period = service.create_payment_period(
+        PaymentPeriodCreate(
+            start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31)
+        )
+    )
+    service.add_time_entry(
+        period.id,
+        TimeEntryCreate(
+            specialist_id=specialist.id,
+            project_id=project.id,
+            date=datetime(2024, 1, 10),
+            hours=2.0,
+            description="Work",
+        ),
+    )
+    index = DependencyIndex.build(service)
+    after = specialist.model_copy(
+        update={"hourly_rate": specialist.hourly_rate + 10, "email": "new@example.com"}
+    )
+
+    updates = plan_specialist_change(index, specialist, after)
+
+    row = FIRST_ROW + position
+    ours = {
+        (u.sheet, u.row, u.column, u.value)
+        for u in updates
+        if u.spreadsheet_id == project.timesheet_id
+    }
+    assert ours == {
+        (SPECIALISTS_SHEET, row, "B", "new@example.com"),
+        (SPECIALISTS_SHEET, row, "D", after.hourly_rate),
+        # Period tabs do not show the email
+        (period.name, row, "D", after.hourly_rate),
+    }
+    # Every planned cell is in the specialist's row of a linked timesheet
+    links = {(link.spreadsheet_id, link.row) for link in index.sheets[specialist.id]}
+    assert {(u.spreadsheet_id, u.row) for u in updates} == links
+    assert plan_specialist_change(index, specialist, specialist) == []
+
+
+def test_dispatcher_coalesces_updates_of_a_cell() -> None:
+    client = FakeSheetsClient()
+    dispatcher = SheetsDispatcher(lambda: client, delay=0.2)
+    dispatcher.submit([CellUpdate("sheet", "Tab", 2, "D", 10)])
+    dispatcher.submit(
+        [
+            CellUpdate("sheet", "Tab", 2, "D", 20),
+            CellUpdate("sheet", "Tab", 2, "C", "QA"),
+        ]
+    )
+    dispatcher.close()
+
+    assert client.requests == [("sheet", [("'Tab'!C2:D2", [["QA", 20]])])]
+    assert dispatcher.pending == 0
+
+
+def test_dispatcher_drops_updates_after_the_last_attempt() -> None:
+    client = FailingSheetsClient()
+    dispatcher = SheetsDispatcher(lambda: client, delay=0.01, max_attempts=3)
+    dispatcher.submit([CellUpdate("sheet", "Tab", 2, "D", 10)])
+
+    wait_for(lambda: client.calls == 3 and dispatcher.pending == 0)
+    dispatcher.close()
+    assert client.calls == 3
@@ -0,0 +1,71 @@
+"""Tests for filters on nullable fields, run against both data services."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from feptm.services.query import run_query
+
+LEAVE_DATE = datetime(2023, 6, 30, tzinfo=timezone.utc)
+END_DATE = datetime(2023, 12, 31, tzinfo=timezone.utc)
+
+# Filters whose values or fields hold None
+NULL_FILTERS = [
+    ("specialists", {"leave_date": None}),
+    ("specialists", {"leave_date__ne": None}),
+    ("specialists", {"leave_date__ne": LEAVE_DATE}),
+    ("specialists", {"leave_date__in": [None, LEAVE_DATE]}),
+    ("specialists", {"leave_date__gte": LEAVE_DATE}),
+    ("specialists", {"leave_date__lt": LEAVE_DATE}),
+    ("projects", {"end_date": None}),
+    ("projects", {"end_date__ne": END_DATE}),
+    ("projects", {"end_date__in": [None]}),
+    ("projects", {"end_date__in": [END_DATE]}),
+    ("projects", {"end_date": None, "order_by": "-end_date"}),
+]
+
+
+def ids(items: List[Any]) -> List[str]:
+    return [item.id for item in items]
+
+
+@pytest.mark.parametrize("collection, filters", NULL_FILTERS)
+def test_null_filters_match_a_scan(
+    service: Any, collection: str, filters: Dict[str, Any]
+) -> None:
+    items = service.get_filtered_data(collection)
+    expected = ids(run_query(collection, items, filters))
+    assert ids(service.get_filtered_data(collection, filters)) == expected
+
+
+def test_null_filters_select_null_fields(service: Any) -> None:
+    specialists = service.get_filtered_data("specialists")
+    unset = ids(service.get_filtered_data("specialists", {"leave_date": None}))
+    assert unset == [s.id for s in specialists if s.leave_date is None]
+    assert unset and len(unset) < len(specialists)
+    # NULL differs from a value, so 'ne' keeps the NULL rows
+    others = ids(
+        service.get_filtered_data("specialists", {"leave_date__ne": LEAVE_DATE})
+    )
+    assert set(unset) <= set(others)
+
+
+def test_range_filter_rejects_none(service: Any) -> None:
+    with pytest.raises(ValueError):
+        service.get_filtered_data("specialists", {"leave_date__gt": None})
+
+
+@pytest.mark.parametrize("value", [None, "senior", 3, LEAVE_DATE])
+def test_in_filter_rejects_non_collections(service: Any, value: Any) -> None:
+    with pytest.raises(ValueError):
+        service.get_filtered_data("specialists", {"role__in": value})
+
+
+def test_in_filter_accepts_collections(service: Any) -> None:
+    specialists = service.get_filtered_data("specialists")
+    role = specialists[0].role
+    expected = [s.id for s in specialists if s.role == role]
+    for value in ([role], (role,), {role}, frozenset({role.value})):
+        found = service.get_filtered_data("specialists", {"role__in": value})
+        assert ids(found) == expected
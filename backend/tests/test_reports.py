@@ -0,0 +1,137 @@
+"""Tests for the memoized and coalesced report computations."""
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+from feptm.services.reports import ReportService
+from tests.conftest import entry_like
+
+
+class CountingReports:
+    """Data service counting its report computations.
+
+    A computation waits for the gate to open, so tests can start several
+    requests while it is running.
+    """
+
+    def __init__(self) -> None:
+        self.data_version = 1
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.error: Optional[Exception] = None
+
+    def get_specialist_report_data(
+        self, period_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        self.calls += 1
+        assert self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return [{"version": self.data_version, "period_id": period_id}]
+
+
+@pytest.fixture
+def reports() -> CountingReports:
+    return CountingReports()
+
+
+def run(coroutine_function: Callable[[], Any]) -> Any:
+    return asyncio.run(coroutine_function())
+
+
+async def started() -> None:
+    """Let the created tasks run until they wait for the computation."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_reports_are_cached_within_a_data_version(reports: CountingReports) -> None:
+    service = ReportService(reports, max_entries=8)
+
+    async def main() -> None:
+        first = await service.get("specialists")
+        assert await service.get("specialists") is first
+        other = await service.get("specialists", "period-1")
+        assert other == [{"version": 1, "period_id": "period-1"}]
+
+    run(main)
+    assert reports.calls == 2
+    assert len(service) == 2
+
+
+def test_reports_are_computed_again_after_a_write(open_service: Any) -> None:
+    data = open_service()
+    service = ReportService(data, max_entries=8)
+
+    async def main() -> None:
+        before = await service.get("specialists")
+        period = data.get_payment_periods()[0]
+        entry = entry_like(data, period.id, hours=10.0)
+        assert data.add_time_entry(period.id, entry) is not None
+        after = await service.get("specialists")
+        assert after is not before
+        total = sum(row["total_hours"] for row in before)
+        assert sum(row["total_hours"] for row in after) == pytest.approx(total + 10)
+        assert await service.get("specialists") is after
+
+    run(main)
+
+
+def test_concurrent_requests_compute_once(reports: CountingReports) -> None:
+    service = ReportService(reports, max_entries=8)
+    reports.gate.clear()
+
+    async def main() -> List[Any]:
+        tasks = [asyncio.create_task(service.get("specialists")) for _ in range(10)]
+        await started()
+        reports.gate.set()
+        return await asyncio.gather(*tasks)
+
+    results = run(main)
+    assert reports.calls == 1
+    assert all(rows is results[0] for rows in results)
+
+
+def test_cancelled_request_keeps_the_computation(reports: CountingReports) -> None:
+    service = ReportService(reports, max_entries=8)
+    reports.gate.clear()
+
+    async def main() -> None:
+        cancelled = asyncio.create_task(service.get("specialists"))
+        waiting = asyncio.create_task(service.get("specialists"))
+        await started()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        reports.gate.set()
+        rows = await waiting
+        assert await service.get("specialists") is rows
+
+    run(main)
+    assert reports.calls == 1
+
+
+def test_errors_reach_all_waiters_and_are_not_cached(
+    reports: CountingReports,
+) -> None:
+    service = ReportService(reports, max_entries=8)
+    reports.gate.clear()
+    reports.error = RuntimeError("report failed")
+
+    async def main() -> None:
+        tasks = [asyncio.create_task(service.get("specialists")) for _ in range(3)]
+        await started()
+        reports.gate.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(service) == 0
+
+        reports.error = None
+        assert await service.get("specialists") == [{"version": 1, "period_id": None}]
+
+    run(main)
+    assert reports.calls == 2
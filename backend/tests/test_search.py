@@ -0,0 +1,150 @@
+"""Tests for the full-text search service."""
+
+import asyncio
+import contextvars
+from typing import Any, Callable, Set
+
+from feptm.core.text import analyze
+from feptm.models.payment import TimeEntryUpdate
+from feptm.services import MockDataService
+from feptm.services import search as search_module
+from feptm.services.search import InvertedIndex, SearchService
+from tests.conftest import entry_like
+
+OpenService = Callable[[], MockDataService]
+
+
+def test_scores_are_normalized_per_scope(open_service: OpenService) -> None:
+    search = SearchService(open_service())
+    total, results = asyncio.run(search.search("платежных систем"))
+
+    scopes = {name for name, _, _ in results}
+    assert scopes == {"entries", "projects"}
+    assert total == len(results)
+    for name in scopes:
+        assert max(score for scope, score, _ in results if scope == name) == 1.0
+    assert [score for _, score, _ in results] == sorted(
+        (score for _, score, _ in results), reverse=True
+    )
+
+
+def test_writes_are_applied_without_rebuilding(
+    open_service: OpenService, monkeypatch: Any
+) -> None:
+    service = open_service()
+    search = SearchService(service)
+    period = service.get_payment_periods()[0]
+    entry = period.time_entries[0]
+
+    async def run() -> None:
+        assert (await search.search("zeppelin"))[0] == 0
+        builds = []
+        monkeypatch.setattr(search, "build_indexes", lambda: builds.append(1))
+
+        added = service.add_time_entry(
+            period.id, entry_like(service, period.id, description="Zeppelin page")
+        )
+        total, results = await search.search("zeppelin")
+        assert total == 1 and results[0][2].id == added.id
+
+        service.update_time_entry(added.id, TimeEntryUpdate(description="Airship"))
+        assert (await search.search("zeppelin"))[0] == 0
+        assert (await search.search("airship"))[1][0][2].description == "Airship"
+
+        service.delete_time_entry(added.id)
+        service.delete_time_entry(entry.id)
+        assert (await search.search("airship"))[0] == 0
+        assert entry.id not in [
+            item.id for _, _, item in (await search.search(entry.description))[1]
+        ]
+        assert builds == [] and search._rebuild is None
+
+    asyncio.run(run())
+
+
+def test_unknown_changes_are_rebuilt_in_the_background(
+    open_service: OpenService, monkeypatch: Any
+) -> None:
+    service = open_service()
+    search = SearchService(service)
+    period = service.get_payment_periods()[0]
+
+    async def run() -> None:
+        assert (await search.search("zeppelin"))[0] == 0
+        monkeypatch.setattr(service, "get_changes", lambda since, until: None)
+        service.add_time_entry(
+            period.id, entry_like(service, period.id, description="Zeppelin page")
+        )
+        # The previous indexes answer while the rebuild runs in a worker thread
+        assert (await search.search("zeppelin"))[0] == 0
+        rebuild = search._rebuild
+        assert rebuild is not None
+        await rebuild
+        assert (await search.search("zeppelin"))[0] == 1
+
+    asyncio.run(run())
+
+
+def test_older_pins_do_not_rebuild(open_service: OpenService) -> None:
+    service = open_service()
+    search = SearchService(service)
+    period = service.get_payment_periods()[0]
+
+    async def run() -> None:
+        with service.pin():
+            version = service.data_version
+            zeppelin = entry_like(service, period.id, description="Zeppelin")
+            await search.search("zeppelin")
+            # Written outside the pin, and applied by a later request
+            await asyncio.to_thread(
+                contextvars.Context().run,
+                service.add_time_entry,
+                period.id,
+                zeppelin,
+            )
+            assert (await search.search("zeppelin"))[0] == 0
+            assert service.data_version == version
+        assert (await search.search("zeppelin"))[0] == 1
+        with service.pin():
+            assert (await search.search("zeppelin"))[0] == 1
+        assert search._rebuild is None
+
+    asyncio.run(run())
+
+
+def brute_force(index: InvertedIndex, query: str) -> Set[str]:
+    """Find the keys of the documents containing all terms of a query."""
+    terms = set(analyze(query))
+    return {
+        index.key_of(document)
+        for document in index.documents
+        if document is not None and terms <= set(analyze(index.text_of(document)))
+    }
+
+
+def test_patched_rankings_match_a_scan(monkeypatch: Any) -> None:
+    # Small limits, so frequent terms take the bitmap and ranking walk paths
+    monkeypatch.setattr(search_module, "DIRECT_SCORING_MAX_MATCHES", 5)
+    words = ["alpha", "beta", "gamma", "delta"]
+    index = InvertedIndex(lambda d: d[1], lambda d: d[0])
+    for n in range(200):
+        index.add((str(n), " ".join(w for i, w in enumerate(words) if n % (i + 2))))
+    index.prerank(min_postings=1)
+
+    for n in range(0, 200, 7):
+        index.remove(str(n))
+    for n in range(1, 200, 5):
+        index.add((str(n), "alpha gamma" if n % 2 else "beta"))
+    for n in range(200, 230):
+        index.add((str(n), "alpha beta gamma delta"))
+
+    for query in ["alpha", "alpha beta", "beta gamma", "alpha gamma delta", "delta"]:
+        total, hits = index.search(query, limit=1000)
+        assert total == len(hits)
+        assert {doc[0] for _, doc in hits} == brute_force(index, query)
+        assert [score for score, _ in hits] == sorted(
+            (score for score, _ in hits), reverse=True
+        )
+        # Paging the ranking gives the same order
+        page = index.search(query, limit=10, offset=5)[1]
+        assert [doc for _, doc in page] == [doc for _, doc in hits[5:15]]
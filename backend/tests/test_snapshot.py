@@ -0,0 +1,78 @@
+"""Tests for the generations of the in-memory data and their indexes."""
+
+import contextvars
+from typing import Callable, List
+
+from feptm.models.payment import TimeEntryUpdate
+from feptm.services import MockDataService
+from feptm.services.query import INDEXED_FIELDS, run_query
+from tests.conftest import entry_like
+
+OpenService = Callable[[], MockDataService]
+
+
+def assert_indexes_match_scans(service: MockDataService) -> None:
+    """Check that every indexed lookup of time entries returns what a scan does."""
+    entries = service.get_filtered_data("time_entries")
+    for field in INDEXED_FIELDS["time_entries"]:
+        for value in {getattr(entry, field) for entry in entries}:
+            indexed = service.get_filtered_data("time_entries", {field: value})
+            scanned = run_query("time_entries", entries, {field: value})
+            assert [entry.id for entry in indexed] == [entry.id for entry in scanned]
+
+
+def ids(entries: List[object]) -> List[str]:
+    return [entry.id for entry in entries]  # type: ignore[attr-defined]
+
+
+def test_indexes_follow_writes(open_service: OpenService) -> None:
+    service = open_service()
+    period = service.get_payment_periods()[0]
+    other = next(
+        s.id
+        for s in service.get_specialists()
+        if s.id != period.time_entries[0].specialist_id
+    )
+    assert_indexes_match_scans(service)
+
+    added = service.add_time_entry(period.id, entry_like(service, period.id, hours=2.0))
+    assert_indexes_match_scans(service)
+    assert ids(service.get_filtered_data("time_entries", {"id": added.id})) == [
+        added.id
+    ]
+
+    # Changes within the same indexed values, then moves to another specialist
+    service.update_time_entry(added.id, TimeEntryUpdate(hours=3.0))
+    assert_indexes_match_scans(service)
+    service.update_time_entry(added.id, TimeEntryUpdate(specialist_id=other))
+    assert_indexes_match_scans(service)
+    assert added.id in ids(
+        service.get_filtered_data("time_entries", {"specialist_id": other})
+    )
+
+    service.delete_time_entry(added.id)
+    service.delete_time_entry(period.time_entries[0].id)
+    assert_indexes_match_scans(service)
+    assert service.get_filtered_data("time_entries", {"id": added.id}) == []
+
+
+def test_pinned_reader_keeps_its_generation(open_service: OpenService) -> None:
+    service = open_service()
+    period = service.get_payment_periods()[0]
+    specialist_id = period.time_entries[0].specialist_id
+
+    def read() -> List[str]:
+        return ids(
+            service.get_filtered_data("time_entries", {"specialist_id": specialist_id})
+        )
+
+    reader = contextvars.Context()
+    pin = service.pin()
+    reader.run(pin.__enter__)
+    before = reader.run(read)
+    service.add_time_entry(period.id, entry_like(service, period.id))
+    assert reader.run(read) == before
+    reader.run(pin.__exit__, None, None, None)
+
+    assert len(read()) == len(before) + 1
+    assert_indexes_match_scans(service)
@@ -0,0 +1,88 @@
+"""Tests for the SQLite data service."""
+
+import contextvars
+import sqlite3
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from feptm.models.payment import PaymentPeriodUpdate
+from feptm.services import SQLiteDataService
+from feptm.services.mutations import StorageError
+from tests.conftest import entry_like
+
+
+def test_pinned_reader_keeps_its_state(sqlite_service: SQLiteDataService) -> None:
+    period = sqlite_service.get_payment_periods()[0]
+
+    def read() -> List[int]:
+        # Several statements: the period rows, then their time entries
+        return [len(p.time_entries) for p in sqlite_service.get_payment_periods()]
+
+    reader = contextvars.Context()
+    pin = sqlite_service.pin()
+    reader.run(pin.__enter__)
+    before = reader.run(read)
+    version = reader.run(lambda: sqlite_service.data_version)
+    sqlite_service.add_time_entry(period.id, entry_like(sqlite_service, period.id))
+    assert reader.run(read) == before
+    assert reader.run(lambda: sqlite_service.data_version) == version
+    reader.run(pin.__exit__, None, None, None)
+
+    assert read()[0] == before[0] + 1
+    assert sqlite_service.data_version == version + 1
+
+
+def test_pinned_context_reads_its_own_writes(sqlite_service: SQLiteDataService) -> None:
+    period = sqlite_service.get_payment_periods()[0]
+    with sqlite_service.pin():
+        count = len(sqlite_service.get_payment_period(period.id).time_entries)
+        added = sqlite_service.add_time_entry(
+            period.id, entry_like(sqlite_service, period.id)
+        )
+        assert (
+            sqlite_service.get_payment_period(period.id).time_entries[-1].id == added.id
+        )
+        assert (
+            len(sqlite_service.get_payment_period(period.id).time_entries) == count + 1
+        )
+        updated = sqlite_service.update_payment_period(
+            period.id, PaymentPeriodUpdate(name="Checked")
+        )
+        assert updated is not None and updated.name == "Checked"
+
+
+def test_mutations_validate_in_their_write_transaction(
+    sqlite_service: SQLiteDataService, monkeypatch: Any
+) -> None:
+    period = sqlite_service.get_payment_periods()[0]
+    get_specialist = sqlite_service.get_specialist
+    in_transaction: List[bool] = []
+
+    def checked_get_specialist(specialist_id: str) -> Any:
+        in_transaction.append(sqlite_service.connection.in_transaction)
+        return get_specialist(specialist_id)
+
+    monkeypatch.setattr(sqlite_service, "get_specialist", checked_get_specialist)
+    sqlite_service.add_time_entry(period.id, entry_like(sqlite_service, period.id))
+    assert in_transaction == [True]
+
+
+def test_busy_database_rejects_writes(
+    sqlite_service: SQLiteDataService, tmp_path: Path
+) -> None:
+    period = sqlite_service.get_payment_periods()[0]
+    entry = entry_like(sqlite_service, period.id)
+    version = sqlite_service.data_version
+    sqlite_service.connection.execute("PRAGMA busy_timeout = 10")
+
+    writer = sqlite3.connect(tmp_path / "feptm.sqlite3", isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    with pytest.raises(StorageError):
+        sqlite_service.add_time_entry(period.id, entry)
+    writer.execute("ROLLBACK")
+    writer.close()
+
+    assert sqlite_service.data_version == version
+    assert sqlite_service.add_time_entry(period.id, entry) is not None